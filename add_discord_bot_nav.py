@@ -5,11 +5,18 @@
 - Inserts after the Holidays link.
 - Skips files that already include /discord-bot/.
 - Idempotent.
+
+Pages adopted by partials.py get their nav from _partials/nav.html; change
+that file and run partials.py instead of writing another script like this.
 """
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 
+import build_profile
+import site_files
+
 ROOT = Path(__file__).resolve().parent
 INSERT_AFTER = '<a href="/holiday/">Holidays</a>'
 INSERT_LINK = '<a href="/discord-bot/">Discord Bot</a>'
@@ -19,8 +26,8 @@ def should_skip(text: str) -> bool:
     return "/discord-bot/" in text
 
 
-def update_html(path: Path) -> bool:
-    text = path.read_text(encoding="utf-8")
+def update_html(path: Path, prof: build_profile.Profile) -> bool:
+    text = prof.read_text(path)
     if should_skip(text):
         return False
     if INSERT_AFTER not in text:
@@ -28,19 +35,26 @@ def update_html(path: Path) -> bool:
     updated = text.replace(INSERT_AFTER, f"{INSERT_AFTER}\n      {INSERT_LINK}", 1)
     if updated == text:
         return False
-    path.write_text(updated, encoding="utf-8")
+    prof.write_text(path, updated)
     return True
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Insert the Discord Bot link into nav menus.")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
     changed = 0
-    for path in ROOT.rglob("*.html"):
-        # Skip generated sitemaps or other non-page HTML if any.
-        if "sitemaps" in path.parts:
-            continue
-        if update_html(path):
-            changed += 1
-    print(f"Updated {changed} file(s).")
+    with build_profile.session(args, "add_discord_bot_nav") as prof:
+        with prof.phase("walk"):
+            pages = site_files.site_pages(ROOT)
+        # Pages that already link the bot, or have no nav to add it to, are never decoded.
+        todo = site_files.filter_pages(pages, require=[INSERT_AFTER], forbid=["/discord-bot/"])
+        for path in prof.iter("prefilter", todo):
+            with prof.page(str(path.relative_to(ROOT))):
+                if update_html(path, prof):
+                    changed += 1
+    print(f"Updated {changed} of {len(pages)} page(s).")
 
 
 if __name__ == "__main__":
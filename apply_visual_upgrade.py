@@ -1,7 +1,10 @@
+import argparse
 import os
 import re
 from pathlib import Path
 
+import build_profile
+
 HOLIDAY_DIR = Path("holiday")
 
 CSS_LINK = '<link rel="stylesheet" href="/styles.css">\n'
@@ -44,8 +47,8 @@ def insert_instagram(html):
     return html[:insertion_point] + INSTAGRAM_BLOCK + html[insertion_point:]
 
 
-def cleanup_page(path):
-    html = path.read_text(encoding="utf-8")
+def cleanup_page(path, prof):
+    html = prof.read_text(path)
     original = html
 
     html = remove_inline_css(html)
@@ -53,19 +56,25 @@ def cleanup_page(path):
     html = insert_instagram(html)
 
     if html != original:
-        path.write_text(html, encoding="utf-8")
+        prof.write_text(path, html)
         return True
     return False
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Move holiday pages onto styles.css and add the Instagram block.")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
     updated = 0
 
-    for root, dirs, files in os.walk(HOLIDAY_DIR):
-        if "index.html" not in files:
-            continue
-        if cleanup_page(Path(root) / "index.html"):
-            updated += 1
+    with build_profile.session(args, "apply_visual_upgrade") as prof:
+        for root, dirs, files in prof.iter("walk", os.walk(HOLIDAY_DIR)):
+            if "index.html" not in files:
+                continue
+            with prof.page(Path(root).name):
+                if cleanup_page(Path(root) / "index.html", prof):
+                    updated += 1
 
     print(f"Visual upgrade applied to {updated} holiday pages.")
 
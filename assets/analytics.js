@@ -0,0 +1,50 @@
+// Batched analytics for holiday pages. Page scripts never call gtag
+// directly; they push [eventName, params] onto window.ohcQ, which works
+// before this file has loaded (it is included with defer). Events are sent
+// to gtag in one batch when the browser is idle (requestIdleCallback, with a
+// timeout so they are not held forever), and immediately when the page is
+// hidden or unloaded, so nothing queued is lost on navigation. Without gtag
+// on the page the batch is dropped, as the old per-event calls did.
+(function (global) {
+  "use strict";
+
+  var IDLE_TIMEOUT_MS = 2000;
+  var pending = [];
+  var scheduled = false;
+
+  function flush() {
+    scheduled = false;
+    var batch = pending.splice(0, pending.length);
+    if (!global.gtag) return;
+    for (var i = 0; i < batch.length; i++) {
+      try {
+        global.gtag("event", batch[i][0], batch[i][1]);
+      } catch (_) {}
+    }
+  }
+
+  function schedule() {
+    if (scheduled) return;
+    scheduled = true;
+    if (global.requestIdleCallback) {
+      global.requestIdleCallback(flush, { timeout: IDLE_TIMEOUT_MS });
+    } else {
+      global.setTimeout(flush, 200);
+    }
+  }
+
+  function track(item) {
+    if (!item || !item[0]) return;
+    pending.push([item[0], item[1] || {}]);
+    schedule();
+  }
+
+  document.addEventListener("visibilitychange", function () {
+    if (document.visibilityState === "hidden") flush();
+  });
+  global.addEventListener("pagehide", flush);
+
+  var early = global.ohcQ || [];
+  global.ohcQ = { push: track };
+  for (var i = 0; i < early.length; i++) track(early[i]);
+})(window);
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the site build scripts.
+
+For each scale, writes a synthetic corpus (generate_synthetic_corpus) of
+scale x --base holidays into a temp dir, copies the top-level scripts next
+to it and runs each script there in pipeline order, so later passes see the
+earlier passes' output just as on a real refresh. Each run records wall
+time, peak RSS and the number of files it created or modified.
+
+Results go to --results as JSON. With --baseline, every (script, scale) run
+is compared against the stored result and the harness exits non-zero on a
+failed script, a slowdown or memory growth beyond --tolerance, or a change
+in files written.
+
+Usage:
+  python3 bench_build_scripts.py --scales 1,10 --results bench_results.json
+  python3 bench_build_scripts.py --scales 1,10,100 --baseline bench_results.json
+  python3 bench_build_scripts.py --scripts generate_sitemaps.py,validate_holidays.py
+"""
+
+import argparse
+import atexit
+import datetime
+import json
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from generate_synthetic_corpus import write_corpus
+
+ROOT = Path(__file__).resolve().parent
+
+# Pipeline order: each script runs on the tree the previous one left behind.
+SCRIPTS = [
+    "validate_holidays.py",
+    "generate_seo_pages.py",
+    "upgrade_holiday_engagement.py",
+    "upgrade_holiday_engagement_pass2.py",
+    "cleanup_final_pass.py",
+    "add_discord_bot_nav.py",
+    "partials.py",
+    "apply_visual_upgrade.py",
+    "structured_data.py",
+    "defer_third_party.py",
+    "optimize_images.py",
+    "purge_css.py",
+    "speculation_hints.py",
+    "minify_html.py",
+    "generate_sitemaps.py",
+    "build_service_worker.py",
+]
+
+# Absolute slack on top of --tolerance so millisecond-scale runs don't flap.
+MIN_TIME_DELTA = 0.05
+MIN_RSS_DELTA_MB = 5.0
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak RSS of the calling process. On Linux this reads VmHWM: a child's
+    ru_maxrss starts from the parent's high-water mark at fork (exec doesn't
+    reset it), so it would report the harness's own memory.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_child(script: str, rss_file: str) -> None:
+    """Run script as __main__ and record its peak RSS on exit (--child mode)."""
+
+    def report():
+        Path(rss_file).write_text(str(peak_rss_mb()), encoding="ascii")
+
+    atexit.register(report)
+    sys.argv = [script]
+    runpy.run_path(script, run_name="__main__")
+
+
+def snapshot(root: Path) -> Dict[str, Tuple[int, int]]:
+    state = {}
+    for dirpath, _, filenames in os.walk(root):
+        for fname in filenames:
+            st = os.stat(os.path.join(dirpath, fname))
+            state[os.path.join(dirpath, fname)] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def run_script(script: str, cwd: Path) -> Dict:
+    before = snapshot(cwd)
+    with tempfile.NamedTemporaryFile(suffix=".rss") as rss:
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "bench_build_scripts.py", "--child", script, "--rss-file", rss.name],
+            cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        wall = time.perf_counter() - t0
+        peak = float(Path(rss.name).read_text(encoding="ascii") or 0)
+    after = snapshot(cwd)
+    written = sum(1 for path, stat in after.items() if before.get(path) != stat)
+    result = {
+        "script": script,
+        "wall_s": round(wall, 4),
+        "peak_rss_mb": round(peak, 1),
+        "files_written": written,
+        "exit_code": proc.returncode,
+    }
+    if proc.returncode != 0:
+        result["stderr_tail"] = proc.stderr.decode("utf-8", "replace")[-500:]
+    return result
+
+
+def run_scale(scale: int, base: int, scripts: List[str], seed: int) -> List[Dict]:
+    holidays = base * scale
+    floating = max(4, holidays * 15 // 1000)
+    with tempfile.TemporaryDirectory(prefix=f"ohc-bench-{scale}x-") as tmp:
+        work = Path(tmp)
+        counts = write_corpus(work, holidays, floating, seed)
+        for src in ROOT.glob("*.py"):
+            shutil.copy2(src, work / src.name)
+        shutil.copytree(ROOT / "_partials", work / "_partials")
+        results = []
+        for script in scripts:
+            result = run_script(script, work)
+            result.update({"scale": scale, "holidays": holidays, "pages": counts["pages"]})
+            results.append(result)
+            status = "ok" if result["exit_code"] == 0 else f"FAILED ({result['exit_code']})"
+            print(f"  {scale:>4}x {script:<38} {result['wall_s']:8.3f} s  {result['peak_rss_mb']:8.1f} MB  "
+                  f"{result['files_written']:>7} files  {status}")
+        return results
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    base_by_key = {(r["script"], r["scale"]): r for r in baseline}
+    problems = []
+    for r in results:
+        key = f"{r['script']} @ {r['scale']}x"
+        if r["exit_code"] != 0:
+            problems.append(f"{key}: exited with {r['exit_code']}")
+            continue
+        base = base_by_key.get((r["script"], r["scale"]))
+        if not base:
+            continue
+        if r["wall_s"] > base["wall_s"] * (1 + tolerance) and r["wall_s"] - base["wall_s"] > MIN_TIME_DELTA:
+            problems.append(f"{key}: wall time {base['wall_s']:.3f}s -> {r['wall_s']:.3f}s")
+        if (r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance)
+                and r["peak_rss_mb"] - base["peak_rss_mb"] > MIN_RSS_DELTA_MB):
+            problems.append(f"{key}: peak RSS {base['peak_rss_mb']:.1f}MB -> {r['peak_rss_mb']:.1f}MB")
+        if r["files_written"] != base["files_written"]:
+            problems.append(f"{key}: files written {base['files_written']} -> {r['files_written']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the build scripts against synthetic corpora.")
+    parser.add_argument("--scales", default="1,10", help="Comma-separated multiples of --base (default: 1,10)")
+    parser.add_argument("--base", type=int, default=732, help="Holidays at scale 1 (default: 732)")
+    parser.add_argument("--scripts", help=f"Comma-separated subset of: {', '.join(SCRIPTS)}")
+    parser.add_argument("--seed", type=int, default=2026, help="Corpus seed (default: 2026)")
+    parser.add_argument("--results", default="bench_results.json", help="Where to write results (default: bench_results.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional growth in time/RSS (default: 0.25)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--rss-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.rss_file)
+        return
+
+    scripts = SCRIPTS
+    if args.scripts:
+        scripts = [s.strip() for s in args.scripts.split(",") if s.strip()]
+        unknown = [s for s in scripts if s not in SCRIPTS]
+        if unknown:
+            raise SystemExit(f"Unknown script(s): {', '.join(unknown)}")
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+
+    results = []
+    for scale in scales:
+        print(f"Scale {scale}x ({args.base * scale} holidays)")
+        results.extend(run_scale(scale, args.base, scripts, args.seed))
+
+    report = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "seed": args.seed,
+        "base": args.base,
+        "results": results,
+    }
+    Path(args.results).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {len(results)} result(s) to {args.results}")
+
+    baseline = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    problems = compare(results, baseline, args.tolerance)
+    if problems:
+        print("Regressions:")
+        for problem in problems:
+            print(f"- {problem}")
+        raise SystemExit(1)
+    if args.baseline:
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
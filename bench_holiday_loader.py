@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full json.loads path against holiday_data.iter_holidays.
+
+Writes a synthetic holidays.json of the requested size (real entries from
+holidays.json repeated across all MM-DD keys with numbered names), then
+reads it in a fresh child process per loader and reports wall time and peak
+RSS for each.
+
+Usage:
+  python3 bench_holiday_loader.py                 # 500 MB synthetic file
+  python3 bench_holiday_loader.py --size-mb 50
+  python3 bench_holiday_loader.py --file big.json # reuse an existing file
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_build_scripts import peak_rss_mb
+from holiday_data import iter_holidays, load_holidays
+
+
+def write_synthetic(source: Path, out: Path, size_mb: float) -> int:
+    """Stream a synthetic catalog of roughly size_mb to out; returns the entry count."""
+    templates = [e for items in load_holidays(source)["holidays"].values() for e in items if isinstance(e, dict)]
+    avg = sum(len(json.dumps(e, ensure_ascii=False)) for e in templates) / len(templates)
+    total = max(1, int(size_mb * 1024 * 1024 / (avg + 2)))
+    date_keys = [f"{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 32)
+                 if d <= (29 if m == 2 else 30 if m in (4, 6, 9, 11) else 31)]
+    per_bucket = -(-total // len(date_keys))
+    written = 0
+    with open(out, "w", encoding="utf-8") as fh:
+        fh.write('{"floatingHolidays": {}, "holidays": {')
+        for b, date_key in enumerate(date_keys):
+            fh.write(("," if b else "") + json.dumps(date_key) + ": [")
+            for i in range(per_bucket):
+                entry = dict(templates[written % len(templates)])
+                entry["name"] = f"{entry.get('name', 'Holiday')} #{written}"
+                entry["date"] = date_key
+                fh.write(("," if i else "") + json.dumps(entry, ensure_ascii=False))
+                written += 1
+            fh.write("]")
+        fh.write("}}")
+    return written
+
+
+def child(mode: str, path: Path) -> None:
+    count = 0
+    if mode == "full":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for items in data["holidays"].values():
+            count += len(items)
+    else:
+        for _ in iter_holidays(path):
+            count += 1
+    print(count, peak_rss_mb())
+
+
+def measure(mode: str, path: Path):
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--file", str(path)],
+        stdout=subprocess.PIPE,
+    )
+    out = proc.stdout.read()
+    status = proc.wait()
+    elapsed = time.perf_counter() - t0
+    if status != 0:
+        raise SystemExit(f"{mode} loader failed with status {status}")
+    count, peak_mb = out.split()
+    return int(count), elapsed, float(peak_mb) * 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak RSS and time of full-load vs streaming holidays.json readers.")
+    parser.add_argument("--size-mb", type=float, default=500, help="Synthetic file size in MB (default: 500)")
+    parser.add_argument("--source", default="holidays.json", help="Catalog to sample entries from (default: holidays.json)")
+    parser.add_argument("--file", help="Benchmark this file instead of generating one")
+    parser.add_argument("--child", choices=["full", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, Path(args.file))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.file:
+            path = Path(args.file)
+        else:
+            path = Path(tmp) / "holidays.json"
+            print(f"Writing ~{args.size_mb:g} MB synthetic catalog…")
+            write_synthetic(Path(args.source), path, args.size_mb)
+        size = path.stat().st_size
+        print(f"File: {path} ({size / 1024 / 1024:.1f} MB)")
+        results = {}
+        for mode in ("full", "stream"):
+            count, elapsed, peak = measure(mode, path)
+            results[mode] = (elapsed, peak)
+            print(f"{mode:<6} {count:>9} entries  {elapsed:7.2f} s  peak RSS {peak / 1024 / 1024:8.1f} MB")
+        full_t, full_rss = results["full"]
+        stream_t, stream_rss = results["stream"]
+        print(f"stream/full: time x{stream_t / full_t:.2f}, peak RSS x{stream_rss / full_rss:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Invalidation benchmark for the dependency index (build_cache.DepIndex).
+
+Copies the site to a temp dir and builds it once (library, hubs, sitemaps),
+which records .build/deps.json. Then, one at a time, it applies typical
+single-entry edits to holidays.json, rebuilds and restores:
+
+- content: new description (nothing generated shows it)
+- rename:  new display name, same slug
+- redate:  moved to the same day next month (fixed-date holidays only)
+
+For each edit it prints the pages the index lists for the slug (before or
+after the edit, so a re-dated holiday's new month counts), how many of
+those are hand-maintained holiday pages (its own and any linking to it),
+the files the build actually rewrote, and the full-site page count that
+used to be rewritten. A rewritten file the index did not list is an
+under-prediction: it is printed and the run exits non-zero.
+
+Usage:
+  python3 bench_invalidation.py
+  python3 bench_invalidation.py --slugs pi-day,national-donut-day
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import build_profile
+import generate_category_hubs
+import generate_holiday_index
+import generate_sitemaps
+from build_cache import DepIndex, content_hash
+from holiday_data import slugify
+
+ROOT = Path(__file__).resolve().parent
+OUTPUTS = ["holiday", "holidays", "sitemaps", "sitemap-index.xml"]
+SAMPLE_EVERY = 150
+
+
+def build_site(year: int) -> None:
+    prof = build_profile.Profile("bench_invalidation")
+    generate_holiday_index.build(prof, datetime.date.today().month)
+    generate_category_hubs.build(prof)
+    generate_sitemaps.build(prof, [year])
+
+
+def output_hashes():
+    state = {}
+    for base in map(Path, OUTPUTS):
+        files = [base] if base.is_file() else (p for p in base.rglob("*") if p.is_file())
+        for path in files:
+            state[path.as_posix()] = content_hash(path.read_bytes())
+    return state
+
+
+def find_entry(data, slug):
+    for items in data["holidays"].values():
+        for entry in items:
+            if (entry.get("slug") or slugify(entry.get("name", ""))) == slug:
+                return entry, False
+    if slug in data.get("floatingHolidays", {}):
+        return data["floatingHolidays"][slug], True
+    raise SystemExit(f"{slug}: not in holidays.json")
+
+
+def apply_edit(data, slug, kind) -> bool:
+    """Edit slug's entry in place; False if the edit doesn't apply to it."""
+    entry, floating = find_entry(data, slug)
+    if kind == "content":
+        entry["description"] = entry.get("description", "") + " (edited)"
+    elif kind == "rename":
+        entry["slug"] = slug
+        entry["name"] = entry["name"] + " (renamed)"
+    elif kind == "redate":
+        if floating:
+            return False
+        old = entry["date"]
+        mm, dd = (int(part) for part in old.split("-"))
+        new = f"{mm % 12 + 1:02d}-{min(dd, 28):02d}"
+        data["holidays"][old].remove(entry)
+        entry["date"] = new
+        data["holidays"].setdefault(new, []).append(entry)
+    return True
+
+
+def default_slugs(data):
+    fixed = [entry.get("slug") or slugify(entry["name"])
+             for key in sorted(data["holidays"]) for entry in data["holidays"][key]]
+    return fixed[::SAMPLE_EVERY] + sorted(data.get("floatingHolidays", {}))[:1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pages invalidated and rewritten by single-entry holidays.json edits.")
+    parser.add_argument("--slugs", help="Comma-separated slugs to edit (default: every 150th holiday and one floating)")
+    parser.add_argument("--edits", default="content,rename,redate", help="Edits to apply (default: content,rename,redate)")
+    parser.add_argument("--year", type=int, default=generate_sitemaps.CURRENT_YEAR, help="Sitemap year (default: this year)")
+    args = parser.parse_args()
+    kinds = [kind.strip() for kind in args.edits.split(",") if kind.strip()]
+
+    home = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="ohc-deps-") as tmp:
+        shutil.copytree(ROOT, tmp, dirs_exist_ok=True, ignore=shutil.ignore_patterns(".git", ".build", "__pycache__"))
+        os.chdir(tmp)
+        try:
+            original = Path("holidays.json").read_bytes()
+            data = json.loads(original)
+            slugs = [s.strip() for s in args.slugs.split(",")] if args.slugs else default_slugs(data)
+
+            build_site(args.year)
+            baseline = output_hashes()
+            site_pages = sum(1 for path in baseline if path.endswith((".html", ".xml")))
+            print(f"Full-site rewrite: {site_pages} pages. Edits:")
+            print(f"  {'edit':<8} {'slug':<44} {'deps':>5} {'links':>6} {'rewritten':>10}")
+
+            misses = []
+            for slug in slugs:
+                for kind in kinds:
+                    edited = json.loads(original)
+                    if not apply_edit(edited, slug, kind):
+                        continue
+                    before = DepIndex()
+                    Path("holidays.json").write_text(json.dumps(edited, ensure_ascii=False, indent=2), encoding="utf-8")
+                    build_site(args.year)
+                    after = DepIndex()
+                    listed = set(before.dependents(slug)) | set(after.dependents(slug))
+                    links = sum(1 for page in listed if (after.stage(page) or before.stage(page)) == "pages")
+                    now = output_hashes()
+                    rewritten = sorted(path for path, digest in now.items() if baseline.get(path) != digest)
+                    # The index lists sitemap files, not slugs; it follows whichever of them changed.
+                    missed = [path for path in rewritten if path not in listed and path != "sitemap-index.xml"]
+                    misses.extend(f"{kind} {slug}: {path}" for path in missed)
+                    print(f"  {kind:<8} {slug:<44} {len(listed) - links:>5} {links:>6} {len(rewritten):>10}")
+
+                    Path("holidays.json").write_bytes(original)
+                    build_site(args.year)
+                    baseline = output_hashes()
+        finally:
+            os.chdir(home)
+
+    print("deps = generated pages the index lists; links = hand-maintained holiday pages for or linking to the slug.")
+    if misses:
+        print("Rewritten but not in the index:")
+        for miss in misses:
+            print(f"- {miss}")
+        raise SystemExit(1)
+    print("Every rewritten page was in the index.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark validate_holidays.month_in_text against the old 12-substring scan.
+
+Times both over every name + description in holidays.json and lists the
+entries where they disagree (e.g. "may" inside "maybe" or "mayonnaise").
+
+Usage:
+  python3 bench_month_matcher.py
+  python3 bench_month_matcher.py --file path/to/holidays.json --repeat 50
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from holiday_data import load_holidays
+from validate_holidays import MONTH_NAMES, month_in_text
+
+
+def legacy_month_in_text(text):
+    text_low = text.lower()
+    found = []
+    for name, num in MONTH_NAMES.items():
+        if name in text_low:
+            found.append(num)
+    return found
+
+
+def best_of(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the month-name matcher against the legacy scan.")
+    parser.add_argument("--file", default="holidays.json", help="Path to holidays.json (default: holidays.json)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions; best run is reported (default: 20)")
+    args = parser.parse_args()
+
+    holidays = load_holidays(Path(args.file))["holidays"]
+    labelled = [
+        (f"{date_key} {entry.get('name', '')}", f"{entry.get('name', '')} {entry.get('description', '')}")
+        for date_key, items in holidays.items()
+        for entry in items
+        if isinstance(entry, dict)
+    ]
+    texts = [text for _, text in labelled]
+
+    legacy = best_of(legacy_month_in_text, texts, args.repeat)
+    current = best_of(month_in_text, texts, args.repeat)
+    print(f"Entries: {len(texts)}")
+    print(f"legacy substring scan: {legacy * 1000:8.2f} ms ({legacy / len(texts) * 1e6:.2f} us/entry)")
+    print(f"month_in_text:         {current * 1000:8.2f} ms ({current / len(texts) * 1e6:.2f} us/entry)")
+
+    diffs = [
+        (label, legacy_month_in_text(text), month_in_text(text))
+        for label, text in labelled
+        if sorted(legacy_month_in_text(text)) != month_in_text(text)
+    ]
+    print(f"Disagreements: {len(diffs)}")
+    for label, old, new in diffs[:20]:
+        print(f"- {label}: legacy={old} new={new}")
+    if len(diffs) > 20:
+        print(f"...and {len(diffs) - 20} more")
+
+
+if __name__ == "__main__":
+    main()
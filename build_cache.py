@@ -0,0 +1,130 @@
+"""
+Content-hash manifests for incremental build stages.
+
+Each stage keeps a JSON manifest under .build/ (gitignored) keyed by the
+path it processed, so a rerun can skip inputs whose bytes haven't changed:
+
+    cache = HashCache("precompress")
+    digest = content_hash(data)
+    if (cache.get(rel) or {}).get("hash") != digest:
+        ...
+        cache.set(rel, {"hash": digest, ...})
+    cache.save()
+
+DepIndex (.build/deps.json) records which pages render which holidays, so
+an edit to one entry maps to the exact pages it invalidates.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+BUILD_DIR = Path(".build")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write via a sibling temp file so readers never see a half-written file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_text_if_changed(path: Path, text: str) -> bool:
+    """Write text only if it differs from what's on disk (keeps mtimes, and so sitemap lastmods, stable)."""
+    return write_bytes_if_changed(path, text.encode("utf-8"))
+
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, data)
+    return True
+
+
+class HashCache:
+    def __init__(self, name: str, build_dir: Path = BUILD_DIR):
+        self.path = build_dir / f"{name}.json"
+        self.entries: Dict[str, Any] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                # A corrupt manifest only costs one full rebuild.
+                self.entries = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        self.entries[key] = value
+
+    def prune(self, keep: Iterable[str]) -> List[str]:
+        """Drop entries not in keep; returns the dropped keys."""
+        keep = set(keep)
+        dropped = [key for key in self.entries if key not in keep]
+        for key in dropped:
+            del self.entries[key]
+        return dropped
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.entries, indent=1, sort_keys=True).encode("utf-8"))
+
+
+class DepIndex:
+    """
+    Page -> slugs rendered, recorded by each generator for the pages it owns,
+    plus the reverse slug -> pages index, rebuilt on save:
+
+        deps = DepIndex()
+        deps.record("hubs", "holidays/arts-culture/index.html", slugs)
+        deps.forget("hubs", keep=pages_written_this_run)
+        deps.save()
+        DepIndex().dependents("pi-day")
+    """
+
+    def __init__(self, build_dir: Path = BUILD_DIR):
+        self.path = build_dir / "deps.json"
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.slugs: Dict[str, List[str]] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.pages, self.slugs = data["pages"], data["slugs"]
+            except (OSError, ValueError, KeyError):
+                self.pages, self.slugs = {}, {}
+
+    def record(self, by: str, page: str, slugs: Iterable[str]) -> None:
+        self.pages[page] = {"by": by, "slugs": sorted(set(slugs))}
+
+    def forget(self, by: str, keep: Iterable[str]) -> None:
+        """Drop by's pages that aren't in keep (pages it no longer writes)."""
+        keep = set(keep)
+        for page in [p for p, entry in self.pages.items() if entry["by"] == by and p not in keep]:
+            del self.pages[page]
+
+    def dependents(self, slug: str) -> List[str]:
+        return self.slugs.get(slug, [])
+
+    def stage(self, page: str) -> Optional[str]:
+        entry = self.pages.get(page)
+        return entry["by"] if entry else None
+
+    def save(self) -> None:
+        reverse: Dict[str, List[str]] = {}
+        for page in sorted(self.pages):
+            for slug in self.pages[page]["slugs"]:
+                reverse.setdefault(slug, []).append(page)
+        self.slugs = reverse
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"pages": self.pages, "slugs": self.slugs}
+        write_atomic(self.path, json.dumps(data, indent=1, sort_keys=True).encode("utf-8"))
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Build the National Day report data files for a given year.
+
+Reads holidays.json once into columns (one list per field, one row per
+observance; floating holidays resolved for --year) and computes every
+figure as a group-by/count over those columns. Writes:
+
+  reports/<year>_national_day_report_rows.csv         date,name,category,emoji,floating
+  reports/<year>_national_day_report_data.json        headline figures used by the report page
+  reports/<year>_national_day_report_chart_manifest.json
+  reports/<year>_national_day_report_data_validation.json
+
+Categories: the keyword model that assigned categories isn't in the repo,
+so categories carry forward from the latest earlier rows CSV (--categories
+overrides this). Observances without a carried-forward category become
+"Fun & Weird (uncategorized)", as in the report's methodology, and are
+listed so someone can review them. Food subtypes and the niche/hobby
+obscurity sets use the keyword rules below. Those rules reproduce the
+published 2026 counts.
+
+corrections_since_february is a changelog of name changes per date slot.
+It is computed against --baseline-rows when given; otherwise it is kept
+from the existing data file for the year.
+
+Unchanged outputs are not rewritten: a file whose figures match the one on
+disk keeps its generated_at. --check writes nothing and reports any figure
+that differs from the files on disk.
+
+Usage:
+  python3 build_national_day_report.py --year 2027
+  python3 build_national_day_report.py --year 2026 --check
+  python3 build_national_day_report.py --year 2027 --baseline-rows reports/2026_national_day_report_rows.csv
+"""
+
+import argparse
+import calendar
+import csv
+import datetime
+import io
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import build_profile
+from build_cache import write_text_if_changed
+from generate_sitemaps import resolve_date_rule
+from holiday_data import category_lookup, iter_floating_holidays, iter_holidays, slugify
+
+HOLIDAYS_JSON = Path("holidays.json")
+REPORTS_DIR = Path("reports")
+CHART_DIR = Path("assets") / "images" / "reports"
+FALLBACK_CATEGORY = "Fun & Weird (uncategorized)"
+# Rule order of the category model; also the order of chart_manifest category_counts.
+CATEGORIES = [
+    "Food & Drink",
+    "Animals & Nature",
+    "Kindness & Relationships",
+    "Wellness & Self-Care",
+    "Awareness & Advocacy",
+    "Science, History & Curiosities",
+    "Work & Technology",
+    "Arts & Culture",
+    "Seasonal & Calendar",
+    FALLBACK_CATEGORY,
+]
+FOOD_CATEGORY = "Food & Drink"
+OTHER_FOOD = "Other Food"
+# Second keyword pass over Food & Drink names, first match wins (substring, lowercase).
+FOOD_SUBTYPE_RULES = [
+    ("Savory Meals", [
+        "pizza", "burger", "taco", "pasta", "spaghetti", "lasagna", "soup", "chowder", "chicken", "bacon",
+        "hot dog", "sausage", "salami", "bologna", "brisket", "spareribs", "prime rib", "filet mignon", "lamb",
+        "corned beef", "tuna", "sushi", "clams", "oyster", "scallops", "hoagie", "nachos", "quesadilla",
+        "gumbo", "bisque", "pierogi", "fettuccine", "chop suey", "sloppy joe",
+    ]),
+    ("Dessert & Sweets", [
+        "cake", "cookie", "chocolate", "candy", "pie", "ice cream", "fudge", "pudding", "brownie", "donut",
+        "doughnut", "dessert", "sundae", "popsicle", "pastry", "muffin", "cupcake", "parfait", "mousse",
+        "marshmallow", "s'mores", "lollipop", "gingerbread", "torte", "macaroon", "creamsicle", "spumoni",
+        "banana split", "baklava", "biscotti", "m&m", "butterscotch",
+    ]),
+    ("Beverages", [
+        "tea", "coffee", "wine", "beer", "cocktail", "margarita", "milk", "bourbon", "moonshine", "julep",
+        "daiquiri", "tequila", "colada", "rum", "cappuccino", "espresso", "cider", "cosmopolitan", "beverage",
+        "sauvignon", "moscato", "soda",
+    ]),
+    ("Produce & Ingredients", [
+        "vegetable", "veggies", "garlic", "cabbage", "bean", "avocado", "watermelon", "strawberr", "raspberr",
+        "pumpkin", "apple", "peach", "coconut", "pistachio", "potato", "guacamole",
+    ]),
+]
+NICHE_KEYWORDS = [
+    "morse code", "cellophane", "plimsoll", "barbershop", "paperclip", "ballpoint", "rubber eraser", "zipper",
+    "ampersand", "push-button",
+]
+HOBBY_KEYWORDS = [
+    "photography", "puzzle", "kite", "origami", "lego", "yo-yo", "scrabble", "leathercraft", "coloring",
+    "doodle", "paper airplane", "scavenger", "miniature golf", "checkers", "card playing", "video game",
+    "square dance", "letter writing", "snowflakes",
+]
+NAME_PREFIXES = [("starts_with_national", "national "), ("starts_with_international", "international "),
+                 ("starts_with_world", "world ")]
+TOP_EMOJI = 8
+LONGEST_NAMES = 10
+CROWDED_DATES = 5
+METHODOLOGY_NOTE = (
+    "Categories assigned via ordered keyword matching against observance names; unmatched entries are labeled "
+    "Fun & Weird (uncategorized) rather than folded into an unrelated category. See "
+    "https://www.obscureholidaycalendar.com/reports/{year}-national-day-report/#methodology for full details."
+)
+VALIDATION_NOTES = {
+    "category_method": "Carried forward from the previous report's rows; unmatched names are Fun & Weird (uncategorized).",
+    "source_file": "holidays.json",
+}
+
+
+def report_path(year: int, kind: str) -> Path:
+    return REPORTS_DIR / f"{year}_national_day_report_{kind}"
+
+
+def default_categories_csv(year: int):
+    """The newest rows CSV for this year or earlier."""
+    candidates = []
+    for path in REPORTS_DIR.glob("*_national_day_report_rows.csv"):
+        m = re.match(r"(\d{4})_", path.name)
+        if m and int(m.group(1)) <= year:
+            candidates.append((int(m.group(1)), path))
+    return max(candidates)[1] if candidates else None
+
+
+def load_columns(path: Path, year: int, lookup):
+    """Read holidays.json into parallel columns, one row per observance."""
+    cols = defaultdict(list)
+
+    def add(date, month, day, name, entry, floating, rule_type):
+        facts = [f for f in entry.get("funFacts") or [] if isinstance(f, str)]
+        slug = entry.get("slug") or slugify(name)
+        cols["date"].append(date)
+        cols["month"].append(month)
+        cols["day"].append(day)
+        cols["name"].append(name)
+        cols["category"].append(lookup(name, slug))
+        cols["emoji"].append(entry.get("emoji") or "")
+        cols["floating"].append(floating)
+        cols["rule_type"].append(rule_type)
+        cols["fact_count"].append(len(facts))
+        cols["longest_fact"].append(max(facts, key=len) if facts else "")
+
+    for date_key, _, entry in iter_holidays(path):
+        if isinstance(entry, dict) and entry.get("name"):
+            mm, dd = (int(part) for part in entry.get("date", date_key).split("-"))
+            add(f"{mm:02d}-{dd:02d}", mm, dd, entry["name"], entry, False, None)
+    for slug, entry in iter_floating_holidays(path):
+        if isinstance(entry, dict) and entry.get("name"):
+            rule = entry.get("dateRule") or {}
+            resolved = resolve_date_rule(rule, year)
+            month, day = resolved if resolved else (None, None)
+            # Rows leave the date blank for floating holidays; month/day hold this year's date.
+            add("", month, day, entry["name"], {**entry, "slug": slug}, True, rule.get("type") if resolved else None)
+    # Row order: fixed holidays by date then name, then floating holidays by name.
+    order = sorted(range(len(cols["name"])), key=lambda i: (cols["floating"][i], cols["date"][i], cols["name"][i]))
+    return {key: [values[i] for i in order] for key, values in cols.items()}
+
+
+def food_subtype(name: str) -> str:
+    lowered = name.lower()
+    for subtype, keywords in FOOD_SUBTYPE_RULES:
+        if any(k in lowered for k in keywords):
+            return subtype
+    return OTHER_FOOD
+
+
+def matches_any(names, keywords):
+    return sum(1 for name in names if any(k in name.lower() for k in keywords))
+
+
+def category_key(category: str) -> str:
+    return slugify(re.sub(r"\s*\(.*\)$", "", category)).replace("-and-", "_").replace("-", "_")
+
+
+def ordered_counts(counter: Counter, order):
+    """Counts sorted by count, descending; ties keep the given order."""
+    rank = {key: i for i, key in enumerate(order)}
+    return sorted(counter.items(), key=lambda kv: (-kv[1], rank.get(kv[0], len(rank)), kv[0]))
+
+
+def corrections(cols, baseline_rows: Path):
+    """Date slots whose names changed since the baseline rows CSV."""
+    before = defaultdict(list)
+    with open(baseline_rows, encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            if row["date"]:
+                before[row["date"]].append(row["name"])
+    now = defaultdict(list)
+    for date, name, floating in zip(cols["date"], cols["name"], cols["floating"]):
+        if not floating:
+            now[date].append(name)
+    changes = []
+    for date in sorted(before):
+        removed = [n for n in before[date] if n not in now.get(date, [])]
+        added = [n for n in now.get(date, []) if n not in before[date]]
+        mm, dd = (int(part) for part in date.split("-"))
+        for old, new in zip(removed, added):
+            changes.append({"date": f"{calendar.month_abbr[mm]} {dd}", "old": old, "new": new})
+    return changes
+
+
+def build(cols, year: int, previous_corrections):
+    total = len(cols["name"])
+    fixed = [not f for f in cols["floating"]]
+    fixed_total = sum(fixed)
+    fixed_categories = Counter(c for c, is_fixed in zip(cols["category"], fixed) if is_fixed)
+    categories = Counter(cols["category"])
+    food_names = [n for n, c in zip(cols["name"], cols["category"]) if c == FOOD_CATEGORY]
+    subtypes = Counter(food_subtype(n) for n in food_names)
+    fixed_subtypes = Counter(food_subtype(n) for n, c, is_fixed in zip(cols["name"], cols["category"], fixed)
+                             if is_fixed and c == FOOD_CATEGORY)
+    subtype_order = [s for s, _ in FOOD_SUBTYPE_RULES] + [OTHER_FOOD]
+    emoji = Counter(e for e in cols["emoji"] if e)
+    lowered = [n.lower() for n in cols["name"]]
+    prefixes = {key: sum(1 for n in lowered if n.startswith(p)) for key, p in NAME_PREFIXES}
+    prefixes["plain_name"] = total - sum(prefixes.values())
+    # Stable sort: equal lengths stay in calendar order.
+    longest = sorted(range(total), key=lambda i: -len(cols["name"][i]))[:LONGEST_NAMES]
+    longest_names = [{"name": cols["name"][i], "length": len(cols["name"][i])} for i in longest]
+    facts_total = sum(cols["fact_count"])
+    longest_fact = max(range(total), key=lambda i: len(cols["longest_fact"][i]))
+    floating_rows = [i for i in range(total) if cols["floating"][i]]
+    resolved = [i for i in floating_rows if cols["rule_type"][i]]
+
+    data = {
+        "generated_at": None,
+        "total_records": total,
+        "total_fixed_date": fixed_total,
+        "total_floating_date": len(floating_rows),
+        "floating_with_resolved_rule": len(resolved),
+        "floating_without_rule": len(floating_rows) - len(resolved),
+        "category_breakdown": [
+            {"category": c, "count": n, "share_percent": round(100 * n / total, 2)}
+            for c, n in ordered_counts(categories, CATEGORIES)
+        ],
+        "food_subtypes": {
+            "total_food_records": len(food_names),
+            "breakdown": dict(ordered_counts(subtypes, subtype_order)),
+        },
+        "top_emoji": [{"emoji": e, "count": n} for e, n in emoji.most_common(TOP_EMOJI)],
+        "unique_emoji_count": len(emoji),
+        "naming_patterns": prefixes,
+        "obscurity_index": {
+            "longest_names": longest_names,
+            "niche_themed_count": matches_any(cols["name"], NICHE_KEYWORDS),
+            "hobby_themed_count": matches_any(cols["name"], HOBBY_KEYWORDS),
+        },
+        "fun_facts": {
+            "total_facts": facts_total,
+            "avg_facts_per_observance": round(facts_total / total, 2),
+            "longest_fact": {"observance": cols["name"][longest_fact], "text": cols["longest_fact"][longest_fact]},
+        },
+        "corrections_since_february": previous_corrections,
+        "methodology_note": METHODOLOGY_NOTE.format(year=year),
+    }
+
+    chart_dir = CHART_DIR / f"{year}-national-day-report"
+    manifest = {
+        "generated_at": None,
+        # Charts cover the fixed-date population, like the validation file.
+        "total_records": fixed_total,
+        "category_counts": {category_key(c): fixed_categories[c] for c in CATEGORIES if fixed_categories[c]},
+        "food_subcategories": {s: fixed_subtypes[s] for s in subtype_order},
+        "animal_vs_awareness": {
+            "animals_nature": fixed_categories["Animals & Nature"],
+            "awareness_advocacy": fixed_categories["Awareness & Advocacy"],
+        },
+        "longest_names": longest_names,
+        "chart_files": sorted(p.name for p in chart_dir.glob("*.svg")),
+    }
+
+    months = Counter(m for m, is_fixed in zip(cols["month"], fixed) if is_fixed)
+    crowded = Counter(d for d, is_fixed in zip(cols["date"], fixed) if is_fixed)
+    weekdays = Counter()
+    for month, day in zip(cols["month"], cols["day"]):
+        if month and calendar.monthrange(year, month)[1] >= day:
+            weekdays[datetime.date(year, month, day).weekday()] += 1
+    validation = {
+        "total_holidays": fixed_total,
+        "months": [
+            {"month": calendar.month_name[m], "month_num": f"{m:02d}", "count": months[m]} for m in range(1, 13)
+        ],
+        "category_counts": [
+            {"category": category_key(c), "count": n, "percent": round(100 * n / fixed_total, 2)}
+            for c, n in ordered_counts(fixed_categories, CATEGORIES)
+        ],
+        "top_5_crowded_dates": [{"date": d, "count": n} for d, n in crowded.most_common(CROWDED_DATES)],
+        # Fixed dates plus floating holidays resolved for the year; Feb 29 drops out in non-leap years.
+        "weekdays": [{"weekday": calendar.day_name[w], "count": weekdays[w]} for w in range(7)],
+        "floating_rules": dict(sorted(Counter(t for t in cols["rule_type"] if t).items())),
+        "notes": VALIDATION_NOTES,
+    }
+    return data, manifest, validation
+
+
+def rows_csv(cols) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["date", "name", "category", "emoji", "floating"])
+    for row in zip(cols["date"], cols["name"], cols["category"], cols["emoji"], cols["floating"]):
+        writer.writerow(row)
+    return out.getvalue()
+
+
+def diff(expected, actual, path=""):
+    """Yield 'path: expected != actual' for every differing leaf."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in list(expected) + [k for k in actual if k not in expected]:
+            if key != "generated_at":
+                yield from diff(expected.get(key), actual.get(key), f"{path}.{key}" if path else key)
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            yield from diff(e, a, f"{path}[{i}]")
+    elif expected != actual:
+        yield f"{path}: {json.dumps(actual, ensure_ascii=False)} != {json.dumps(expected, ensure_ascii=False)}"
+
+
+def load_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the National Day report data files for a year.")
+    parser.add_argument("--year", type=int, default=datetime.date.today().year, help="Report year (default: this year)")
+    parser.add_argument("--categories", type=Path, help="Rows CSV to carry categories from (default: latest for --year)")
+    parser.add_argument("--baseline-rows", type=Path, help="Earlier rows CSV to compute corrections against")
+    parser.add_argument("--check", action="store_true", help="Compare with the files on disk instead of writing")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    categories_csv = args.categories or default_categories_csv(args.year)
+    if not categories_csv or not categories_csv.exists():
+        raise SystemExit("No rows CSV to carry categories from; pass --categories")
+
+    started = time.perf_counter()
+    with build_profile.session(args, "build_national_day_report") as prof:
+        with prof.phase("parse"):
+            lookup = category_lookup(categories_csv)
+            cols = load_columns(HOLIDAYS_JSON, args.year, lookup)
+        unassigned = [n for n, c in zip(cols["name"], cols["category"]) if not c]
+        cols["category"] = [c or FALLBACK_CATEGORY for c in cols["category"]]
+
+        existing = {kind: load_json(report_path(args.year, kind))
+                    for kind in ("data.json", "chart_manifest.json", "data_validation.json")}
+        if args.baseline_rows:
+            previous_corrections = corrections(cols, args.baseline_rows)
+        else:
+            previous_corrections = (existing["data.json"] or {}).get("corrections_since_february", [])
+
+        with prof.phase("aggregate"):
+            data, manifest, validation = build(cols, args.year, previous_corrections)
+
+        outputs = {"rows.csv": rows_csv(cols), "data.json": data,
+                   "chart_manifest.json": manifest, "data_validation.json": validation}
+        problems = []
+        written = 0
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        for kind, content in outputs.items():
+            path = report_path(args.year, kind)
+            if kind == "rows.csv":
+                if args.check:
+                    on_disk = path.read_text(encoding="utf-8") if path.exists() else ""
+                    if on_disk.replace("\r\n", "\n") != content.replace("\r\n", "\n"):
+                        problems.append(f"{path}: rows differ")
+                else:
+                    with prof.phase("write"):
+                        written += write_text_if_changed(path, content)
+                continue
+            old = existing[kind]
+            differences = list(diff(content, old)) if old is not None else [f"{path}: missing"]
+            if args.check:
+                problems.extend(f"{path.name} {d}" for d in differences)
+                continue
+            if "generated_at" in content:
+                # Same figures keep the old timestamp, so an unchanged report stays byte-identical.
+                content["generated_at"] = old.get("generated_at") if old and not differences else now
+            with prof.phase("write"):
+                written += write_text_if_changed(path, json.dumps(content, indent=2, ensure_ascii=False))
+
+    elapsed = time.perf_counter() - started
+    print(f"{args.year} report: {data['total_records']} observances ({data['total_fixed_date']} fixed, "
+          f"{data['total_floating_date']} floating), {len(data['category_breakdown'])} categories "
+          f"from {categories_csv}; {elapsed * 1000:.0f} ms.")
+    if unassigned:
+        print(f"{len(unassigned)} observance(s) not in {categories_csv.name}, filed under {FALLBACK_CATEGORY}:")
+        for name in unassigned:
+            print(f"  {name}")
+    if args.check:
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise SystemExit(f"{len(problems)} figure(s) differ from the files on disk")
+        print("All figures match the files on disk.")
+    else:
+        print(f"{written} file(s) written to {REPORTS_DIR}/.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Opt-in profiling for the site maintenance scripts.
+
+Each script takes --profile [TRACE] and --cprofile PSTATS (see add_arguments).
+With --profile, the script's phases (walk, read, transform, write, ...), bytes
+read and written, and per-page latency are recorded, a summary is printed,
+and a Chrome trace JSON is written (default .build/profile/<script>.json;
+opens in chrome://tracing, ui.perfetto.dev or speedscope.app). --cprofile
+dumps cProfile stats for pstats/snakeviz.
+
+Time inside a page() span that no nested phase claims is reported as
+"transform", so scripts only need to route their reads and writes through
+the profiler:
+
+    with build_profile.session(args, "generate_seo_pages") as prof:
+        for dirpath, _, filenames in prof.iter("walk", os.walk(root)):
+            with prof.page(slug):
+                html = prof.read_text(path)
+                ...
+                prof.write_text(path, html)
+
+When profiling is off, phase()/page() return one shared no-op context
+manager and read_text()/write_text() are plain file reads and writes.
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+DEFAULT_DIR = Path(".build") / "profile"
+OUTLIERS = 10
+
+_NULL = contextlib.nullcontext()
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--profile", nargs="?", const="", metavar="TRACE",
+                        help=f"Record phase timings and write a Chrome trace (default: {DEFAULT_DIR}/<script>.json)")
+    parser.add_argument("--cprofile", metavar="PSTATS", help="Also dump cProfile stats to PSTATS")
+
+
+class _Span:
+    __slots__ = ("prof", "name", "cat", "args", "start", "child")
+
+    def __init__(self, prof, name, cat, args):
+        self.prof = prof
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.child = 0
+        self.prof._stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        prof = self.prof
+        prof._stack.pop()
+        dur = end - self.start
+        if prof._stack:
+            prof._stack[-1].child += dur
+        # Pages have no phase of their own: their unclaimed time is transform.
+        phase = "transform" if self.cat == "page" else self.name
+        prof.totals[phase] += dur - self.child
+        prof.calls[phase] += 1
+        if self.cat == "page":
+            prof.pages.append((dur, self.name))
+        prof.events.append((self.name, self.cat, self.start, dur, self.args))
+        return False
+
+
+class Profile:
+    def __init__(self, name: str, trace_path=None):
+        self.name = name
+        self.trace_path = Path(trace_path) if trace_path is not None else None
+        self.enabled = trace_path is not None
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.totals = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.pages = []
+        self.events = []
+        self.notes = {}
+        # Set by write_journal.session(): write_text() then stages through it.
+        self.journal = None
+        self._stack = []
+        self._t0 = time.perf_counter_ns()
+
+    def phase(self, name: str, **args):
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, "phase", args)
+
+    def page(self, name: str):
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, "page", None)
+
+    def iter(self, phase: str, iterable):
+        """Yield from iterable, charging the time spent producing each item to phase."""
+        if not self.enabled:
+            yield from iterable
+            return
+        it = iter(iterable)
+        while True:
+            with self.phase(phase):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def read_text(self, path) -> str:
+        if not self.enabled:
+            return Path(path).read_text(encoding="utf-8")
+        with self.phase("read"):
+            with open(path, encoding="utf-8") as fh:
+                self.bytes_read += os.fstat(fh.fileno()).st_size
+                return fh.read()
+
+    def write_text(self, path, text: str) -> None:
+        if self.journal is not None:
+            with self.phase("write"):
+                self.bytes_written += self.journal.write_text(path, text)
+            return
+        if not self.enabled:
+            Path(path).write_text(text, encoding="utf-8")
+            return
+        with self.phase("write"):
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text)
+                self.bytes_written += fh.tell()
+
+    def add_read(self, nbytes: int) -> None:
+        self.bytes_read += nbytes
+
+    def add_written(self, nbytes: int) -> None:
+        self.bytes_written += nbytes
+
+    def note(self, key: str, value) -> None:
+        """Attach extra JSON-serialisable data to the trace (e.g. rule timings)."""
+        if self.enabled:
+            self.notes[key] = value
+
+    def finish(self) -> None:
+        if not self.enabled:
+            return
+        total = time.perf_counter_ns() - self._t0
+        pid = os.getpid()
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        for name, cat, start, dur, args in self.events:
+            event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": 0,
+                     "ts": (start - self._t0) / 1000, "dur": dur / 1000}
+            if args:
+                event["args"] = args
+            trace.append(event)
+        slowest = sorted(self.pages, reverse=True)[:OUTLIERS]
+        summary = {
+            "script": self.name,
+            "total_s": total / 1e9,
+            "phases": {k: {"seconds": v / 1e9, "calls": self.calls[k]} for k, v in self.totals.items()},
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "pages": len(self.pages),
+            "slowest_pages": [{"page": name, "ms": dur / 1e6} for dur, name in slowest],
+        }
+        summary.update(self.notes)
+
+        self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        self.trace_path.write_text(
+            json.dumps({"traceEvents": trace, "displayTimeUnit": "ms", "otherData": summary}),
+            encoding="utf-8",
+        )
+
+        print(f"Profile: {self.name} {total / 1e9:.3f} s")
+        for phase, ns in sorted(self.totals.items(), key=lambda kv: -kv[1]):
+            print(f"  {phase:<12} {ns / 1e9:8.3f} s  {self.calls[phase]:>7} call(s)")
+        print(f"  read {self.bytes_read / 1e6:.2f} MB, wrote {self.bytes_written / 1e6:.2f} MB")
+        if self.pages:
+            durs = sorted(dur for dur, _ in self.pages)
+            p50 = durs[len(durs) // 2] / 1e6
+            p95 = durs[min(len(durs) - 1, len(durs) * 95 // 100)] / 1e6
+            print(f"  {len(durs)} page(s): p50 {p50:.2f} ms, p95 {p95:.2f} ms; slowest:")
+            for dur, name in slowest:
+                print(f"    {dur / 1e6:8.2f} ms  {name}")
+        print(f"Trace written to {self.trace_path}")
+
+
+@contextlib.contextmanager
+def session(args, name: str):
+    """Yield a Profile configured from --profile/--cprofile; writes the outputs on exit."""
+    trace_path = None
+    if args.profile is not None:
+        trace_path = args.profile or DEFAULT_DIR / f"{name}.json"
+    prof = Profile(name, trace_path)
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield prof
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"cProfile stats written to {args.cprofile}")
+        prof.finish()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Generate sw.js and sw-manifest.json: a service worker for repeat visits.
+
+Readers who follow the "Continue your streak" links and the #next-rail
+re-fetch the same chrome, styles and badges on every holiday page. The
+manifest lists, with the content hash of each file (build_cache.content_hash,
+the hash .build/precompress.json records):
+
+- shared: SHARED_GLOBS (styles, deferred CSS, brand images, favicons);
+  precached when the worker installs and served cache-first;
+- assets: ASSET_GLOBS (holiday badges, WebP variants); cached on first use
+  and served cache-first;
+- pages: every /holiday/<slug>/ page; served stale-while-revalidate;
+- continue: each page's #continue links, warmed into the cache after the
+  page is shown.
+
+Every cached response is stored under cache_key(url, hash), i.e.
+"<url>?v=<first HASH_CHARS hex digits>". A deploy changes the keys of the
+files that changed and nothing else: on activation the worker deletes the
+keys the new manifest no longer lists and keeps the rest. sw.js embeds the
+manifest version, so any change to the manifest makes browsers install the
+new worker. Holiday pages get a one-line registration <script data-sw>
+before </body>.
+
+--check rebuilds the manifest in memory and verifies, without a browser,
+that sw-manifest.json and sw.js match the tree, that cache keys are unique,
+that sw.js derives keys the same way cache_key() does, and that every
+#continue target is a page in the manifest. It exits 1 on any mismatch.
+--since OLD.json prints the keys a deploy would invalidate.
+
+Usage:
+  python3 build_service_worker.py
+  python3 build_service_worker.py --check
+  python3 build_service_worker.py --check --since /tmp/old-sw-manifest.json
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+
+import build_profile
+from build_cache import content_hash, write_text_if_changed
+from generate_holiday_index import HOLIDAY_DIR, MONTHS_DIR, PAGE_DIR
+
+ROOT = Path(".")
+MANIFEST = Path("sw-manifest.json")
+WORKER = Path("sw.js")
+HASH_CHARS = 12
+SHARED_GLOBS = ["styles.css", "assets/analytics.js", "assets/css/*.css", "assets/app-icon.png", "assets/brands/*", "favicon*"]
+ASSET_GLOBS = ["assets/badges/*.svg", "assets/responsive/*.webp"]
+LIBRARY_DIRS = {MONTHS_DIR.name, PAGE_DIR.name}
+
+CONTINUE_RE = re.compile(r'<section\b[^>]*\bid="continue"[^>]*>(.*?)</section>', re.DOTALL)
+HOLIDAY_HREF_RE = re.compile(r'href="(?:https://www\.obscureholidaycalendar\.com)?(/holiday/[^"/?#]+/)"')
+REGISTER_SCRIPT = "<script data-sw>if ('serviceWorker' in navigator) navigator.serviceWorker.register('/sw.js');</script>"
+REGISTER_RE = re.compile(r"[ \t]*<script data-sw>.*?</script>\n?")
+JS_HASH_CHARS_RE = re.compile(r"const HASH_CHARS = (\d+);")
+JS_KEY_RE = re.compile(r"return url \+ '\?v=' \+ hash\.slice\(0, HASH_CHARS\);")
+
+WORKER_JS = """// Generated by build_service_worker.py from sw-manifest.json; do not edit.
+const VERSION = '{version}';
+const HASH_CHARS = {hash_chars};
+const SHARED_CACHE = 'ohc-shared';
+const PAGE_CACHE = 'ohc-pages';
+const MANIFEST_URL = '/sw-manifest.json';
+let manifestPromise = null;
+
+function cacheKey(url, hash) {{
+  return url + '?v=' + hash.slice(0, HASH_CHARS);
+}}
+
+function loadManifest() {{
+  if (!manifestPromise) {{
+    manifestPromise = caches.open(SHARED_CACHE)
+      .then((cache) => cache.match(cacheKey(MANIFEST_URL, VERSION)))
+      .then((res) => res || fetch(MANIFEST_URL, {{ cache: 'no-store' }}))
+      .then((res) => res.json());
+  }}
+  return manifestPromise;
+}}
+
+async function precache(cache, url, hash) {{
+  const key = cacheKey(url, hash);
+  if (await cache.match(key)) return;
+  const res = await fetch(url, {{ cache: 'no-cache' }});
+  if (res.ok) await cache.put(key, res);
+}}
+
+self.addEventListener('install', (event) => {{
+  event.waitUntil((async () => {{
+    const res = await fetch(MANIFEST_URL, {{ cache: 'no-store' }});
+    const manifest = await res.clone().json();
+    if (manifest.version !== VERSION) throw new Error('sw-manifest.json does not match sw.js');
+    const cache = await caches.open(SHARED_CACHE);
+    await cache.put(cacheKey(MANIFEST_URL, VERSION), res);
+    await Promise.all(Object.entries(manifest.shared).map(([url, hash]) => precache(cache, url, hash)));
+    self.skipWaiting();
+  }})());
+}});
+
+self.addEventListener('activate', (event) => {{
+  event.waitUntil((async () => {{
+    const manifest = await loadManifest();
+    const keep = new Set([cacheKey(MANIFEST_URL, VERSION)]);
+    for (const group of [manifest.shared, manifest.assets, manifest.pages]) {{
+      for (const [url, hash] of Object.entries(group)) keep.add(cacheKey(url, hash));
+    }}
+    for (const name of [SHARED_CACHE, PAGE_CACHE]) {{
+      const cache = await caches.open(name);
+      for (const request of await cache.keys()) {{
+        const url = new URL(request.url);
+        if (!keep.has(url.pathname + url.search)) await cache.delete(request);
+      }}
+    }}
+    await self.clients.claim();
+  }})());
+}});
+
+function pagePath(pathname) {{
+  if (pathname.endsWith('/index.html')) return pathname.slice(0, -'index.html'.length);
+  return pathname.endsWith('/') ? pathname : pathname + '/';
+}}
+
+async function cacheFirst(url, hash) {{
+  const cache = await caches.open(SHARED_CACHE);
+  const key = cacheKey(url, hash);
+  const cached = await cache.match(key);
+  if (cached) return cached;
+  const res = await fetch(url);
+  if (res.ok) await cache.put(key, res.clone());
+  return res;
+}}
+
+async function warmContinue(manifest, path) {{
+  const cache = await caches.open(PAGE_CACHE);
+  const next = manifest.continue[path] || [];
+  await Promise.all(next.filter((url) => manifest.pages[url]).map((url) => precache(cache, url, manifest.pages[url])));
+}}
+
+async function staleWhileRevalidate(event, manifest, path) {{
+  const cache = await caches.open(PAGE_CACHE);
+  const key = cacheKey(path, manifest.pages[path]);
+  const cached = await cache.match(key) || await cache.match(path, {{ ignoreSearch: true }});
+  const refresh = fetch(event.request).then(async (res) => {{
+    if (res.ok) {{
+      for (const old of await cache.keys(path, {{ ignoreSearch: true }})) await cache.delete(old);
+      await cache.put(key, res.clone());
+    }}
+    return res;
+  }});
+  event.waitUntil(refresh.catch(() => null).then(() => warmContinue(manifest, path)));
+  return cached || refresh;
+}}
+
+self.addEventListener('fetch', (event) => {{
+  const url = new URL(event.request.url);
+  if (event.request.method !== 'GET' || url.origin !== self.location.origin) return;
+  event.respondWith(loadManifest().then((manifest) => {{
+    const hash = manifest.shared[url.pathname] || manifest.assets[url.pathname];
+    if (hash) return cacheFirst(url.pathname, hash);
+    const path = pagePath(url.pathname);
+    if (event.request.mode === 'navigate' && manifest.pages[path]) return staleWhileRevalidate(event, manifest, path);
+    return fetch(event.request);
+  }}).catch(() => fetch(event.request)));
+}});
+"""
+
+
+def cache_key(url: str, digest: str) -> str:
+    """The Cache Storage key sw.js uses for url at this content hash."""
+    return f"{url}?v={digest[:HASH_CHARS]}"
+
+
+def _hash_globs(globs):
+    found = {}
+    for pattern in globs:
+        for path in sorted(ROOT.glob(pattern)):
+            if path.is_file() and not path.name.endswith((".gz", ".br", ".tmp")):
+                found["/" + path.relative_to(ROOT).as_posix()] = content_hash(path.read_bytes())
+    return found
+
+
+def build_manifest(prof) -> dict:
+    with prof.phase("hash-assets"):
+        shared = _hash_globs(SHARED_GLOBS)
+        assets = _hash_globs(ASSET_GLOBS)
+    pages, follow = {}, {}
+    for folder in prof.iter("pages", sorted(Path(HOLIDAY_DIR).iterdir())):
+        index = folder / "index.html"
+        if folder.name in LIBRARY_DIRS or not index.is_file():
+            continue
+        data = index.read_bytes()
+        prof.add_read(len(data))
+        url = f"/holiday/{folder.name}/"
+        # The registration tag is added after hashing, so it never changes a page's key.
+        html = REGISTER_RE.sub("", data.decode("utf-8"))
+        pages[url] = content_hash(html.encode("utf-8"))
+        section = CONTINUE_RE.search(html)
+        if section:
+            follow[url] = list(dict.fromkeys(HOLIDAY_HREF_RE.findall(section.group(1))))
+    body = {"shared": shared, "assets": assets, "pages": pages, "continue": follow}
+    version = content_hash(json.dumps(body, sort_keys=True).encode("utf-8"))[:HASH_CHARS]
+    return {"version": version, **body}
+
+
+def cache_keys(manifest: dict) -> set:
+    keys = {cache_key("/" + MANIFEST.name, manifest["version"])}
+    for group in ("shared", "assets", "pages"):
+        keys.update(cache_key(url, digest) for url, digest in manifest[group].items())
+    return keys
+
+
+def render_worker(manifest: dict) -> str:
+    return WORKER_JS.format(version=manifest["version"], hash_chars=HASH_CHARS)
+
+
+def register_pages(prof, pages) -> int:
+    changed = 0
+    for url in pages:
+        path = ROOT / url.strip("/") / "index.html"
+        html = prof.read_text(path)
+        if REGISTER_SCRIPT in html:
+            continue
+        body_end = html.lower().rfind("</body>")
+        if body_end == -1:
+            continue
+        html = REGISTER_RE.sub("", html)
+        body_end = html.lower().rfind("</body>")
+        prof.write_text(path, html[:body_end] + "  " + REGISTER_SCRIPT + "\n" + html[body_end:])
+        changed += 1
+    return changed
+
+
+def check(manifest: dict) -> list:
+    """Problems with the sw.js / sw-manifest.json on disk, given the manifest the tree produces now."""
+    problems = []
+    if not MANIFEST.exists() or not WORKER.exists():
+        return [f"{MANIFEST} or {WORKER} missing; run build_service_worker.py"]
+    on_disk = json.loads(MANIFEST.read_text(encoding="utf-8"))
+    for group in ("shared", "assets", "pages"):
+        old, new = on_disk.get(group, {}), manifest[group]
+        stale = sorted(url for url in new if old.get(url) != new[url])
+        gone = sorted(old.keys() - new.keys())
+        problems += [f"{group}: {url} hash is stale" for url in stale if url in old]
+        problems += [f"{group}: {url} not in the manifest" for url in stale if url not in old]
+        problems += [f"{group}: {url} listed but no longer exists" for url in gone]
+    if on_disk.get("version") != manifest["version"]:
+        problems.append(f"version {on_disk.get('version')} != {manifest['version']}")
+
+    worker = WORKER.read_text(encoding="utf-8")
+    if worker != render_worker(on_disk):
+        problems.append(f"{WORKER} was not generated from {MANIFEST}")
+    m = JS_HASH_CHARS_RE.search(worker)
+    if not m or int(m.group(1)) != HASH_CHARS or not JS_KEY_RE.search(worker):
+        problems.append(f"{WORKER} builds cache keys differently from cache_key()")
+
+    count = sum(len(manifest[group]) for group in ("shared", "assets", "pages")) + 1
+    if len(cache_keys(manifest)) != count:
+        problems.append("cache keys collide; raise HASH_CHARS")
+    for url, targets in manifest["continue"].items():
+        problems += [f"continue: {url} links to {target}, which is not a page" for target in targets if target not in manifest["pages"]]
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the service worker and its precache manifest.")
+    parser.add_argument("--check", action="store_true", help="Verify sw.js and sw-manifest.json against the tree; write nothing")
+    parser.add_argument("--since", metavar="OLD_MANIFEST", help="Report the cache keys invalidated since this manifest")
+    parser.add_argument("--no-register", action="store_true", help="Don't add the registration script to holiday pages")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    with build_profile.session(args, "build_service_worker") as prof:
+        manifest = build_manifest(prof)
+        previous = args.since or (MANIFEST if MANIFEST.exists() else None)
+        old_keys = cache_keys(json.loads(Path(previous).read_text(encoding="utf-8"))) if previous else set()
+        problems = check(manifest) if args.check else []
+        registered = 0
+        if not args.check:
+            write_text_if_changed(MANIFEST, json.dumps(manifest, sort_keys=True, separators=(",", ":")) + "\n")
+            write_text_if_changed(WORKER, render_worker(manifest))
+            if not args.no_register:
+                registered = register_pages(prof, manifest["pages"])
+
+    keys = cache_keys(manifest)
+    print(f"Manifest {manifest['version']}: {len(manifest['shared'])} shared, {len(manifest['assets'])} assets, "
+          f"{len(manifest['pages'])} pages, {sum(map(len, manifest['continue'].values()))} continue links.")
+    if previous:
+        invalidated = sorted(old_keys - keys)
+        print(f"{len(invalidated)} of {len(old_keys)} cache key(s) invalidated since {previous}, {len(keys - old_keys)} new.")
+        for key in invalidated[:10]:
+            print(f"  - {key}")
+    if registered:
+        print(f"Added the registration script to {registered} page(s).")
+    if args.check:
+        for problem in problems:
+            print(f"- {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("sw.js and sw-manifest.json match the tree.")
+
+
+if __name__ == "__main__":
+    main()
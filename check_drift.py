@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Reconcile the holiday slug sets the site is built from, before a publish.
+
+Four sources are loaded once each and compared as sets:
+- holidays.json: fixed and floating entries (slug field, else slugify(name))
+- holiday/<slug>/index.html: only the <head> is read, for the canonical URL
+- bot/holidays.json: the Discord bot's copy, compared entry by entry
+- sitemaps/sitemap-<year>-MM.xml: the /holiday/<slug>/ URLs listed
+
+Reported drift:
+- missing pages: entries with no holiday/<slug>/ page
+- orphan pages: pages with no entry
+- canonical mismatches: pages whose canonical URL names another slug
+- stale bot data: entries missing from, extra in or different in the bot
+  copy (update_holidays_from_firebase.sh interrupted, or the bot copy
+  edited by hand)
+- sitemap omissions: pages not in that year's sitemaps, and sitemap URLs
+  with no page
+
+The library's own directories (holiday/page/, holiday/months/) are not
+holiday pages. Exits 1 when anything drifted, so it can gate a publish.
+
+Usage:
+  python3 check_drift.py
+  python3 check_drift.py --year 2027 --limit 50 --json-out drift.json
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from generate_holiday_index import HOLIDAY_DIR, MONTHS_DIR, PAGE_DIR
+from generate_sitemaps import CURRENT_YEAR, OUTPUT_DIR
+from holiday_data import entry_index
+
+HOLIDAYS_JSON = Path("holidays.json")
+BOT_JSON = Path("bot") / "holidays.json"
+LIBRARY_DIRS = {MONTHS_DIR.name, PAGE_DIR.name}
+HEAD_CHUNK = 4096
+CANONICAL_RE = re.compile(r'<link\s+rel=["\']canonical["\']\s+href=["\'][^"\']*/holiday/([^"\'/]+)/?["\']', re.IGNORECASE)
+SITEMAP_LOC_RE = re.compile(r"<loc>[^<]*/holiday/([^<\"/]+)/</loc>")
+
+
+def read_head(path: Path) -> str:
+    """Read until the canonical link or </head>, whichever comes first."""
+    text = ""
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        while True:
+            chunk = fh.read(HEAD_CHUNK)
+            text += chunk
+            if not chunk or CANONICAL_RE.search(text) or "</head>" in text.lower():
+                return text
+
+
+def load_pages():
+    """{dir name: canonical slug or None} for every holiday page."""
+    pages = {}
+    with os.scandir(HOLIDAY_DIR) as it:
+        for entry in it:
+            if not entry.is_dir() or entry.name in LIBRARY_DIRS:
+                continue
+            index = Path(entry.path) / "index.html"
+            if not index.exists():
+                continue
+            m = CANONICAL_RE.search(read_head(index))
+            pages[entry.name] = m.group(1) if m else None
+    return pages
+
+
+def load_sitemap_slugs(year: int):
+    slugs = set()
+    for month in range(1, 13):
+        path = Path(OUTPUT_DIR) / f"sitemap-{year}-{month:02d}.xml"
+        if path.exists():
+            slugs.update(SITEMAP_LOC_RE.findall(path.read_text(encoding="utf-8")))
+    return slugs
+
+
+def reconcile(year: int):
+    """Return {check: sorted list of slugs} (empty lists for clean checks)."""
+    entries = entry_index(HOLIDAYS_JSON)
+    pages = load_pages()
+    if BOT_JSON.exists() and BOT_JSON.read_bytes() == HOLIDAYS_JSON.read_bytes():
+        bot = entries
+    else:
+        bot = entry_index(BOT_JSON) if BOT_JSON.exists() else {}
+    listed = load_sitemap_slugs(year)
+
+    return {
+        "missing_pages": sorted(entries.keys() - pages.keys()),
+        "orphan_pages": sorted(pages.keys() - entries.keys()),
+        "canonical_mismatch": sorted(name for name, canonical in pages.items() if canonical != name),
+        "bot_missing": sorted(entries.keys() - bot.keys()),
+        "bot_extra": sorted(bot.keys() - entries.keys()),
+        "bot_changed": sorted(slug for slug in entries.keys() & bot.keys() if entries[slug][0] != bot[slug][0]),
+        "sitemap_omissions": sorted(pages.keys() - listed),
+        "sitemap_dead": sorted(listed - pages.keys()),
+    }, {"entries": len(entries), "pages": len(pages), "bot": len(bot), "sitemap": len(listed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report drift between holidays.json, holiday/ pages, the bot copy and the sitemaps.")
+    parser.add_argument("--year", type=int, default=CURRENT_YEAR, help=f"Sitemap year to check (default: {CURRENT_YEAR})")
+    parser.add_argument("--limit", type=int, default=10, help="Slugs to print per check (default: 10)")
+    parser.add_argument("--json-out", help="Also write the full report as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    drift, counts = reconcile(args.year)
+    elapsed = time.perf_counter() - start
+
+    print(f"holidays.json {counts['entries']} entries, holiday/ {counts['pages']} pages, "
+          f"bot {counts['bot']} entries, {args.year} sitemaps {counts['sitemap']} URLs ({elapsed:.2f} s)")
+    for check, slugs in drift.items():
+        status = "ok" if not slugs else len(slugs)
+        print(f"  {check:<20} {status}")
+        for slug in slugs[:args.limit]:
+            print(f"    {slug}")
+        if len(slugs) > args.limit:
+            print(f"    ...and {len(slugs) - args.limit} more")
+    if args.json_out:
+        report = {"year": args.year, "counts": counts, "drift": drift}
+        Path(args.json_out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Report written to {args.json_out}")
+    if any(drift.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
+import argparse
 import os
 import re
 from pathlib import Path
 
+import build_profile
+import write_journal
+
 
 HOLIDAY_DIR = Path("holiday")
 
@@ -69,42 +73,51 @@ def trim_after_html(html):
     return html[:end_pos]
 
 
-def main():
-    if not HOLIDAY_DIR.exists():
-        print("holiday/ directory not found.")
-        return
+def clean_page(html):
+    # 1) Extract footer
+    footer_block = extract_footer(html)
 
-    updated = 0
+    # 2) Remove legacy CSS
+    html = remove_legacy_css(html)
 
-    for root, dirs, files in os.walk(HOLIDAY_DIR):
-        if "index.html" not in files:
-            continue
+    # 3) Remove footer from old position
+    if footer_block:
+        html = remove_footer(html, footer_block)
 
-        path = Path(root) / "index.html"
-        html = path.read_text(encoding="utf-8")
+    # 4) Trim any HTML after </html> to clean garbage
+    html = trim_after_html(html)
 
-        original_html = html
+    # 5) Now reinsert footer INSIDE <body>
+    if footer_block:
+        html = place_footer_inside_body(html, footer_block)
 
-        # 1) Extract footer
-        footer_block = extract_footer(html)
+    return html
 
-        # 2) Remove legacy CSS
-        html = remove_legacy_css(html)
 
-        # 3) Remove footer from old position
-        if footer_block:
-            html = remove_footer(html, footer_block)
+def main():
+    parser = argparse.ArgumentParser(description="Final cleanup pass over holiday pages (legacy CSS, footer placement).")
+    build_profile.add_arguments(parser)
+    write_journal.add_arguments(parser)
+    args = parser.parse_args()
 
-        # 4) Trim any HTML after </html> to clean garbage
-        html = trim_after_html(html)
+    if not HOLIDAY_DIR.exists():
+        print("holiday/ directory not found.")
+        return
 
-        # 5) Now reinsert footer INSIDE <body>
-        if footer_block:
-            html = place_footer_inside_body(html, footer_block)
+    updated = 0
 
-        if html != original_html:
-            path.write_text(html, encoding="utf-8")
-            updated += 1
+    with build_profile.session(args, "cleanup_final_pass") as prof, write_journal.session(args, "cleanup_final_pass", prof):
+        for root, dirs, files in prof.iter("walk", os.walk(HOLIDAY_DIR)):
+            if "index.html" not in files:
+                continue
+
+            path = Path(root) / "index.html"
+            with prof.page(path.parent.name):
+                original_html = prof.read_text(path)
+                html = clean_page(original_html)
+                if html != original_html:
+                    prof.write_text(path, html)
+                    updated += 1
 
     print(f"Final cleanup complete! Updated {updated} holiday pages.")
 
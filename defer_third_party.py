@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Page stage: take third-party origins off the first-render path.
+
+Holiday pages load adsbygoogle.js from <head>, preconnect to five origins
+(two of them, googletagmanager and google-analytics, are never fetched)
+and pull the App Store / Google Play badges from apple.com and google.com
+above the fold. For every page this stage:
+
+- ads: removes the adsbygoogle.js <script> from <head> and loads it from
+  initAdvancedEngagementTracking() once an .ad-section is within
+  AD_ROOT_MARGIN of the viewport, with an IntersectionObserver next to the
+  ad_viewable one. The inline adsbygoogle.push({}) calls in each slot only
+  queue, so they work either way. Pages without that function keep the
+  head script.
+- badges: points the store badge <img>s at the copies in assets/brands/
+  (BADGES). --fetch-badges downloads any copy that is missing; until a
+  copy exists, pages keep the remote URL.
+- hints: replaces the page's preconnect / dns-prefetch links with ones
+  computed from what the page still loads. Origins of resources in <head>
+  get preconnect; other third-party resources (images, the deferred ad
+  script and the origins it pulls in, AD_ORIGINS) get dns-prefetch; hints
+  for origins the page never fetches are dropped.
+
+Afterwards it reports, per page, the render-blocking resources (head
+scripts without async/defer, head stylesheets) and the third-party
+requests made during the initial load, before and after.
+
+Usage:
+  python3 defer_third_party.py                   # every page under holiday/
+  python3 defer_third_party.py --fetch-badges
+  python3 defer_third_party.py --dry-run --verbose
+"""
+
+import argparse
+import re
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import build_profile
+from build_cache import write_atomic
+from minify_html import iter_pages
+
+DEFAULT_PATHS = ["holiday"]
+SITE_ORIGIN = "https://www.obscureholidaycalendar.com"
+AD_ROOT_MARGIN = "600px 0px"
+BADGES = {
+    "https://developer.apple.com/assets/elements/badges/download-on-the-app-store.svg": "/assets/brands/app-store-badge.svg",
+    "https://play.google.com/intl/en_us/badges/static/images/badges/en_badge_web_generic.png": "/assets/brands/google-play-badge.png",
+}
+# Requested by adsbygoogle.js itself once it runs.
+AD_ORIGINS = ["https://tpc.googlesyndication.com", "https://googleads.g.doubleclick.net"]
+TOP_PAGES = 10
+
+HEAD_ADS_RE = re.compile(r'[ \t]*<script\b[^>]*\bsrc="(https://pagead2\.googlesyndication\.com/pagead/js/adsbygoogle\.js[^"]*)"[^>]*>\s*</script>[ \t]*\n?')
+HINT_RE = re.compile(r'[ \t]*<link\s+rel="(?:preconnect|dns-prefetch)"[^>]*>[ \t]*\n?', re.IGNORECASE)
+TAG_RE = re.compile(r"<(script|link|img|iframe|source)\b[^>]*>", re.IGNORECASE)
+ATTR_RE = re.compile(r'([a-zA-Z-]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+AD_ANCHOR = "const adSections = document.querySelectorAll('.ad-section');"
+AD_LOADER_MARKER = "function loadAds()"
+AD_LOADER = """
+        // adsbygoogle.js is loaded once an ad slot nears the viewport (defer_third_party.py).
+        function loadAds() {{
+          if (window.__adsLoaded) return;
+          window.__adsLoaded = true;
+          const script = document.createElement('script');
+          script.async = true;
+          script.src = '{src}';
+          script.crossOrigin = 'anonymous';
+          document.head.appendChild(script);
+        }}
+        if ('IntersectionObserver' in window && adSections.length) {{
+          const adLoadIo = new IntersectionObserver((entries) => {{
+            if (!entries.some((entry) => entry.isIntersecting)) return;
+            adLoadIo.disconnect();
+            loadAds();
+          }}, {{ rootMargin: '{margin}' }});
+          adSections.forEach((el) => adLoadIo.observe(el));
+        }} else {{
+          loadAds();
+        }}"""
+
+
+def attrs(tag: str):
+    found = {}
+    for m in ATTR_RE.finditer(tag[1:-1]):
+        found[m.group(1).lower()] = next((g for g in m.groups()[1:] if g is not None), "")
+    return found
+
+
+def origin(url: str):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    found = f"{parts.scheme}://{parts.netloc}"
+    return None if found == SITE_ORIGIN else found
+
+
+def resources(html: str):
+    """Yield (url, in_head, blocking, eager, crossorigin) for every subresource tag."""
+    head_end = html.lower().find("</head>")
+    for m in TAG_RE.finditer(html):
+        name = m.group(1).lower()
+        a = attrs(m.group(0))
+        if name == "link":
+            rel = a.get("rel", "").lower()
+            if rel not in ("stylesheet", "preload", "icon", "modulepreload"):
+                continue
+            url = a.get("href")
+            blocking = rel == "stylesheet" and a.get("media", "all") != "print"
+        else:
+            url = a.get("src")
+            blocking = name == "script" and not ({"async", "defer"} & a.keys()) and a.get("type") != "module"
+        if not url:
+            continue
+        in_head = m.start() < head_end
+        blocking = blocking and in_head
+        eager = name != "img" or a.get("loading") != "lazy"
+        yield url, in_head, blocking, eager, "crossorigin" in a
+
+
+def audit(html: str):
+    """Render-blocking resources and third-party requests made during the initial load."""
+    blocking, third_party = [], []
+    for url, in_head, is_blocking, eager, _ in resources(html):
+        if is_blocking:
+            blocking.append(url)
+        if eager and origin(url):
+            third_party.append(url)
+    return blocking, third_party
+
+
+def defer_ads(html: str):
+    """Move adsbygoogle.js from <head> into the engagement script; returns (html, ad script URL or None)."""
+    if AD_LOADER_MARKER in html:
+        m = re.search(r"script\.src = '([^']*)'", html)
+        return html, m.group(1) if m else None
+    m = HEAD_ADS_RE.search(html)
+    if not m or AD_ANCHOR not in html or m.start() > html.lower().find("</head>"):
+        return html, None
+    src = m.group(1)
+    html = html[:m.start()] + html[m.end():]
+    loader = AD_LOADER.format(src=src, margin=AD_ROOT_MARGIN)
+    return html.replace(AD_ANCHOR, AD_ANCHOR + loader, 1), src
+
+
+def vendor_badges(html: str, available) -> str:
+    for remote, local in BADGES.items():
+        if local in available:
+            html = html.replace(f'src="{remote}"', f'src="{local}"')
+    return html
+
+
+def rewrite_hints(html: str, ad_src) -> str:
+    preconnect, prefetch = {}, set()
+    for url, in_head, _, eager, crossorigin in resources(html):
+        found = origin(url)
+        if not found:
+            continue
+        if in_head and eager:
+            preconnect[found] = preconnect.get(found, False) or crossorigin
+        else:
+            prefetch.add(found)
+    if ad_src:
+        prefetch.update([origin(ad_src)] + AD_ORIGINS)
+    prefetch -= preconnect.keys()
+
+    lines = [f'  <link rel="preconnect" href="{o}"{" crossorigin" if cors else ""} />' for o, cors in sorted(preconnect.items())]
+    lines += [f'  <link rel="dns-prefetch" href="{o}" />' for o in sorted(prefetch)]
+    block = "".join(line + "\n" for line in lines)
+
+    head_end = html.lower().find("</head>")
+    first = HINT_RE.search(html, 0, head_end)
+    if first:
+        at = first.start()
+        head = HINT_RE.sub("", html[:head_end])
+        rest = html[head_end:]
+        at = min(at, len(head))
+        return head[:at] + block + head[at:] + rest
+    return html[:head_end] + block + html[head_end:]
+
+
+def transform(html: str, available) -> str:
+    html, ad_src = defer_ads(html)
+    html = vendor_badges(html, available)
+    return rewrite_hints(html, ad_src)
+
+
+def fetch_badges(root: Path) -> None:
+    for remote, local in BADGES.items():
+        path = root / local.lstrip("/")
+        if path.exists():
+            continue
+        request = urllib.request.Request(remote, headers={"User-Agent": "Mozilla/5.0"})
+        try:
+            with urllib.request.urlopen(request, timeout=20) as resp:
+                data = resp.read()
+        except OSError as exc:
+            raise SystemExit(f"Could not fetch {remote}: {exc}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, data)
+        print(f"Vendored {remote} -> {local} ({len(data)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Defer ads, vendor store badges and recompute resource hints on site pages.")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS, help="Files or directories (default: holiday)")
+    parser.add_argument("--fetch-badges", action="store_true", help="Download store badges missing from assets/brands/ first")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    parser.add_argument("--verbose", action="store_true", help="Print the before/after counts for every page")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    root = Path(".")
+    if args.fetch_badges:
+        fetch_badges(root)
+    available = {local for local in BADGES.values() if (root / local.lstrip("/")).exists()}
+    if len(available) < len(BADGES):
+        print("Store badges not vendored yet; pages keep the remote URLs (run with --fetch-badges).")
+
+    rows = []
+    changed = 0
+    with build_profile.session(args, "defer_third_party") as prof:
+        for path in prof.iter("walk", iter_pages(args.paths)):
+            with prof.page(path.as_posix()):
+                html = prof.read_text(path)
+                out = transform(html, available)
+                if out != html:
+                    changed += 1
+                    if not args.dry_run:
+                        prof.write_text(path, out)
+            rows.append((path.as_posix(), audit(html), audit(out)))
+
+    if args.verbose:
+        shown = rows
+    else:
+        shown = sorted(rows, key=lambda r: -(len(r[1][1]) - len(r[2][1])))[:TOP_PAGES]
+    print(f"{'blocking':>13} {'third-party':>13}  page")
+    for page, (blocking, third), (blocking_after, third_after) in shown:
+        print(f"{len(blocking):>6} -> {len(blocking_after):<3} {len(third):>6} -> {len(third_after):<3}  {page}")
+    totals = [sum(len(r[i][j]) for r in rows) for i in (1, 2) for j in (0, 1)]
+    verb = "Would update" if args.dry_run else "Updated"
+    print(f"{verb} {changed} of {len(rows)} page(s). Render-blocking resources {totals[0]} -> {totals[2]}, "
+          f"third-party requests at load {totals[1]} -> {totals[3]}.")
+
+
+if __name__ == "__main__":
+    main()
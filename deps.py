@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Show which pages depend on a holiday, from the index the build records.
+
+The generators record the slugs every page they write renders in
+.build/deps.json (build_cache.DepIndex):
+- library: holiday/index.html, holiday/months/*, holiday/page/N/
+- hubs: holidays/<category>/ and its month pages
+- sitemaps: the monthly sitemap files
+- pages: holiday/<slug>/ pages, for their own slug and the holidays their
+  hand-maintained #related / #continue links point at (recorded by
+  generate_sitemaps.py, which reads every page anyway)
+
+Editing a holiday's name or date invalidates exactly these pages. The
+generated ones are rewritten by the next build (or watch_site.py); the
+"pages" ones link to the holiday by hand and need a look if it was renamed
+or removed.
+
+Usage:
+  python3 deps.py pi-day
+  python3 deps.py pi-day national-donut-day --stage pages
+"""
+
+import argparse
+from collections import defaultdict
+
+from build_cache import DepIndex
+
+STAGES = ("library", "hubs", "sitemaps", "pages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the pages that render or link to a holiday.")
+    parser.add_argument("slugs", nargs="+", metavar="slug", help="Holiday slug(s), as in /holiday/<slug>/")
+    parser.add_argument("--stage", choices=STAGES, help="Only pages from this stage")
+    args = parser.parse_args()
+
+    deps = DepIndex()
+    if not deps.pages:
+        raise SystemExit(f"{deps.path} is empty; run the generators (or watch_site.py --once) first")
+
+    for slug in args.slugs:
+        by_stage = defaultdict(list)
+        for page in deps.dependents(slug):
+            by_stage[deps.stage(page)].append(page)
+        pages = sum(len(by_stage[stage]) for stage in STAGES if not args.stage or stage == args.stage)
+        print(f"{slug}: {pages} page(s)")
+        for stage in STAGES:
+            if args.stage and stage != args.stage or not by_stage[stage]:
+                continue
+            print(f"  {stage} ({len(by_stage[stage])})")
+            for page in by_stage[stage]:
+                print(f"    {page}")
+
+
+if __name__ == "__main__":
+    main()
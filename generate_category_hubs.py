@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Generate the holidays/<category>/ hub pages from holidays.json.
+
+Hub pages on disk are the membership of record: each hub keeps the
+holidays its member section (and month pages) already lists, with names and
+dates refreshed from holidays.json. The national-day report's rows CSV
+(holidays.json has no category field) only files holidays no hub lists yet;
+those not in the CSV go to FALLBACK_CATEGORY, the same bucket the report
+uses for names no keyword matched. The CSV's keyword categories misfile
+some names (Croissant Day under Animals & Nature), so its picks fill new
+hubs directly but are only proposed for a hub that already has a page:
+they are printed, and added with --accept once reviewed. To move a holiday,
+delete it from one hub page and list it on the other. holidays.json is
+streamed once to build a category -> members index, and every hub is
+rendered from that index:
+
+- holidays/<slug>/index.html lists every member, A-Z. Categories with more
+  than MONTH_SPLIT_THRESHOLD members list months instead, and each month gets
+  holidays/<slug>/<month>/index.html with that month's members by date.
+- Members link to holiday/<slug>/; holidays without a page are left out
+  and reported.
+- Existing hubs keep their hand-written copy. Only the member section
+  between <!-- HUB-MEMBERS-START --> and <!-- HUB-MEMBERS-END --> is
+  generated; the first run replaces the hand-made "Cluster Members" section.
+  New hubs are created from HUB_TEMPLATE.
+
+HUB_SLUGS keeps the URLs of the hubs that existed before the generator.
+Floating holidays are placed at their date for this year.
+
+A hash of each page's members is kept in .build/hubs.json. Pages whose
+members haven't changed are skipped. Month pages a hub no longer needs are
+removed. Each page's members are also recorded in .build/deps.json
+(build_cache.DepIndex), skipped pages included. generate_sitemaps.py finds
+hub pages on disk, so new hubs reach the sitemap without editing
+STATIC_PAGE_PATHS.
+
+Usage:
+  python3 generate_category_hubs.py
+  python3 generate_category_hubs.py --force
+  python3 generate_category_hubs.py --accept   # add the proposed members
+"""
+
+import argparse
+import calendar
+import html
+import re
+from collections import defaultdict
+from pathlib import Path
+
+import build_profile
+from build_cache import DepIndex, HashCache, content_hash, write_text_if_changed
+from generate_sitemaps import CURRENT_YEAR, DOMAIN, resolve_date_rule
+from holiday_data import REPORT_ROWS_CSV, category_lookup, iter_floating_holidays, iter_holidays, slugify
+
+HOLIDAYS_JSON = Path("holidays.json")
+HUB_DIR = Path("holidays")
+HOLIDAY_PAGES_DIR = Path("holiday")
+FALLBACK_CATEGORY = "Fun & Weird (uncategorized)"
+MONTH_SPLIT_THRESHOLD = 100
+DEPS_STAGE = "hubs"
+HUB_SLUGS = {
+    "Animals & Nature": "animals-nature",
+    "Arts & Culture": "arts-culture",
+    "Seasonal & Calendar": "seasonal-holidays",
+    "Wellness & Self-Care": "wellness-lifestyle",
+    "Fun & Weird (uncategorized)": "fun-weird",
+}
+
+MEMBERS_START = "<!-- HUB-MEMBERS-START -->"
+MEMBERS_END = "<!-- HUB-MEMBERS-END -->"
+LEGACY_MEMBERS_RE = re.compile(r'<section class="section" id="cluster-members">.*?</section>', re.DOTALL)
+HOLIDAY_LINK_RE = re.compile(r'<a\s[^>]*?href=["\']?/holiday/([^/"\'\s>]+)/["\']?[^>]*>(.*?)</a>', re.DOTALL)
+
+HUB_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  <title>{title}</title>
+  <meta name="description" content="{description}" />
+  <link rel="canonical" href="{canonical}" />
+  <link rel="stylesheet" href="/styles.css" />
+</head>
+<body class="page content-page">
+  <header class="site-header">
+    <a class="brand" href="/">
+      <img src="/assets/app-icon.png" alt="Obscure Holiday Calendar icon" class="brand-mark" />
+      <div class="brand-text">
+        <span class="brand-name">Obscure Holiday Calendar</span>
+        <span class="brand-tagline">Daily fun, weird, and wonderful observances</span>
+      </div>
+    </a>
+    <nav class="nav-links">
+      <a href="/holiday/">Holidays</a>
+      <a href="/about/">About</a>
+      <a href="/contact/">Contact</a>
+      <a href="/privacy/">Privacy</a>
+    </nav>
+  </header>
+  <main class="content-page" style="max-width:980px;margin:0 auto;padding:24px;">
+    <h1>{heading}</h1>
+    <p>{intro}</p>
+    <p>For category-level numbers, see the <a href="/reports/2026-national-day-report/">National Day Report data</a>.</p>
+    <p><a href="{back_href}">{back_text}</a></p>
+    {members_start}
+    {members_end}
+  </main>
+</body>
+</html>
+"""
+
+
+def hub_slug(category: str) -> str:
+    return HUB_SLUGS.get(category) or slugify(category)
+
+
+def hub_label(category: str) -> str:
+    """Category name for page copy ("Fun & Weird (uncategorized)" -> "Fun & Weird")."""
+    return re.sub(r"\s*\([^)]*\)$", "", category)
+
+
+def month_slug(month: int) -> str:
+    return calendar.month_name[month].lower()
+
+
+def build_index(path: Path, rows_csv: Path = REPORT_ROWS_CSV):
+    """One pass over holidays.json: {category: [(month, day, name, slug), ...]}."""
+    lookup = category_lookup(rows_csv)
+    index = defaultdict(list)
+    for date_key, _, entry in iter_holidays(path):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        slug = entry.get("slug") or slugify(entry["name"])
+        mm, dd = (int(part) for part in entry.get("date", date_key).split("-"))
+        category = lookup(entry["name"], slug) or FALLBACK_CATEGORY
+        index[category].append((mm, dd, entry["name"], slug))
+    for slug, entry in iter_floating_holidays(path):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        resolved = resolve_date_rule(entry.get("dateRule"), CURRENT_YEAR)
+        if not resolved and entry.get("originalDate"):
+            resolved = tuple(int(part) for part in entry["originalDate"].split("-"))
+        if not resolved:
+            continue
+        category = lookup(entry["name"], slug) or FALLBACK_CATEGORY
+        index[category].append((resolved[0], resolved[1], entry["name"], slug))
+    return index
+
+
+def link_members(index, holiday_dir: Path = HOLIDAY_PAGES_DIR):
+    """Point members at their holiday/<slug>/ page; returns (index, unlinked members).
+
+    A slug with no page is matched to a page whose slug differs only in
+    hyphens (slugify turns "You're" into "you-re", the page may say
+    "youre"). Members with no page at all are left out rather than linked
+    to a 404.
+    """
+    pages = {path.parent.name.replace("-", ""): path.parent.name for path in holiday_dir.glob("*/index.html")}
+    linked, unlinked = defaultdict(list), []
+    for category, members in index.items():
+        for mm, dd, name, slug in members:
+            if not (holiday_dir / slug / "index.html").exists():
+                if slug.replace("-", "") not in pages:
+                    unlinked.append((category, name, slug))
+                    continue
+                slug = pages[slug.replace("-", "")]
+            linked[category].append((mm, dd, name, slug))
+    return linked, unlinked
+
+
+def members_region(page: str) -> str:
+    """The member section of a hub or month page: the marked region, or the legacy section."""
+    if MEMBERS_START in page and MEMBERS_END in page:
+        return page.split(MEMBERS_START, 1)[1].split(MEMBERS_END, 1)[0]
+    m = LEGACY_MEMBERS_RE.search(page)
+    return m.group(0) if m else ""
+
+
+def listed_members(hub_dir: Path = HUB_DIR):
+    """{hub slug: {holiday slug: link text}} for every existing hub page, its month pages included."""
+    listed = {}
+    for path in sorted(hub_dir.glob("*/index.html")):
+        links = {}
+        for page in [path, *sorted(path.parent.glob("*/index.html"))]:
+            for slug, text in HOLIDAY_LINK_RE.findall(members_region(page.read_text(encoding="utf-8"))):
+                links.setdefault(slug, html.unescape(text.strip()))
+        listed[path.parent.name] = links
+    return listed
+
+
+def file_members(index, listed, accept: bool = False, holiday_dir: Path = HOLIDAY_PAGES_DIR):
+    """Hub membership from the pages' lists, with the CSV for unlisted holidays; returns (index, proposed).
+
+    index is the CSV-categorised, linked index; listed is listed_members().
+    A holiday no hub lists is filed under its CSV category if that hub has
+    no page yet (or accept is set), and otherwise returned in proposed as
+    (category, member). A listed holiday with a page but no holidays.json
+    entry stays, undated (month 0) and named by its link text.
+    """
+    by_slug = {}
+    for members in index.values():
+        for member in members:
+            # Keyed like link_members' fallback, so "you-re" in a hub matches "youre".
+            by_slug.setdefault(member[3].replace("-", ""), member)
+    categories = {hub_slug(category): category for category in [*HUB_SLUGS, *index]}
+    filed, proposed, taken = defaultdict(list), [], set()
+    for hub, links in listed.items():
+        for slug, name in sorted(links.items()):
+            member = by_slug.get(slug.replace("-", ""))
+            if member is None and (holiday_dir / slug / "index.html").exists():
+                member = (0, 0, name, slug)
+            if member is not None:
+                taken.add(member[3])
+                if hub in categories:
+                    filed[categories[hub]].append(member)
+    for category, members in sorted(index.items()):
+        for member in members:
+            if member[3] in taken:
+                continue
+            taken.add(member[3])
+            if hub_slug(category) in listed and not accept:
+                proposed.append((category, member))
+            else:
+                filed[category].append(member)
+    return {category: members for category, members in filed.items() if members}, proposed
+
+
+def member_list(members, dated: bool) -> str:
+    lines = ['      <ul class="link-list">']
+    for mm, dd, name, slug in members:
+        when = f' <span class="muted">{calendar.month_abbr[mm]} {dd}</span>' if dated else ""
+        lines.append(f'        <li><a href="/holiday/{slug}/">{html.escape(name, quote=False)}</a>{when}</li>')
+    lines.append("      </ul>")
+    return "\n".join(lines)
+
+
+def members_section(category: str, members) -> str:
+    """The generated part of a hub: every member, or links to its month pages."""
+    slug = hub_slug(category)
+    label = html.escape(hub_label(category))
+    if len(members) <= MONTH_SPLIT_THRESHOLD:
+        by_name = sorted(members, key=lambda m: (m[2].casefold(), m[3]))
+        body = member_list(by_name, dated=False)
+        heading = f"All {len(members)} {label} holidays"
+    else:
+        counts = defaultdict(int)
+        for member in members:
+            counts[member[0]] += 1
+        lines = ['      <ul class="link-list">']
+        for month in sorted(counts):
+            if month:
+                lines.append(f'        <li><a href="/holidays/{slug}/{month_slug(month)}/">'
+                             f"{calendar.month_name[month]}</a> ({counts[month]})</li>")
+        lines.append("      </ul>")
+        # Undated members (no holidays.json entry) have no month page.
+        undated = sorted((m for m in members if not m[0]), key=lambda m: (m[2].casefold(), m[3]))
+        if undated:
+            lines.append(member_list(undated, dated=False))
+        body = "\n".join(lines)
+        heading = f"{len(members)} {label} holidays by month"
+    return (
+        f"{MEMBERS_START}\n"
+        '    <section class="section" id="cluster-members">\n'
+        f"      <h2>{heading}</h2>\n"
+        f"{body}\n"
+        "    </section>\n"
+        f"    {MEMBERS_END}"
+    )
+
+
+def new_page(title: str, description: str, canonical: str, heading: str, intro: str, back_href: str, back_text: str) -> str:
+    return HUB_TEMPLATE.format(
+        title=html.escape(title), description=html.escape(description), canonical=canonical,
+        heading=html.escape(heading), intro=intro, back_href=back_href, back_text=back_text,
+        members_start=MEMBERS_START, members_end=MEMBERS_END,
+    )
+
+
+def render_hub(existing: str, category: str, members) -> str:
+    if not existing:
+        slug = hub_slug(category)
+        label = hub_label(category)
+        existing = new_page(
+            f"{label} Holidays Hub — Obscure Holiday Calendar",
+            f"{label} holidays from the Obscure Holiday Calendar. Browse all linked holidays in one place.",
+            f"{DOMAIN}/holidays/{slug}/",
+            f"{label} Holidays Hub",
+            f"Every {html.escape(label.lower())} observance in the Obscure Holiday Calendar, with a link to each holiday's page.",
+            "/holiday/", "Back to Holiday Library",
+        )
+    section = members_section(category, members)
+    if MEMBERS_START in existing and MEMBERS_END in existing:
+        head, rest = existing.split(MEMBERS_START, 1)
+        return head + section + rest.split(MEMBERS_END, 1)[1]
+    if not LEGACY_MEMBERS_RE.search(existing):
+        raise SystemExit(f"{category}: hub page has no {MEMBERS_START} region or cluster-members section")
+    return LEGACY_MEMBERS_RE.sub(lambda _: section, existing, count=1)
+
+
+def render_month_page(category: str, month: int, members) -> str:
+    slug = hub_slug(category)
+    label = hub_label(category)
+    name = calendar.month_name[month]
+    page = new_page(
+        f"{label} Holidays in {name} — Obscure Holiday Calendar",
+        f"{label} holidays in {name}, day by day, from the Obscure Holiday Calendar.",
+        f"{DOMAIN}/holidays/{slug}/{month_slug(month)}/",
+        f"{label} Holidays in {name}",
+        f"{len(members)} {html.escape(label.lower())} holidays fall in {name}. "
+        f'Other months are on the <a href="/holidays/{slug}/">{html.escape(label)} hub</a>.',
+        f"/holidays/{slug}/", f"Back to {html.escape(label)} Holidays Hub",
+    )
+    section = (
+        f"{MEMBERS_START}\n"
+        '    <section class="section" id="cluster-members">\n'
+        f"      <h2>{name}</h2>\n"
+        f"{member_list(sorted(members, key=lambda m: (m[1], m[2].casefold())), dated=True)}\n"
+        "    </section>\n"
+        f"    {MEMBERS_END}"
+    )
+    head, rest = page.split(MEMBERS_START, 1)
+    return head + section + rest.split(MEMBERS_END, 1)[1]
+
+
+def build(prof, force: bool = False, accept: bool = False):
+    """Write every hub and month page whose members changed; returns (index, pages, written, skipped)."""
+    cache = HashCache("hubs")
+    deps = DepIndex()
+    seen = set()
+    written = skipped = 0
+    with prof.phase("parse"):
+        index, unlinked = link_members(build_index(HOLIDAYS_JSON))
+        index, proposed = file_members(index, listed_members(), accept)
+    if proposed:
+        print(f"{len(proposed)} holiday(s) are in no hub; the report CSV files them under an existing hub. "
+              "Review, then add them with --accept or list them on the right hub page:")
+        for category, (_, _, name, slug) in proposed:
+            print(f"  {name} ({slug}) -> {category}")
+    if unlinked:
+        print(f"{len(unlinked)} holiday(s) have no {HOLIDAY_PAGES_DIR}/<slug>/ page and are not linked from hubs:")
+        for category, name, slug in unlinked:
+            print(f"  {name} ({slug}) in {category}")
+
+    pages = []
+    for category, members in sorted(index.items()):
+        slug = hub_slug(category)
+        pages.append((HUB_DIR / slug / "index.html", category, None, members))
+        if len(members) > MONTH_SPLIT_THRESHOLD:
+            by_month = defaultdict(list)
+            for member in members:
+                if member[0]:
+                    by_month[member[0]].append(member)
+            for month, month_members in sorted(by_month.items()):
+                pages.append((HUB_DIR / slug / month_slug(month) / "index.html", category, month, month_members))
+
+    for path, category, month, members in pages:
+        key = path.as_posix()
+        seen.add(key)
+        deps.record(DEPS_STAGE, key, (member[3] for member in members))
+        digest = content_hash(repr((category, month, sorted(members))).encode("utf-8"))
+        if not force and cache.get(key) == digest and path.exists():
+            skipped += 1
+            continue
+        with prof.page(key):
+            if month is None:
+                existing = prof.read_text(path) if path.exists() else ""
+                page = render_hub(existing, category, members)
+            else:
+                page = render_month_page(category, month, members)
+            with prof.phase("write"):
+                if write_text_if_changed(path, page):
+                    prof.add_written(len(page.encode("utf-8")))
+                    written += 1
+        cache.set(key, digest)
+
+    # Month pages of hubs that shrank below the threshold (hubs themselves are never deleted).
+    for key in cache.prune(seen):
+        stale = Path(key)
+        if stale.parent.parent.parent == HUB_DIR and stale.exists():
+            stale.unlink()
+            if not any(stale.parent.iterdir()):
+                stale.parent.rmdir()
+    cache.save()
+    deps.forget(DEPS_STAGE, seen)
+    deps.save()
+    return index, len(pages), written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate holidays/<category>/ hub pages from holidays.json.")
+    parser.add_argument("--force", action="store_true", help="Regenerate every hub, ignoring the hash cache")
+    parser.add_argument("--accept", action="store_true", help="Add the members the report CSV proposes for existing hubs")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    with build_profile.session(args, "generate_category_hubs") as prof:
+        index, pages, written, skipped = build(prof, args.force, args.accept)
+
+    print(f"Hubs: {len(index)} categories, {pages} pages ({written} written, {skipped} unchanged).")
+    for category, members in sorted(index.items(), key=lambda item: -len(item[1])):
+        split = " (by month)" if len(members) > MONTH_SPLIT_THRESHOLD else ""
+        print(f"  {len(members):>4}  /holidays/{hub_slug(category)}/{split}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Generate the holiday library (holiday/index.html) as a small shell plus
+per-month fragments.
+
+holiday/index.html is the template. The generator owns only the regions
+between its marker comments: the month grid (<!-- HOLIDAY-INDEX-START -->
+.. END) and the page scripts (<!-- HOLIDAY-INDEX-SCRIPT-START --> .. END).
+On the first run it finds the hand-written grid and scripts and puts the
+markers in. Everything else in the page stays hand-edited.
+
+Outputs:
+- holiday/index.html: every month section is present (so #march anchors
+  and the month nav still work). Only the current month's list is
+  rendered; the others hold a link to their /holiday/page/N/ page and load
+  their fragment when scrolled near, jumped to, searched or randomised.
+- holiday/months/MM.html and MM.json: the <ul class="month-list"> fragment
+  and the same data as JSON.
+- holiday/months/floating.json: floatingHolidays (slug, name, dateRule), so
+  the browser can re-place them if the visitor's year differs from the
+  build year. Previously it fetched the whole holidays.json for this.
+- holiday/page/N/index.html: one static page per month (N = 1..12) with
+  prev/next links, for crawlers and no-JS visitors. generate_sitemaps.py
+  includes them.
+
+Floating holidays are rendered at their date for the build year (resolved
+with generate_sitemaps.resolve_date_rule) and carry data-floating.
+
+Files are only rewritten when their content changes, so sitemap lastmods
+stay put. The slugs each output lists are recorded in .build/deps.json
+(build_cache.DepIndex; see deps.py). The run ends with a report of the
+first-load payload (shell HTML, raw and gzipped) against the previous page.
+
+Usage:
+  python3 generate_holiday_index.py
+  python3 generate_holiday_index.py --month 3      # render March in the shell
+"""
+
+import argparse
+import calendar
+import datetime
+import gzip
+import html
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+import build_profile
+from build_cache import DepIndex, write_text_if_changed
+from generate_sitemaps import CURRENT_YEAR, DOMAIN, resolve_date_rule
+from holiday_data import iter_floating_holidays, iter_holidays, slugify
+
+HOLIDAYS_JSON = Path("holidays.json")
+HOLIDAY_DIR = Path("holiday")
+INDEX_PATH = HOLIDAY_DIR / "index.html"
+MONTHS_DIR = HOLIDAY_DIR / "months"
+PAGE_DIR = HOLIDAY_DIR / "page"
+DEPS_STAGE = "library"
+
+GRID_START = "<!-- HOLIDAY-INDEX-START -->"
+GRID_END = "<!-- HOLIDAY-INDEX-END -->"
+SCRIPT_START = "<!-- HOLIDAY-INDEX-SCRIPT-START -->"
+SCRIPT_END = "<!-- HOLIDAY-INDEX-SCRIPT-END -->"
+# Hand-written layout the markers replace on the first run.
+LEGACY_GRID_RE = re.compile(r'<div class="month-grid">.*</div>(?=\s*</main>)', re.DOTALL)
+LEGACY_SCRIPT_RE = re.compile(r'(<script src="/assets/floating-dates\.js"></script>\n\s*)(.*?)(?=\n</body>)', re.DOTALL)
+LAST_UPDATED_RE = re.compile(r'(<span class="meta-label">Last updated</span>\s*<span class="meta-value">)([^<]*)(</span>)')
+
+MONTH_NAMES = [calendar.month_name[m] for m in range(1, 13)]
+
+LOADER_SCRIPT = """
+  <script>
+    (function() {
+      const grid = document.querySelector(".month-grid");
+      if (!grid) return;
+      const FRAGMENTS = "/holiday/months/";
+      const buildYear = Number(grid.dataset.year);
+      const year = new Date().getFullYear();
+      const sections = Array.from(grid.querySelectorAll(".month-section[data-month]"));
+      const searchInput = document.getElementById("holiday-search");
+      const searchCount = document.getElementById("search-count");
+      const randomBtn = document.getElementById("random-holiday");
+      const monthAbbr = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"];
+      const pending = new Map();
+      let floating = null;
+
+      function normalize(value) {
+        return (value || "").toLowerCase().trim();
+      }
+
+      function indexLinks(section) {
+        const month = Number(section.dataset.month);
+        const monthName = section.querySelector("h2")?.textContent || "";
+        section.querySelectorAll(".day-links a").forEach((link) => {
+          const dayNumber = link.closest(".day-group")?.querySelector(".day-number")?.textContent || "";
+          const paddedDay = dayNumber ? dayNumber.padStart(2, "0") : "";
+          link.dataset.searchText = `${link.textContent} ${monthName} ${monthAbbr[month - 1]} ${dayNumber} ${paddedDay}`.toLowerCase();
+        });
+      }
+
+      // Floating holidays are rendered for the build year; move them if the visitor's year differs.
+      function placeFloating(section) {
+        if (year === buildYear) return Promise.resolve();
+        if (!floating) {
+          floating = fetch(FRAGMENTS + "floating.json").then((res) => res.json()).catch(() => ({}));
+        }
+        return floating.then((entries) => {
+          const month = Number(section.dataset.month);
+          section.querySelectorAll("a[data-floating]").forEach((a) => a.remove());
+          section.querySelectorAll(".day-group").forEach((g) => {
+            if (!g.querySelector(".day-links a")) g.remove();
+          });
+          const list = section.querySelector(".month-list");
+          if (!list || !window.FloatingDates) return;
+          Object.keys(entries).forEach((slug) => {
+            const entry = entries[slug];
+            const resolved = window.FloatingDates.resolveDateRule(entry.dateRule, year);
+            if (!resolved || resolved.month !== month) return;
+            const groups = Array.from(list.querySelectorAll(".day-group"));
+            let group = groups.find((g) => Number(g.querySelector(".day-number").textContent) === resolved.day);
+            if (!group) {
+              group = document.createElement("li");
+              group.className = "day-group";
+              group.innerHTML = `<div class="day-number">${resolved.day}</div><div class="day-links"></div>`;
+              list.insertBefore(group, groups.find((g) => Number(g.querySelector(".day-number").textContent) > resolved.day) || null);
+            }
+            const a = document.createElement("a");
+            a.href = `/holiday/${slug}/`;
+            a.textContent = entry.name;
+            a.title = "Date shifts yearly — shown here for " + year;
+            a.dataset.floating = "";
+            group.querySelector(".day-links").appendChild(a);
+          });
+          indexLinks(section);
+        });
+      }
+
+      function loadMonth(section) {
+        if (section.dataset.state === "loaded") return Promise.resolve();
+        if (!pending.has(section)) {
+          const request = fetch(FRAGMENTS + section.dataset.month.padStart(2, "0") + ".html")
+            .then((res) => {
+              if (!res.ok) throw new Error(res.status);
+              return res.text();
+            })
+            .then((fragment) => {
+              const placeholder = section.querySelector(".month-placeholder");
+              if (placeholder) placeholder.insertAdjacentHTML("beforebegin", fragment);
+              if (placeholder) placeholder.remove();
+              section.dataset.state = "loaded";
+              indexLinks(section);
+              return placeFloating(section);
+            })
+            .catch(() => {
+              pending.delete(section);
+            });
+          pending.set(section, request);
+        }
+        return pending.get(section);
+      }
+
+      function loadAll() {
+        return Promise.all(sections.map(loadMonth));
+      }
+
+      sections.forEach((section) => {
+        if (section.dataset.state === "loaded") {
+          indexLinks(section);
+          placeFloating(section);
+        }
+      });
+
+      if ("IntersectionObserver" in window) {
+        const observer = new IntersectionObserver((entries) => {
+          entries.forEach((entry) => {
+            if (!entry.isIntersecting) return;
+            observer.unobserve(entry.target);
+            loadMonth(entry.target);
+          });
+        }, { rootMargin: "600px 0px" });
+        sections.forEach((section) => observer.observe(section));
+      } else {
+        loadAll();
+      }
+
+      document.querySelectorAll(".month-jump a[href^='#']").forEach((link) => {
+        link.addEventListener("click", () => {
+          const section = document.getElementById(link.getAttribute("href").slice(1));
+          if (section) loadMonth(section);
+        });
+      });
+
+      function filterHolidays() {
+        const term = normalize(searchInput.value);
+        let matchCount = 0;
+        grid.querySelectorAll(".day-group").forEach((group) => {
+          const links = Array.from(group.querySelectorAll("a"));
+          const matches = links.filter((link) => normalize(link.dataset.searchText).includes(term));
+          if (!term) {
+            group.style.display = "grid";
+            links.forEach((link) => (link.style.display = "inline-flex"));
+            matchCount += links.length;
+          } else if (matches.length) {
+            group.style.display = "grid";
+            links.forEach((link) => {
+              link.style.display = matches.includes(link) ? "inline-flex" : "none";
+            });
+            matchCount += matches.length;
+          } else {
+            group.style.display = "none";
+          }
+        });
+        sections.forEach((section) => {
+          const visible = !term || section.querySelector(".day-group[style*=\\"display: grid\\"]");
+          section.style.display = visible ? "" : "none";
+        });
+        if (searchCount) {
+          searchCount.textContent = term ? `${matchCount} match${matchCount === 1 ? "" : "es"}` : "";
+        }
+      }
+
+      if (searchInput) {
+        searchInput.addEventListener("input", () => {
+          loadAll().then(filterHolidays);
+        });
+      }
+
+      if (randomBtn) {
+        randomBtn.addEventListener("click", () => {
+          loadAll().then(() => {
+            const links = Array.from(grid.querySelectorAll(".day-links a"));
+            if (!links.length) return;
+            const pick = links[Math.floor(Math.random() * links.length)];
+            if (pick) window.location.href = pick.href;
+          });
+        });
+      }
+
+      const shopLink = document.querySelector(".shop-link");
+      if (shopLink && window.gtag) {
+        shopLink.addEventListener("click", () => {
+          gtag("event", "shop_click", {
+            link_url: shopLink.href,
+            link_text: "Shop",
+            source_page: "holiday-library"
+          });
+        });
+      }
+    })();
+  </script>
+""".strip("\n")
+
+
+def load_months(path: Path):
+    """Return {month: {day: [(name, url, floating), ...]}} for the build year."""
+    months = defaultdict(lambda: defaultdict(list))
+    for date_key, _, entry in iter_holidays(path):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        mm, dd = (int(part) for part in entry.get("date", date_key).split("-"))
+        slug = entry.get("slug") or slugify(entry["name"])
+        months[mm][dd].append((entry["name"], f"/holiday/{slug}/", False))
+    floating = {}
+    for slug, entry in iter_floating_holidays(path):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        floating[slug] = {"name": entry["name"], "dateRule": entry.get("dateRule")}
+        resolved = resolve_date_rule(entry.get("dateRule"), CURRENT_YEAR)
+        if resolved:
+            months[resolved[0]][resolved[1]].append((entry["name"], f"/holiday/{slug}/", True))
+    for days in months.values():
+        for items in days.values():
+            items.sort(key=lambda item: (item[2], item[0].casefold()))
+    return months, floating
+
+
+def month_slugs(days):
+    return [url.split("/")[2] for items in days.values() for _, url, _ in items]
+
+
+def render_month_list(days) -> str:
+    lines = ['<ul class="month-list">']
+    for day in sorted(days):
+        lines.append('        <li class="day-group">')
+        lines.append(f'          <div class="day-number">{day}</div>')
+        lines.append('          <div class="day-links">')
+        for name, url, is_floating in days[day]:
+            extra = f' title="Date shifts yearly — shown here for {CURRENT_YEAR}" data-floating' if is_floating else ""
+            lines.append(f'            <a href="{url}"{extra}>{html.escape(name, quote=False)}</a>')
+        lines.append("          </div>")
+        lines.append("        </li>")
+    lines.append("      </ul>")
+    return "\n".join(lines)
+
+
+def month_json(month: int, days) -> str:
+    data = {
+        "month": month,
+        "name": MONTH_NAMES[month - 1],
+        "year": CURRENT_YEAR,
+        "days": [
+            {"day": day, "holidays": [dict(name=n, url=u, **({"floating": True} if f else {})) for n, u, f in days[day]]}
+            for day in sorted(days)
+        ],
+    }
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def render_section(month: int, body: str, loaded: bool) -> str:
+    state = ' data-state="loaded"' if loaded else ""
+    return (
+        f'    <section class="month-section" id="{MONTH_NAMES[month - 1].lower()}" data-month="{month}"{state}>\n'
+        f"      <h2>{MONTH_NAMES[month - 1]}</h2>\n"
+        f"      {body}\n"
+        "    </section>"
+    )
+
+
+def placeholder(month: int) -> str:
+    return (f'<p class="month-placeholder"><a href="/holiday/page/{month}/">'
+            f"See all {MONTH_NAMES[month - 1]} holidays</a></p>")
+
+
+def replace_region(page: str, start: str, end: str, content: str, legacy_re, group: int = 0) -> str:
+    block = f"{start}\n{content}\n  {end}"
+    if start in page and end in page:
+        head, rest = page.split(start, 1)
+        return head + block + rest.split(end, 1)[1]
+    m = legacy_re.search(page)
+    if not m:
+        raise SystemExit(f"{INDEX_PATH}: cannot find the {start} region or the hand-written layout it replaces")
+    a, b = m.span(group)
+    return page[:a] + block + page[b:]
+
+
+def pager(month: int) -> str:
+    links = []
+    if month > 1:
+        links.append(f'<a rel="prev" href="/holiday/page/{month - 1}/">← {MONTH_NAMES[month - 2]}</a>')
+    links.append('<a href="/holiday/">All months</a>')
+    if month < 12:
+        links.append(f'<a rel="next" href="/holiday/page/{month + 1}/">{MONTH_NAMES[month]} →</a>')
+    return '  <nav class="month-pager" aria-label="Holiday pages">\n    ' + "\n    ".join(links) + "\n  </nav>"
+
+
+def build_shell(template: str, months, current: int) -> str:
+    sections = []
+    for month in range(1, 13):
+        if month == current:
+            sections.append(render_section(month, render_month_list(months.get(month, {})), loaded=True))
+        else:
+            sections.append(render_section(month, placeholder(month), loaded=False))
+    grid = f'  <div class="month-grid" data-year="{CURRENT_YEAR}">\n' + "\n".join(sections) + "\n  </div>"
+    page = replace_region(template, GRID_START, GRID_END, grid, LEGACY_GRID_RE)
+    return replace_region(page, SCRIPT_START, SCRIPT_END, LOADER_SCRIPT, LEGACY_SCRIPT_RE, group=2)
+
+
+def build_month_page(shell: str, months, month: int) -> str:
+    name = MONTH_NAMES[month - 1]
+    section = render_section(month, render_month_list(months.get(month, {})), loaded=True)
+    grid = f'  <div class="month-grid" data-year="{CURRENT_YEAR}">\n{section}\n  </div>\n{pager(month)}'
+    page = replace_region(shell, GRID_START, GRID_END, grid, LEGACY_GRID_RE)
+    page = re.sub(r"<title>.*?</title>", f"<title>{name} Holidays — Obscure Holiday Calendar</title>", page, count=1)
+    page = re.sub(
+        r'<meta name="description" content="[^"]*">',
+        f'<meta name="description" content="Every fun and obscure holiday in {name}, day by day, with links to each holiday’s page.">',
+        page, count=1,
+    )
+    page = page.replace(f'<link rel="canonical" href="{DOMAIN}/holiday/">',
+                        f'<link rel="canonical" href="{DOMAIN}/holiday/page/{month}/">', 1)
+    page = page.replace("<h1>Holiday library</h1>", f"<h1>{name} holidays</h1>", 1)
+    # Month sections other than this one live on their own pages.
+    for other in range(1, 13):
+        page = page.replace(f'<a href="#{MONTH_NAMES[other - 1].lower()}">',
+                            f'<a href="/holiday/page/{other}/">', 1)
+    return page
+
+
+def with_last_updated(page: str, date: str) -> str:
+    return LAST_UPDATED_RE.sub(lambda m: m.group(1) + date + m.group(3), page, count=1)
+
+
+def write_page(prof, path: Path, page: str) -> bool:
+    """Write page if its content (ignoring the Last updated stamp) changed; stamp today's date when it did."""
+    old = path.read_text(encoding="utf-8") if path.exists() else ""
+    m = LAST_UPDATED_RE.search(old)
+    if m and with_last_updated(page, m.group(2)) == old:
+        return False
+    page = with_last_updated(page, datetime.date.today().isoformat())
+    with prof.phase("write"):
+        changed = write_text_if_changed(path, page)
+    if changed:
+        prof.add_written(len(page.encode("utf-8")))
+    return changed
+
+
+def build(prof, current: int):
+    """Write the shell, fragments and month pages; returns (months, files written)."""
+    if not INDEX_PATH.exists():
+        raise SystemExit(f"{INDEX_PATH} not found (it is the template for the shell)")
+    written = 0
+    deps = DepIndex()
+    with prof.phase("parse"):
+        months, floating = load_months(HOLIDAYS_JSON)
+    template = prof.read_text(INDEX_PATH)
+
+    with prof.phase("transform"):
+        shell = build_shell(template, months, current)
+    written += write_page(prof, INDEX_PATH, shell)
+    deps.record(DEPS_STAGE, INDEX_PATH.as_posix(), month_slugs(months.get(current, {})))
+
+    for month in range(1, 13):
+        with prof.page(f"month-{month:02d}"):
+            days = months.get(month, {})
+            outputs = [MONTHS_DIR / f"{month:02d}.html", MONTHS_DIR / f"{month:02d}.json", PAGE_DIR / str(month) / "index.html"]
+            written += write_text_if_changed(outputs[0], render_month_list(days) + "\n")
+            written += write_text_if_changed(outputs[1], month_json(month, days))
+            written += write_page(prof, outputs[2], build_month_page(shell, months, month))
+            for path in outputs:
+                deps.record(DEPS_STAGE, path.as_posix(), month_slugs(days))
+    written += write_text_if_changed(
+        MONTHS_DIR / "floating.json",
+        json.dumps(floating, ensure_ascii=False, separators=(",", ":"), sort_keys=True) + "\n",
+    )
+    deps.record(DEPS_STAGE, (MONTHS_DIR / "floating.json").as_posix(), floating)
+    deps.save()
+    return months, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the holiday library shell, month fragments and /holiday/page/N/ pages.")
+    parser.add_argument("--month", type=int, choices=range(1, 13), metavar="1-12",
+                        help="Month rendered into the shell (default: current month)")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    previous_size = INDEX_PATH.stat().st_size if INDEX_PATH.exists() else 0
+    with build_profile.session(args, "generate_holiday_index") as prof:
+        months, written = build(prof, args.month or datetime.date.today().month)
+
+    shell_bytes = INDEX_PATH.read_bytes()
+    fragment_bytes = sum((MONTHS_DIR / f"{month:02d}.html").stat().st_size for month in range(1, 13))
+    total = sum(len(days) for m in months.values() for days in m.values())
+    print(f"Holidays listed: {total} across 12 months; {written} file(s) written.")
+    print(f"First-load HTML: {len(shell_bytes) / 1024:.1f} KB ({len(gzip.compress(shell_bytes, 9)) / 1024:.1f} KB gzipped), "
+          f"was {previous_size / 1024:.1f} KB before this run; "
+          f"other months load on demand from {fragment_bytes / 1024:.1f} KB of fragments.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
+import argparse
 import os
 import re
 from pathlib import Path
 
+import build_profile
+import write_journal
+from structured_data import ld_json_script, schema_types
+
 DOMAIN = "https://www.obscureholidaycalendar.com"
 ADSENSE_CLIENT = "ca-pub-7162731177966348"
 
@@ -9,6 +14,24 @@ IOS_URL = "https://apps.apple.com/us/app/obscure-holiday-calendar/id6755315850"
 ANDROID_URL = "https://play.google.com/store/apps/details?id=com.codeman8806.obscureholidaycalendar"
 APP_URL = "https://www.obscureholidaycalendar.com/app/"
 
+PUBLISHER = {
+    "@type": "Organization",
+    "name": "Obscure Holiday Calendar",
+    "logo": {"@type": "ImageObject", "url": f"{DOMAIN}/assets/app-icon.png"},
+}
+
+MOBILE_APP_SCHEMA = {
+    "@context": "https://schema.org",
+    "@type": "MobileApplication",
+    "name": "Obscure Holiday Calendar",
+    "operatingSystem": "Android, iOS",
+    "applicationCategory": "LifestyleApplication",
+    "url": APP_URL,
+    "downloadUrl": [ANDROID_URL, IOS_URL],
+    "offers": {"@type": "Offer", "price": 0, "priceCurrency": "USD"},
+    "publisher": PUBLISHER,
+}
+
 # Brand icon with inline spacing so it isn't jammed on the H1
 BRAND_ICON_HTML = """
 <img src="/assets/app-icon.png"
@@ -104,64 +127,35 @@ def get_date_text(html: str) -> str:
 def build_article_schema(headline: str, canonical: str, description: str) -> str:
     if not description:
         description = f"Learn about {headline} and fun ways to celebrate this obscure holiday."
-    return f"""
-<script type="application/ld+json">
-{{
-  "@context": "https://schema.org",
-  "@type": "Article",
-  "headline": "{headline}",
-  "description": "{description}",
-  "mainEntityOfPage": {{
-    "@type": "WebPage",
-    "@id": "{canonical}"
-  }},
-  "author": {{
-    "@type": "Organization",
-    "name": "Obscure Holiday Calendar"
-  }},
-  "publisher": {{
-    "@type": "Organization",
-    "name": "Obscure Holiday Calendar",
-    "logo": {{
-      "@type": "ImageObject",
-      "url": "{DOMAIN}/assets/app-icon.png"
-    }}
-  }}
-}}
-</script>
-"""
+    return ld_json_script({
+        "@context": "https://schema.org",
+        "@type": "Article",
+        "headline": headline,
+        "description": description,
+        "mainEntityOfPage": {"@type": "WebPage", "@id": canonical},
+        "author": {"@type": "Organization", "name": "Obscure Holiday Calendar"},
+        "publisher": PUBLISHER,
+    })
 
 
 def build_faq_schema(headline: str, date_text: str) -> str:
     when_answer = f"{headline} is observed each year."
     if date_text:
         when_answer = f"{headline} is observed each year on {date_text}."
-    return f"""
-<script type="application/ld+json">
-{{
-  "@context": "https://schema.org",
-  "@type": "FAQPage",
-  "mainEntity": [
-    {{
-      "@type": "Question",
-      "name": "When is {headline}?",
-      "acceptedAnswer": {{
-        "@type": "Answer",
-        "text": "{when_answer}"
-      }}
-    }},
-    {{
-      "@type": "Question",
-      "name": "How can I celebrate {headline}?",
-      "acceptedAnswer": {{
-        "@type": "Answer",
-        "text": "You can celebrate {headline} by learning the story behind the holiday, sharing it with friends, and enjoying fun themed activities."
-      }}
-    }}
-  ]
-}}
-</script>
-"""
+    questions = [
+        (f"When is {headline}?", when_answer),
+        (f"How can I celebrate {headline}?",
+         f"You can celebrate {headline} by learning the story behind the holiday, sharing it with friends, "
+         "and enjoying fun themed activities."),
+    ]
+    return ld_json_script({
+        "@context": "https://schema.org",
+        "@type": "FAQPage",
+        "mainEntity": [
+            {"@type": "Question", "name": name, "acceptedAnswer": {"@type": "Answer", "text": text}}
+            for name, text in questions
+        ],
+    })
 
 # -------------- INJECTION / CLEANUP HELPERS ----------------
 
@@ -229,7 +223,55 @@ def move_breadcrumb_schema_into_head(html: str) -> str:
 
 # -------------- MAIN ----------------
 
+def upgrade_page(html: str, folder_slug: str) -> str:
+    # Basic info from HTML
+    headline = get_headline(html)
+    canonical = get_canonical(html, folder_slug)
+    description = get_meta_description(html)
+    date_text = get_date_text(html)
+
+    # CLEANUP FIRST
+    html = remove_legacy_ads_block(html)
+    html = move_breadcrumb_schema_into_head(html)
+
+    # 1) Brand icon at top
+    if "brand-icon" not in html:
+        html = BRAND_ICON_HTML + html
+
+    # 2) Store buttons + ASO line after H1
+    html = inject_after_h1(html, STORE_BUTTONS_TOP, "store-buttons-top")
+    html = inject_after_h1(html, ASO_BOOST_PARAGRAPH, "aso-note")
+
+    # 3) Smart banners
+    html = inject_into_head(html, IOS_SMART_BANNER, "apple-itunes-app")
+    html = inject_into_head(html, ANDROID_SMART_BANNER, "google-play-app")
+
+    # 4) AdSense loader
+    html = inject_into_head(html, ADSENSE_LOADER, "pagead2.googlesyndication.com/pagead/js/adsbygoogle.js")
+
+    # 5-6) MobileApp, Article + FAQ schema. The types already on the page come from
+    # parsing its JSON-LD, so blocks merged into an @graph (structured_data.py) count.
+    types = schema_types(html)
+    if "MobileApplication" not in types:
+        html = inject_into_head(html, ld_json_script(MOBILE_APP_SCHEMA), '"MobileApplication"')
+    if "Article" not in types:
+        article_schema = build_article_schema(headline, canonical, description)
+        html = inject_into_head(html, article_schema, '"Article"')
+    if "FAQPage" not in types:
+        faq_schema = build_faq_schema(headline, date_text)
+        html = inject_into_head(html, faq_schema, '"FAQPage"')
+
+    # 7) App backlinks at bottom
+    html = add_backlinks_to_bottom(html)
+    return html
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Add SEO, app and schema blocks to every holiday page.")
+    build_profile.add_arguments(parser)
+    write_journal.add_arguments(parser)
+    args = parser.parse_args()
+
     root = Path("holiday")
     if not root.exists():
         print("No 'holiday' directory found.")
@@ -237,86 +279,19 @@ def main():
 
     updated = 0
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        if "index.html" not in filenames:
-            continue
-
-        path = Path(dirpath) / "index.html"
-        folder_slug = Path(dirpath).name
-
-        html = path.read_text(encoding="utf-8")
-
-        # Basic info from HTML
-        headline = get_headline(html)
-        canonical = get_canonical(html, folder_slug)
-        description = get_meta_description(html)
-        date_text = get_date_text(html)
-
-        # CLEANUP FIRST
-        html = remove_legacy_ads_block(html)
-        html = move_breadcrumb_schema_into_head(html)
-
-        # 1) Brand icon at top
-        if "brand-icon" not in html:
-            html = BRAND_ICON_HTML + html
-
-        # 2) Store buttons + ASO line after H1
-        html = inject_after_h1(html, STORE_BUTTONS_TOP, "store-buttons-top")
-        html = inject_after_h1(html, ASO_BOOST_PARAGRAPH, "aso-note")
-
-        # 3) Smart banners
-        html = inject_into_head(html, IOS_SMART_BANNER, "apple-itunes-app")
-        html = inject_into_head(html, ANDROID_SMART_BANNER, "google-play-app")
-
-        # 4) AdSense loader
-        html = inject_into_head(html, ADSENSE_LOADER, "pagead2.googlesyndication.com/pagead/js/adsbygoogle.js")
-
-        # 5) MobileApp schema (generic)
-        if '"MobileApplication"' not in html:
-            mobile_schema = f"""
-<script type="application/ld+json">
-{{
-  "@context": "https://schema.org",
-  "@type": "MobileApplication",
-  "name": "Obscure Holiday Calendar",
-  "operatingSystem": "Android, iOS",
-  "applicationCategory": "LifestyleApplication",
-  "url": "{APP_URL}",
-  "downloadUrl": [
-    "{ANDROID_URL}",
-    "{IOS_URL}"
-  ],
-  "offers": {{
-    "@type": "Offer",
-    "price": 0,
-    "priceCurrency": "USD"
-  }},
-  "publisher": {{
-    "@type": "Organization",
-    "name": "Obscure Holiday Calendar",
-    "logo": {{
-      "@type": "ImageObject",
-      "url": "{DOMAIN}/assets/app-icon.png"
-    }}
-  }}
-}}
-</script>
-"""
-            html = inject_into_head(html, mobile_schema, '"MobileApplication"')
-
-        # 6) Article + FAQ schema
-        if '"Article"' not in html:
-            article_schema = build_article_schema(headline, canonical, description)
-            html = inject_into_head(html, article_schema, '"Article"')
-        if '"FAQPage"' not in html:
-            faq_schema = build_faq_schema(headline, date_text)
-            html = inject_into_head(html, faq_schema, '"FAQPage"')
+    with build_profile.session(args, "generate_seo_pages") as prof, write_journal.session(args, "generate_seo_pages", prof):
+        for dirpath, dirnames, filenames in prof.iter("walk", os.walk(root)):
+            if "index.html" not in filenames:
+                continue
 
-        # 7) App backlinks at bottom
-        html = add_backlinks_to_bottom(html)
+            path = Path(dirpath) / "index.html"
+            folder_slug = Path(dirpath).name
 
-        path.write_text(html, encoding="utf-8")
-        updated += 1
+            with prof.page(folder_slug):
+                html = prof.read_text(path)
+                html = upgrade_page(html, folder_slug)
+                prof.write_text(path, html)
+            updated += 1
 
     print(f"Done! Cleaned & updated {updated} holiday pages.")
 
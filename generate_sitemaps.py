@@ -1,15 +1,25 @@
+import argparse
+import calendar
+import io
 import os
 import re
 import datetime
-import json
 from pathlib import Path
 from xml.etree.ElementTree import Element, SubElement, ElementTree
 
+import build_profile
+from build_cache import DepIndex, write_bytes_if_changed
+from holiday_data import iter_floating_holidays, iter_holidays, slugify
+
 DOMAIN = "https://www.obscureholidaycalendar.com"
 HOLIDAY_DIR = "holiday"
+HUB_DIR = "holidays"
 OUTPUT_DIR = "sitemaps"
 HOLIDAYS_JSON = Path("holidays.json")
 CURRENT_YEAR = datetime.date.today().year
+# Links between holiday pages (#related, #continue) are hand-maintained; the
+# walk below reads every page anyway, so it records them for DepIndex.
+HOLIDAY_LINK_RE = re.compile(r'href="(?:https://www\.obscureholidaycalendar\.com)?/holiday/([^"/?#]+)/"')
 STATIC_PAGE_PATHS = [
     "/",
     "/holiday/",
@@ -36,38 +46,74 @@ STATIC_PAGE_PATHS = [
 # Create output directory
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def slugify(name: str) -> str:
-    s = name.lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    return s.strip("-")
+def load_occurrences(years):
+    """
+    Return the occurrence table: slug -> {year: "MM-DD"} for each requested
+    year. Fixed-date holidays occur on the same MM-DD every year; a
+    floatingHolidays entry gets one row per year its dateRule resolves in
+    (see resolve_date_rule below). holidays.json is streamed once however
+    many years are asked for.
+    """
+    if not HOLIDAYS_JSON.exists():
+        return {}
+    table = {}
+    for date_key, _, item in iter_holidays(HOLIDAYS_JSON):
+        if not isinstance(item, dict):
+            continue
+        name = item.get("name")
+        if not name:
+            continue
+        slug = item.get("slug") or slugify(name)
+        mmdd = item.get("date", date_key)
+        table[slug] = {year: mmdd for year in years}
+
+    for slug, entry in iter_floating_holidays(HOLIDAYS_JSON):
+        if not isinstance(entry, dict):
+            continue
+        per_year = {}
+        for year in years:
+            resolved = resolve_date_rule(entry.get("dateRule"), year)
+            if resolved:
+                per_year[year] = f"{resolved[0]:02d}-{resolved[1]:02d}"
+        if per_year:
+            table[slug] = per_year
+    return table
 
 
 def load_slug_dates():
     """
-    Return mapping of slug -> MM-DD string from holidays.json's fixed-date
-    holidays, plus a resolved MM-DD for this year for any floatingHolidays
-    entry whose dateRule can be resolved (see resolve_date_rule below).
+    Return mapping of slug -> MM-DD string for this year: fixed-date
+    holidays plus every floatingHolidays entry whose dateRule resolves.
     """
-    if not HOLIDAYS_JSON.exists():
-        return {}
-    data = json.loads(HOLIDAYS_JSON.read_text(encoding="utf-8"))
-    holidays = data.get("holidays", {})
-    mapping = {}
-    for date_key, items in holidays.items():
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            name = item.get("name")
-            if not name:
-                continue
-            slug = item.get("slug") or slugify(name)
-            mapping[slug] = item.get("date", date_key)
+    return {slug: dates[CURRENT_YEAR] for slug, dates in load_occurrences([CURRENT_YEAR]).items()}
+
 
-    for slug, entry in data.get("floatingHolidays", {}).items():
-        resolved = resolve_date_rule(entry.get("dateRule"), CURRENT_YEAR)
-        if resolved:
-            mapping[slug] = f"{resolved[0]:02d}-{resolved[1]:02d}"
-    return mapping
+def parse_years(spec: str):
+    """"2025..2030", "2025,2027" or "2026" -> sorted list of years."""
+    years = set()
+    for part in spec.split(","):
+        part = part.strip()
+        try:
+            if ".." in part:
+                start, end = (int(y) for y in part.split(".."))
+                years.update(range(start, end + 1))
+            elif part:
+                years.add(int(part))
+        except ValueError:
+            raise SystemExit(f"Bad --years value {spec!r}; use e.g. 2025..2030 or 2025,2026")
+    if not years:
+        raise SystemExit("--years is empty")
+    return sorted(years)
+
+
+def lastmod_for(year: int, mmdd: str):
+    """YYYY-MM-DD for a holiday's date in year; Feb 29 becomes Feb 28 outside leap years."""
+    try:
+        mm, dd = (int(part) for part in mmdd.split("-"))
+        dd = min(dd, calendar.monthrange(year, mm)[1])
+        return f"{year}-{mm:02d}-{dd:02d}"
+    except Exception:
+        return None
 
 
 # --- floatingHolidays dateRule resolver ---
@@ -162,8 +208,7 @@ def create_sitemap(urls, output_file):
             last = SubElement(url_el, "lastmod")
             last.text = lastmod
 
-    tree = ElementTree(urlset)
-    tree.write(output_file, encoding="utf-8", xml_declaration=True)
+    return _write_tree(ElementTree(urlset), output_file)
 
 
 def create_sitemap_index(files, output_file):
@@ -178,8 +223,14 @@ def create_sitemap_index(files, output_file):
             last = SubElement(sm, "lastmod")
             last.text = lastmod
 
-    tree = ElementTree(sitemapindex)
-    tree.write(output_file, encoding="utf-8", xml_declaration=True)
+    return _write_tree(ElementTree(sitemapindex), output_file)
+
+
+def _write_tree(tree, output_file) -> bool:
+    """Serialize and write only if the bytes differ, so unchanged sitemaps keep their mtime (and lastmod)."""
+    buf = io.BytesIO()
+    tree.write(buf, encoding="utf-8", xml_declaration=True)
+    return write_bytes_if_changed(Path(output_file), buf.getvalue())
 
 
 def static_page_lastmod(path: str, fallback: str) -> str:
@@ -195,14 +246,38 @@ def static_page_lastmod(path: str, fallback: str) -> str:
     return fallback
 
 
-def main():
-    monthly = {f"{m:02d}": [] for m in range(1, 13)}
+def library_page_paths():
+    pages = Path(HOLIDAY_DIR) / "page"
+    numbers = sorted(int(p.parent.name) for p in pages.glob("*/index.html") if p.parent.name.isdigit())
+    return [f"/holiday/page/{n}/" for n in numbers]
+
+
+def hub_page_paths():
+    pages = sorted(Path(HUB_DIR).glob("*/index.html")) + sorted(Path(HUB_DIR).glob("*/*/index.html"))
+    return sorted(f"/{p.parent.as_posix()}/" for p in pages)
+
+
+def write_sitemap(prof, writer, urls, output_file):
+    with prof.phase("write"):
+        changed = writer(urls, output_file)
+    if changed:
+        prof.add_written(os.path.getsize(output_file))
+    return changed
+
+
+def build(prof, years):
+    monthly = {year: {f"{m:02d}": [] for m in range(1, 13)} for year in years}
     sitemap_files = []
     today_str = datetime.date.today().isoformat()
-    slug_dates = load_slug_dates()
-
-    # Walk holiday directory
-    for folder in Path(HOLIDAY_DIR).iterdir():
+    deps = DepIndex()
+    linked_pages = set()
+    with prof.phase("parse"):
+        occurrences = load_occurrences(years)
+    if HOLIDAYS_JSON.exists():
+        prof.add_read(HOLIDAYS_JSON.stat().st_size)
+
+    # Walk holiday directory once; each page lands in one monthly bucket per year.
+    for folder in prof.iter("walk", Path(HOLIDAY_DIR).iterdir()):
         index_file = folder / "index.html"
         if not index_file.exists():
             continue
@@ -210,51 +285,58 @@ def main():
         slug = folder.name
         url = f"{DOMAIN}/holiday/{slug}/"
 
-        date_mmdd = slug_dates.get(slug)
-        lastmod = None
-        if date_mmdd and "-" in date_mmdd:
-            try:
-                mm, dd = date_mmdd.split("-")
-                lastmod = f"{CURRENT_YEAR}-{int(mm):02d}-{int(dd):02d}"
-            except Exception:
-                pass
-
+        page_lastmod = None
         try:
-            html = index_file.read_text(encoding="utf-8")
-            m = re.search(r'<meta name="last-modified" content="([\\d-]+)"', html, flags=re.IGNORECASE)
+            with prof.page(slug):
+                html = prof.read_text(index_file)
+                m = re.search(r'<meta name="last-modified" content="([\\d-]+)"', html, flags=re.IGNORECASE)
+                deps.record("pages", index_file.as_posix(), [slug] + HOLIDAY_LINK_RE.findall(html))
+                linked_pages.add(index_file.as_posix())
             if m:
-                lastmod = m.group(1)
+                page_lastmod = m.group(1)
         except Exception:
             pass
 
-        month_bucket = date_mmdd.split("-")[0] if date_mmdd and "-" in date_mmdd else "12"
-        monthly[month_bucket].append((url, lastmod))
+        dates = occurrences.get(slug, {})
+        for year in years:
+            date_mmdd = dates.get(year)
+            lastmod = page_lastmod
+            if not lastmod and date_mmdd and "-" in date_mmdd:
+                lastmod = lastmod_for(year, date_mmdd)
+            month_bucket = date_mmdd.split("-")[0] if date_mmdd and "-" in date_mmdd else "12"
+            monthly[year][month_bucket].append((url, lastmod))
 
     # Generate monthly sitemaps
-    for month, entries in monthly.items():
-        if not entries:
-            continue
+    written = 0
+    for year in years:
+        for month, entries in monthly[year].items():
+            if not entries:
+                continue
 
-        filename = f"sitemap-{CURRENT_YEAR}-{month}.xml"
-        filepath = os.path.join(OUTPUT_DIR, filename)
+            filename = f"sitemap-{year}-{month}.xml"
+            filepath = os.path.join(OUTPUT_DIR, filename)
 
-        create_sitemap(entries, filepath)
-        lastmod = datetime.date.fromtimestamp(os.path.getmtime(filepath)).isoformat()
-        sitemap_files.append((filename, lastmod))
+            written += write_sitemap(prof, create_sitemap, entries, filepath)
+            deps.record("sitemaps", Path(filepath).as_posix(), (url.rsplit("/", 2)[1] for url, _ in entries))
+            lastmod = datetime.date.fromtimestamp(os.path.getmtime(filepath)).isoformat()
+            sitemap_files.append((filename, lastmod))
 
     # Static pages sitemap
     static_entries = []
     for path in STATIC_PAGE_PATHS:
         static_entries.append((f"{DOMAIN}{path}", static_page_lastmod(path, today_str)))
+    # Pages written by generate_holiday_index.py and generate_category_hubs.py
+    for path in library_page_paths() + hub_page_paths():
+        static_entries.append((f"{DOMAIN}{path}", static_page_lastmod(path, today_str)))
     static_filename = "sitemap-static.xml"
     static_path = os.path.join(OUTPUT_DIR, static_filename)
-    create_sitemap(static_entries, static_path)
+    written += write_sitemap(prof, create_sitemap, static_entries, static_path)
     lastmod = datetime.date.fromtimestamp(os.path.getmtime(static_path)).isoformat()
     sitemap_files.append((static_filename, lastmod))
 
     # Generate index — include every sitemap file that already exists on disk,
     # not just the ones (re)generated in this run. This only ever generates
-    # CURRENT_YEAR's monthly files, so without this, each run would silently
+    # the --years monthly files, so without this, each run would silently
     # drop every prior year's sitemaps from the index (this happened: the
     # index was missing all 12 of 2025's monthly sitemaps until fixed by hand
     # on 2026-07-11).
@@ -266,9 +348,26 @@ def main():
         lastmod = datetime.date.fromtimestamp(os.path.getmtime(filepath)).isoformat()
         sitemap_files.append((fname, lastmod))
 
-    create_sitemap_index(sitemap_files, "sitemap-index.xml")
+    written += write_sitemap(prof, create_sitemap_index, sitemap_files, "sitemap-index.xml")
+    deps.forget("pages", linked_pages)
+    deps.forget("sitemaps", (page for page in deps.pages if os.path.exists(page)))
+    deps.save()
+    return written
 
-    print("Done! Generated sitemap-index.xml and monthly sitemaps.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate monthly, static and index sitemaps.")
+    parser.add_argument("--years", default=str(CURRENT_YEAR),
+                        help=f"Years to write monthly sitemaps for, e.g. 2025..2030 or 2025,2026 (default: {CURRENT_YEAR})")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+    years = parse_years(args.years)
+
+    with build_profile.session(args, "generate_sitemaps") as prof:
+        written = build(prof, years)
+
+    print(f"Done! Generated sitemap-index.xml and monthly sitemaps for {', '.join(map(str, years))} "
+          f"({written} file(s) changed).")
 
 
 if __name__ == "__main__":
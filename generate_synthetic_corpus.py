@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic corpus for scale testing the build scripts.
+
+Writes, under --out:
+- holidays.json with N fixed-date holidays spread over every MM-DD key and a
+  floatingHolidays section covering every dateRule type generate_sitemaps
+  resolves (nth-weekday-of-month, solstice, equinox, relative-to-event).
+- holiday/<slug>/index.html for every holiday. The built-in template is the
+  pre-upgrade page shape, so it carries every anchor the upgrade_*,
+  generate_seo_pages and cleanup passes inject at. --page-template clones a
+  real page instead (its name and slug are substituted).
+
+The same --seed and sizes always produce byte-identical output.
+
+Usage:
+  python3 generate_synthetic_corpus.py --out /tmp/corpus --holidays 7320
+  python3 generate_synthetic_corpus.py --out /tmp/corpus --holidays 73200 --page-template holiday/bacon-day/index.html
+"""
+
+import argparse
+import html
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from holiday_data import slugify
+
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+DAYS_IN_MONTH = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+PREFIXES = ["National", "International", "World", "Global", ""]
+ADJECTIVES = [
+    "Crispy", "Silly", "Forgotten", "Tiny", "Giant", "Purple", "Backward", "Sleepy",
+    "Curious", "Golden", "Polite", "Upside-Down", "Secret", "Homemade", "Lucky", "Quiet",
+]
+NOUNS = [
+    "Pancake", "Penguin", "Stapler", "Houseplant", "Kazoo", "Pretzel", "Sock", "Lighthouse",
+    "Crossword", "Meteor", "Teapot", "Bagel", "Library", "Umbrella", "Walrus", "Accordion",
+]
+EMOJI = ["🎉", "🥞", "🐧", "📎", "🪴", "🎺", "🥨", "🧦", "🗼", "🧩", "☄️", "🫖", "🥯", "📚", "☂️", "🦭"]
+FACTS = [
+    "The {noun} has been celebrated in small towns for decades.",
+    "Historians trace the first {noun} festival to a local newspaper prank.",
+    "Some schools mark the day with {noun}-themed art projects.",
+    "The most common way to celebrate is sharing a {noun} photo with friends.",
+    "A record-setting {noun} gathering once drew more than 2,000 people.",
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <title>{name} — Obscure Holiday Calendar</title>
+  <meta name="description" content="{summary}" />
+  <meta name="last-modified" content="{lastmod}" />
+  <link rel="canonical" href="https://www.obscureholidaycalendar.com/holiday/{slug}/" />
+  <style>
+    body {{
+      margin: 0;
+      font-family: "Manrope", "Inter", system-ui, -apple-system, sans-serif;
+    }}
+    .page-wrap {{
+      max-width: 1120px;
+      margin: 0 auto;
+      padding: 18px 16px 42px;
+    }}
+    .holiday-card {{
+      background: linear-gradient(180deg, #ffffff 0%, #f8f5ff 100%);
+      border-radius: 22px;
+      padding: 32px;
+    }}
+  </style>
+</head>
+<body class="page">
+  <header class="site-header">
+    <nav class="nav-links">
+      <a href="/holiday/">Holidays</a>
+      <a href="/about/">About</a>
+      <a href="/contact/">Contact</a>
+      <a href="/privacy/">Privacy</a>
+    </nav>
+  </header>
+  <main id="main" class="page-wrap">
+    <div class="quick-links" aria-label="Page quick links">
+      <a href="#overview">Overview</a>
+      <a href="#celebrate">Celebrate</a>
+      <a href="#related">Related</a>
+    </div>
+    <article class="holiday-card">
+      <header class="hero">
+        <h1 class="holiday-title">{name} <span class="holiday-emoji" aria-hidden="true">{emoji}</span></h1>
+        <div class="date">{date_text}</div>
+        <img src="/assets/badges/{slug}.svg" alt="{name} badge" class="hero-badge" />
+      </header>
+      <section class="section" id="overview">
+        <h2>Overview</h2>
+        <p>{description}</p>
+      </section>
+
+      <section class="section" id="celebrate">
+        <h2>How to Celebrate {name}</h2>
+        <ul class="list">{facts}</ul>
+      </section>
+      <section class="section" id="continue">
+        <h2>Continue to</h2>
+        <ul class="link-list">{continue_links}</ul>
+      </section>
+      <section class="section" id="related">
+        <h2>Related holidays</h2>
+        <ul class="link-list">{related_links}</ul>
+      </section>
+      <section class="section" id="recently-viewed">
+        <h2>Recently viewed holidays</h2>
+        <ul class="recent-list" aria-live="polite"></ul>
+      </section>
+    </article>
+  </main>
+  <footer class="site-footer">
+    <div class="footer-links">
+      <a href="/">Home</a>
+      <a href="/holiday/">Holidays</a>
+    </div>
+    <p>&copy; 2026 Obscure Holiday Calendar</p>
+  </footer>
+  <script>
+    (function() {{
+      const recentList = document.querySelector('.recent-list');
+      const pageData = {{ slug: "{slug}", name: {name_js}, url: "https://www.obscureholidaycalendar.com/holiday/{slug}/" }};
+      function loadRecents() {{
+        try {{
+          const raw = localStorage.getItem('ohc_recent');
+          return raw ? JSON.parse(raw) : [];
+        }} catch (e) {{
+          return [];
+        }}
+      }}
+      function addRecent() {{
+        const recents = loadRecents().filter(item => item.slug !== pageData.slug);
+        recents.unshift(pageData);
+        if (recents.length > 6) recents.length = 6;
+        try {{ localStorage.setItem('ohc_recent', JSON.stringify(recents)); }} catch(e) {{}}
+      }}
+      function renderRecents() {{
+        if (!recentList) return;
+        const recents = loadRecents().filter(item => item.slug !== pageData.slug);
+        recentList.innerHTML = recents.map(item => `<li><a href="${{item.url}}">${{item.name}}</a></li>`).join('');
+      }}
+      addRecent();
+      renderRecents();
+    }})();
+  </script>
+</body>
+</html>
+"""
+
+
+def ordinal(n: int) -> str:
+    if 10 <= n % 100 <= 20:
+        return f"{n}th"
+    return f"{n}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')}"
+
+
+def date_keys() -> List[str]:
+    return [f"{m + 1:02d}-{d:02d}" for m in range(12) for d in range(1, DAYS_IN_MONTH[m] + 1)]
+
+
+def _unique_name(rng: random.Random, used: set) -> str:
+    while True:
+        prefix = rng.choice(PREFIXES)
+        name = " ".join(p for p in (prefix, rng.choice(ADJECTIVES), rng.choice(NOUNS), "Day") if p)
+        if slugify(name) not in used:
+            return name
+        # Fall back to a numbered variant once the word lists run dry.
+        numbered = f"{name[:-4]} {len(used)} Day"
+        if slugify(numbered) not in used:
+            return numbered
+
+
+def _entry(rng: random.Random, name: str, month: Optional[int], day: Optional[int]) -> Dict:
+    noun = next((n for n in NOUNS if n in name), "holiday").lower()
+    when = f"celebrated annually on {MONTH_NAMES[month - 1]} {ordinal(day)}" if month else "whose date shifts each year"
+    description = (
+        f"{name}, {when}, invites everyone to slow down "
+        f"and appreciate the humble {noun}. Fans mark the day with themed snacks, classroom activities and "
+        f"plenty of photos shared online."
+    )
+    entry = {
+        "description": description,
+        "emoji": rng.choice(EMOJI),
+        "funFacts": [f.format(noun=noun) for f in rng.sample(FACTS, rng.randint(2, len(FACTS)))],
+        "name": name,
+    }
+    if month:
+        entry["date"] = f"{month:02d}-{day:02d}"
+    return entry
+
+
+def _floating_rule(rng: random.Random, i: int) -> Dict:
+    kind = i % 4
+    if kind == 0:
+        return {"type": "nth-weekday-of-month", "month": rng.randint(1, 12), "weekday": rng.randint(0, 6),
+                "ordinal": rng.choice([1, 2, 3, 4, -1])}
+    if kind == 1:
+        return {"type": "solstice", "season": rng.choice(["summer", "winter"])}
+    if kind == 2:
+        return {"type": "equinox", "season": rng.choice(["spring", "fall"])}
+    return {"type": "relative-to-event", "event": rng.choice(["march-equinox", "december-solstice"]),
+            "weekday": rng.randint(0, 6), "direction": rng.choice(["before", "after"])}
+
+
+def build_catalog(holidays: int, floating: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    keys = date_keys()
+    used = set()
+    fixed: Dict[str, List[Dict]] = {k: [] for k in keys}
+    for i in range(holidays):
+        key = keys[i % len(keys)]
+        name = _unique_name(rng, used)
+        used.add(slugify(name))
+        fixed[key].append(_entry(rng, name, int(key[:2]), int(key[3:])))
+    floating_section = {}
+    for i in range(floating):
+        name = _unique_name(rng, used)
+        slug = slugify(name)
+        used.add(slug)
+        entry = _entry(rng, name, None, None)
+        entry["dateRule"] = _floating_rule(rng, i)
+        floating_section[slug] = entry
+    return {"floatingHolidays": floating_section, "holidays": {k: v for k, v in fixed.items() if v}}
+
+
+def render_page(entry: Dict, slug: str, neighbours: List[Dict], template: Optional[str], template_name: str, template_slug: str) -> str:
+    month, day = (int(entry["date"][:2]), int(entry["date"][3:])) if "date" in entry else (None, None)
+    if template is not None:
+        return template.replace(template_name, entry["name"]).replace(template_slug, slug)
+    links = "".join(
+        f'<li><a href="/holiday/{n["slug"]}/">{html.escape(n["name"])}</a></li>' for n in neighbours
+    )
+    return PAGE_TEMPLATE.format(
+        name=html.escape(entry["name"]),
+        name_js=json.dumps(entry["name"], ensure_ascii=False),
+        slug=slug,
+        summary=html.escape(entry["description"][:150]),
+        description=html.escape(entry["description"]),
+        emoji=entry["emoji"],
+        date_text=f"{MONTH_NAMES[month - 1]} {day}" if month else "Date varies each year",
+        lastmod=f"2026-{month or 1:02d}-{day or 1:02d}",
+        facts="".join(f"<li>{html.escape(f)}</li>" for f in entry["funFacts"]),
+        continue_links=links,
+        related_links=links,
+    )
+
+
+def write_corpus(out: Path, holidays: int, floating: int, seed: int = 2026, page_template: Optional[Path] = None) -> Dict[str, int]:
+    """Write holidays.json and holiday/<slug>/index.html under out; returns counts."""
+    catalog = build_catalog(holidays, floating, seed)
+    out.mkdir(parents=True, exist_ok=True)
+    with open(out / "holidays.json", "w", encoding="utf-8") as fh:
+        json.dump(catalog, fh, ensure_ascii=False, indent=2)
+
+    template = template_name = template_slug = None
+    if page_template:
+        template = page_template.read_text(encoding="utf-8")
+        template_slug = page_template.parent.name
+        template_name = html.unescape(template.split("<title>", 1)[1].split(" — ", 1)[0]) if "<title>" in template else template_slug
+
+    pages = [(slugify(e["name"]), e) for items in catalog["holidays"].values() for e in items]
+    pages += list(catalog["floatingHolidays"].items())
+    summaries = [{"slug": slug, "name": e["name"]} for slug, e in pages]
+    for i, (slug, entry) in enumerate(pages):
+        neighbours = [summaries[(i + k) % len(summaries)] for k in (-1, 1, 7)]
+        page_dir = out / "holiday" / slug
+        page_dir.mkdir(parents=True, exist_ok=True)
+        (page_dir / "index.html").write_text(
+            render_page(entry, slug, neighbours, template, template_name, template_slug), encoding="utf-8"
+        )
+    return {"holidays": holidays, "floating": floating, "pages": len(pages)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic holidays.json and holiday pages.")
+    parser.add_argument("--out", required=True, help="Output directory (created if missing)")
+    parser.add_argument("--holidays", type=int, default=732, help="Fixed-date holidays to generate (default: 732)")
+    parser.add_argument("--floating", type=int, help="Floating holidays (default: 1.5%% of --holidays, at least 4)")
+    parser.add_argument("--seed", type=int, default=2026, help="Random seed (default: 2026)")
+    parser.add_argument("--page-template", help="Clone this real holiday page instead of the built-in template")
+    args = parser.parse_args()
+
+    floating = args.floating if args.floating is not None else max(4, args.holidays * 15 // 1000)
+    counts = write_corpus(Path(args.out), args.holidays, floating, args.seed,
+                          Path(args.page_template) if args.page_template else None)
+    print(f"Wrote {counts['holidays']} fixed + {counts['floating']} floating holidays and {counts['pages']} pages to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Shared readers for holidays.json.
+
+load_holidays() parses the whole file, which is fine at today's size. The
+iter_* functions stream it instead: a small pull parser walks the top-level
+object and decodes one entry (or one MM-DD bucket) at a time with
+json.JSONDecoder.raw_decode, so memory stays bounded by the largest single
+entry rather than the catalog.
+
+    for date_key, index, entry in iter_holidays(Path("holidays.json")):
+        ...
+"""
+
+import csv
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 1 << 16
+REPORT_ROWS_CSV = Path("reports") / "2026_national_day_report_rows.csv"
+_WHITESPACE = " \t\r\n"
+
+
+def slugify(name: str) -> str:
+    s = name.lower()
+    s = s.replace("&", "and")
+    s = re.sub(r"[^a-z0-9]+", "-", s)
+    return s.strip("-")
+
+
+def load_holidays(path: Path) -> Dict[str, Any]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict) and "holidays" in data:
+        return data
+    raise ValueError("Expected top-level {'holidays': {...}} structure")
+
+
+class _StreamReader:
+    """Pull-based JSON reader over a text file that keeps only a chunk or two in memory."""
+
+    def __init__(self, fh, chunk_size: int = CHUNK_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next significant character ('' at EOF)."""
+        while True:
+            buf, pos, n = self.buf, self.pos, len(self.buf)
+            while pos < n and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON: expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete value at the cursor."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # A value ending exactly at the buffer edge may be a truncated
+            # number; read on until something follows it.
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield each key of the object at the cursor; the caller must consume its value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError("Malformed JSON: expected an object key")
+            key = self.value()
+            self.expect(":")
+            yield key
+            sep = self.peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"Malformed JSON: expected ',' or '}}', found {sep or 'end of file'!r}")
+
+    def iter_array(self) -> Iterator[int]:
+        """Yield each index of the array at the cursor; the caller must consume its value."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"Malformed JSON: expected ',' or ']', found {sep or 'end of file'!r}")
+
+    def skip(self) -> None:
+        """Consume the value at the cursor without materialising containers."""
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip()
+        else:
+            self.value()
+
+
+def _iter_section(path: Path, section: str, consume: Callable[[_StreamReader], Iterator], required: bool):
+    with open(path, encoding="utf-8") as fh:
+        reader = _StreamReader(fh)
+        if reader.peek() != "{":
+            raise ValueError("Expected top-level {'holidays': {...}} structure")
+        found = False
+        for key in reader.iter_object():
+            if key == section:
+                found = True
+                yield from consume(reader)
+            else:
+                reader.skip()
+    if required and not found:
+        raise ValueError("Expected top-level {'holidays': {...}} structure")
+
+
+def _consume_buckets(reader: _StreamReader):
+    if reader.peek() != "{":
+        raise ValueError("Expected 'holidays' to be an object of MM-DD buckets")
+    for date_key in reader.iter_object():
+        yield date_key, reader.value()
+
+
+def _consume_entries(reader: _StreamReader):
+    if reader.peek() != "{":
+        raise ValueError("Expected 'holidays' to be an object of MM-DD buckets")
+    for date_key in reader.iter_object():
+        if reader.peek() != "[":
+            reader.skip()
+            continue
+        for index in reader.iter_array():
+            yield date_key, index, reader.value()
+
+
+def _consume_floating(reader: _StreamReader):
+    if reader.peek() != "{":
+        reader.skip()
+        return
+    for slug in reader.iter_object():
+        yield slug, reader.value()
+
+
+def iter_holidays(path: Path) -> Iterator[Tuple[str, int, Any]]:
+    """Yield (date_key, index, entry) for every fixed-date holiday, streaming the file."""
+    return _iter_section(path, "holidays", _consume_entries, required=True)
+
+
+def iter_holiday_buckets(path: Path) -> Iterator[Tuple[str, Any]]:
+    """Yield (date_key, items) per MM-DD key; only one day's bucket is held at a time."""
+    return _iter_section(path, "holidays", _consume_buckets, required=True)
+
+
+def iter_floating_holidays(path: Path) -> Iterator[Tuple[str, Any]]:
+    """Yield (slug, entry) from the optional floatingHolidays section."""
+    return _iter_section(path, "floatingHolidays", _consume_floating, required=False)
+
+
+def entry_index(path: Path) -> Dict[str, list]:
+    """
+    {slug: [entry hash, name, date]} for every fixed and floating entry, for
+    diffing two copies of the data; date is MM-DD, or the rule for floating
+    holidays.
+    """
+    def digest(entry) -> str:
+        data = json.dumps(entry, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    entries = {}
+    for date_key, _, entry in iter_holidays(path):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        slug = entry.get("slug") or slugify(entry["name"])
+        entries[slug] = [digest(entry), entry["name"], entry.get("date", date_key)]
+    for slug, entry in iter_floating_holidays(path):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        rule = json.dumps([entry.get("dateRule"), entry.get("originalDate")], sort_keys=True)
+        entries[slug] = [digest(entry), entry["name"], rule]
+    return entries
+
+
+def category_lookup(rows_csv: Path = REPORT_ROWS_CSV) -> Callable[[str, str], Optional[str]]:
+    """Return lookup(name, slug) -> category from the report rows CSV (None if unlisted)."""
+    by_name = {}
+    by_slug = {}
+    if rows_csv.exists():
+        with open(rows_csv, encoding="utf-8", newline="") as fh:
+            for row in csv.DictReader(fh):
+                by_name[row["name"]] = row["category"]
+                by_slug[slugify(row["name"])] = row["category"]
+
+    def lookup(name: str, slug: str) -> Optional[str]:
+        return by_name.get(name) or by_slug.get(slug) or by_slug.get(slugify(name))
+
+    return lookup
+
+
+def load_categories(holidays_path: Path, rows_csv: Path = REPORT_ROWS_CSV) -> Dict[str, str]:
+    """
+    Map page slug -> category. holidays.json has no category field; the
+    assignments live in the national-day report's rows CSV, keyed by name,
+    so entries are joined on name (falling back to the slugified name).
+    Holidays missing from the CSV are left out.
+    """
+    if not rows_csv.exists():
+        return {}
+    lookup = category_lookup(rows_csv)
+    mapping = {}
+    for _, _, entry in iter_holidays(holidays_path):
+        if isinstance(entry, dict) and entry.get("name"):
+            slug = entry.get("slug") or slugify(entry["name"])
+            category = lookup(entry["name"], slug)
+            if category:
+                mapping[slug] = category
+    for slug, entry in iter_floating_holidays(holidays_path):
+        if isinstance(entry, dict) and entry.get("name"):
+            category = lookup(entry["name"], slug)
+            if category:
+                mapping[slug] = category
+    return mapping
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Output stage: strip insignificant whitespace and comments from site pages.
+
+Run after the page scripts (generate_seo_pages, upgrade_*, cleanup, partials,
+visual upgrade, structured_data, defer_third_party, optimize_images, purge_css,
+speculation_hints) and before precompress_assets.py. What it does:
+
+- Text between tags: whitespace runs collapse to one newline (if the run
+  had one) or one space, so inline spacing is preserved.
+- Tags: whitespace between attributes collapses to one space; quoted
+  values are untouched.
+- Comments are dropped, except marker comments the scripts search for
+  (all-caps ones such as <!-- HOLIDAY-FOOTER --> or <!-- BREADCRUMB-SCHEMA -->,
+  plus PRESERVED_COMMENTS) and conditional comments.
+- <script type="application/ld+json"> is re-serialised with
+  json.dumps(separators=(",", ":")); invalid JSON is only dedented.
+- Other inline <script> blocks are dedented line by line (never joined,
+  never touched inside multi-line template literals).
+- <style> drops CSS comments and whitespace around { } ; , >.
+- <pre> and <textarea> are left exactly as they are.
+
+The output is a fixed point (minifying twice changes nothing), and every
+marker the other scripts check for survives, so they can be re-run on
+minified pages. Hashes of minified output are kept in .build/minify.json so
+unchanged pages are skipped without re-parsing.
+
+Usage:
+  python3 minify_html.py                  # every page under holiday/
+  python3 minify_html.py holiday about index.html
+  python3 minify_html.py --dry-run --verbose
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+
+import build_profile
+from build_cache import HashCache, content_hash
+
+DEFAULT_PATHS = ["holiday"]
+# Lowercase comments that a script matches on (generate_seo_pages.remove_legacy_ads_block).
+PRESERVED_COMMENTS = {"AdSense banner"}
+TOP_SAVINGS = 10
+
+TOKEN_RE = re.compile(
+    r"<!--.*?-->"
+    r"|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>"
+    r"|<[A-Za-z/!][^>]*>"
+    r"|[^<]+"
+    r"|<",
+    re.DOTALL | re.IGNORECASE,
+)
+RAW_SPLIT_RE = re.compile(r"(<[^>]*>)(.*)(</[^>]*>)$", re.DOTALL)
+MARKER_COMMENT_RE = re.compile(r"<!--\s*[^a-z]*?\s*-->$|<!--\[if|<!\[endif", re.DOTALL)
+TAG_SPACE_RE = re.compile(r"(\"[^\"]*\"|'[^']*')|\s+")
+TEXT_SPACE_RE = re.compile(r"\s+")
+SCRIPT_TYPE_RE = re.compile(r"\btype\s*=\s*[\"']?([^\"'\s>]+)", re.IGNORECASE)
+CSS_STRING_RE = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'")
+CSS_TOKEN_RE = re.compile(r"(" + CSS_STRING_RE.pattern + r")|/\*.*?\*/|\s+", re.DOTALL)
+CSS_PUNCT_RE = re.compile(r" ?([{};,>]) ?")
+JS_TYPES = {"text/javascript", "application/javascript", "module"}
+
+
+def _collapse_text(text: str) -> str:
+    return TEXT_SPACE_RE.sub(lambda m: "\n" if "\n" in m.group() else " ", text)
+
+
+def minify_tag(tag: str) -> str:
+    tag = TAG_SPACE_RE.sub(lambda m: m.group(1) or " ", tag)
+    # Only the closing delimiter is trimmed; attribute values are left alone.
+    if tag.endswith(" >"):
+        return tag[:-2] + ">"
+    if tag.endswith(" />"):
+        last = tag[:-3].rsplit(" ", 1)[-1]
+        # An unquoted value would take the slash: <img src=a.png/> means src="a.png/".
+        if "=" not in last or last.endswith(("\"", "'")):
+            return tag[:-3] + "/>"
+    return tag
+
+
+def minify_css(css: str) -> str:
+    # Comments vanish and whitespace runs become one space; strings stay verbatim.
+    pieces = []
+    pos = 0
+    for m in CSS_TOKEN_RE.finditer(css):
+        pieces.append(css[pos:m.start()])
+        if m.group(1):
+            pieces.append(m.group(1))
+        elif not m.group().startswith("/*"):
+            pieces.append(" ")
+        pos = m.end()
+    pieces.append(css[pos:])
+    css = "".join(pieces)
+
+    # Then drop the spaces around punctuation, again skipping strings.
+    pieces = []
+    pos = 0
+    for m in CSS_STRING_RE.finditer(css):
+        pieces.append(CSS_PUNCT_RE.sub(r"\1", re.sub(r" {2,}", " ", css[pos:m.start()])))
+        pieces.append(m.group())
+        pos = m.end()
+    pieces.append(CSS_PUNCT_RE.sub(r"\1", re.sub(r" {2,}", " ", css[pos:])))
+    return "".join(pieces).replace(";}", "}").strip()
+
+
+def minify_json_ld(body: str):
+    """Compact JSON-LD, or None if the block isn't valid JSON."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    # Escape "</" so a string value can never close the <script> element.
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+
+def dedent_script(js: str) -> str:
+    """Strip indentation and blank lines, leaving multi-line template literals alone."""
+    out = []
+    in_template = False
+    for line in js.split("\n"):
+        starts_in_template = in_template
+        ticks = len(re.findall(r"(?<!\\)`", line))
+        in_template ^= ticks % 2 == 1
+        if not starts_in_template:
+            line = line.lstrip()
+            if not line:
+                continue
+        if not in_template:
+            line = line.rstrip()
+        out.append(line)
+    return "\n".join(out)
+
+
+def minify_raw(element: str, name: str) -> str:
+    m = RAW_SPLIT_RE.match(element)
+    if not m:
+        return element
+    open_tag, body, close_tag = m.groups()
+    open_tag = minify_tag(open_tag)
+    if name == "style":
+        body = minify_css(body)
+    elif name == "script" and body.strip():
+        type_m = SCRIPT_TYPE_RE.search(open_tag)
+        script_type = type_m.group(1).lower() if type_m else "text/javascript"
+        if script_type == "application/ld+json":
+            body = minify_json_ld(body)
+            if body is None:
+                body = dedent_script(m.group(2))
+        elif script_type in JS_TYPES:
+            body = dedent_script(body)
+        if "\n" in body:
+            body = "\n" + body + "\n"
+    # <pre>/<textarea> bodies are significant whitespace: leave them.
+    return open_tag + body + close_tag
+
+
+def minify_html(html: str) -> str:
+    out = []
+    pending = []
+
+    def flush():
+        if pending:
+            out.append(_collapse_text("".join(pending)))
+            pending.clear()
+
+    for m in TOKEN_RE.finditer(html):
+        token = m.group()
+        if token.startswith("<!--"):
+            inner = token[4:-3].strip()
+            if MARKER_COMMENT_RE.match(token) or inner in PRESERVED_COMMENTS:
+                flush()
+                out.append(token)
+            continue
+        if m.group(1):
+            flush()
+            out.append(minify_raw(token, m.group(1).lower()))
+        elif token.startswith("<") and len(token) > 1:
+            flush()
+            out.append(minify_tag(token))
+        else:
+            pending.append(token)
+    flush()
+    return "".join(out).strip() + "\n"
+
+
+def iter_pages(paths):
+    for base in paths:
+        base = Path(base)
+        if base.is_file():
+            yield base
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames.sort()
+            for fname in sorted(filenames):
+                if fname.endswith(".html"):
+                    yield Path(dirpath) / fname
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify site HTML (whitespace, comments, JSON-LD, inline CSS/JS indentation).")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS, help="Files or directories (default: holiday)")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing")
+    parser.add_argument("--verbose", action="store_true", help="Print bytes saved for every page")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    cache = HashCache("minify")
+    savings = []
+    pages = skipped = 0
+    with build_profile.session(args, "minify_html") as prof:
+        for path in prof.iter("walk", iter_pages(args.paths)):
+            pages += 1
+            key = path.as_posix()
+            with prof.page(key):
+                html = prof.read_text(path)
+                if cache.get(key) == content_hash(html.encode("utf-8")):
+                    skipped += 1
+                    continue
+                minified = minify_html(html)
+                before, after = len(html.encode("utf-8")), len(minified.encode("utf-8"))
+                if minified != html:
+                    savings.append((before - after, before, key))
+                    if not args.dry_run:
+                        prof.write_text(path, minified)
+                if not args.dry_run:
+                    cache.set(key, content_hash(minified.encode("utf-8")))
+        if not args.dry_run:
+            cache.save()
+
+    savings.sort(reverse=True)
+    if args.verbose:
+        for saved, before, key in savings:
+            print(f"{saved:>9} B  {saved / before:6.1%}  {key}")
+    else:
+        for saved, before, key in savings[:TOP_SAVINGS]:
+            print(f"{saved:>9} B  {saved / before:6.1%}  {key}")
+    total_saved = sum(s for s, _, _ in savings)
+    total_before = sum(b for _, b, _ in savings)
+    verb = "Would minify" if args.dry_run else "Minified"
+    ratio = f" ({total_saved / total_before:.1%})" if total_before else ""
+    print(f"{verb} {len(savings)} of {pages} page(s), {skipped} unchanged since last run; "
+          f"saved {total_saved / 1024:.1f} KB{ratio}.")
+
+
+if __name__ == "__main__":
+    main()
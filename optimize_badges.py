@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Minify assets/badges/*.svg in place and build <symbol> sprite sheets.
+
+Per badge:
+- drops XML prologs, comments, <metadata> and editor (inkscape/sodipodi) cruft;
+- removes line-break whitespace between tags and collapses it inside tags;
+- rounds numbers in geometry attributes to --precision decimals;
+- shortens #rrggbb colours to #rgb where possible;
+- merges identical gradient/pattern defs and rewrites their references.
+
+Then groups badges by month (holidays.json, floating holidays resolved for
+this year) or by --group category (report rows CSV) into
+assets/badges/sprites/<group>.svg. Each badge becomes <symbol id="<slug>">.
+Defs are shared and deduplicated across the sheet, with ids prefixed by the
+group so two sheets can be inlined on one page. sprites/index.json maps
+slug -> sheet, so list pages can use one request per sheet:
+
+    <svg viewBox="0 0 240 120"><use href="/assets/badges/sprites/01.svg#absurdity-day"/></svg>
+
+Minified-badge hashes live in .build/badges.json. Unchanged badges are not
+re-minified, and a sheet is only rewritten when its members change.
+
+Usage:
+  python3 optimize_badges.py
+  python3 optimize_badges.py --group category --precision 1
+  python3 optimize_badges.py --dry-run
+"""
+
+import argparse
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+import build_profile
+from build_cache import HashCache, content_hash, write_atomic
+from generate_sitemaps import load_slug_dates
+from holiday_data import load_categories, slugify
+from minify_html import minify_tag
+
+BADGE_DIR = Path("assets") / "badges"
+SPRITE_DIR = BADGE_DIR / "sprites"
+HOLIDAYS_JSON = Path("holidays.json")
+UNGROUPED = "other"
+
+DROP_RE = re.compile(
+    r"<\?xml.*?\?>|<!DOCTYPE[^>]*>|<!--.*?-->|<metadata\b.*?</metadata>|<sodipodi:[^>]*/>|<sodipodi:.*?</sodipodi:[^>]*>",
+    re.DOTALL | re.IGNORECASE,
+)
+EDITOR_ATTR_RE = re.compile(r'\s(?:xmlns:)?(?:inkscape|sodipodi|rdf|cc|dc)(?::[\w-]+)?="[^"]*"')
+BETWEEN_TAGS_RE = re.compile(r">[ \t\r]*\n\s*<")
+TAG_RE = re.compile(r"<[^>]+>")
+GEOMETRY_ATTR_RE = re.compile(
+    r'\b(x|y|x1|y1|x2|y2|cx|cy|r|rx|ry|fx|fy|width|height|d|points|viewBox|transform|stroke-width|font-size|dx|dy)="([^"]*)"'
+)
+NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+COLOR_ATTR_RE = re.compile(r'\b(fill|stroke|stop-color|flood-color|lighting-color|color)="#([0-9a-fA-F])\2([0-9a-fA-F])\3([0-9a-fA-F])\4"')
+DEF_RE = re.compile(
+    r'<(linearGradient|radialGradient|pattern|clipPath|mask|filter)\b([^>]*?)\sid="([^"]+)"([^>]*)>(.*?)</\1>',
+    re.DOTALL,
+)
+ROOT_RE = re.compile(r"<svg\b([^>]*)>(.*)</svg>\s*$", re.DOTALL)
+ID_RE = re.compile(r'\sid="([^"]+)"')
+
+
+def _round(value: str, precision: int) -> str:
+    """Round decimals in value, re-separating numbers that path data ran together (e.g. "1.004.5")."""
+    out, last, prev = [], 0, None
+    for m in NUMBER_RE.finditer(value):
+        text = m.group()
+        if "." in text:
+            text = f"{float(text):.{precision}f}".rstrip("0").rstrip(".")
+            if text in ("", "-", "-0"):
+                text = "0"
+        gap = value[last:m.start()]
+        # With no separator, "1" then ".5" or "0" then "5" would read as one number.
+        if prev is not None and not gap:
+            if text[0].isdigit() or text[0] == "." and "." not in prev and "e" not in prev.lower():
+                gap = " "
+        out.append(gap + text)
+        last, prev = m.end(), text
+    out.append(value[last:])
+    return "".join(out)
+
+
+def _rename_refs(svg: str, renames) -> str:
+    for old, new in renames.items():
+        svg = svg.replace(f"url(#{old})", f"url(#{new})").replace(f'href="#{old}"', f'href="#{new}"')
+    return svg
+
+
+def dedupe_defs(svg: str, new_id=None) -> str:
+    """Merge defs that differ only by id; new_id(n) optionally renames the survivors."""
+    seen = {}
+    renames = {}
+
+    def visit(m):
+        tag, before, old, after, body = m.groups()
+        key = (tag, before + after, body)
+        if key in seen:
+            renames[old] = seen[key]
+            return ""
+        seen[key] = new_id(len(seen)) if new_id else old
+        if seen[key] != old:
+            renames[old] = seen[key]
+        return f'<{tag}{before} id="{seen[key]}"{after}>{body}</{tag}>'
+
+    return _rename_refs(DEF_RE.sub(visit, svg), renames)
+
+
+def minify_svg(svg: str, precision: int = 2) -> str:
+    svg = DROP_RE.sub("", svg)
+    svg = EDITOR_ATTR_RE.sub("", svg)
+    svg = BETWEEN_TAGS_RE.sub("><", svg.strip())
+    svg = TAG_RE.sub(lambda m: minify_tag(m.group()), svg)
+    svg = GEOMETRY_ATTR_RE.sub(lambda m: f'{m.group(1)}="{_round(m.group(2), precision)}"', svg)
+    svg = COLOR_ATTR_RE.sub(lambda m: f'{m.group(1)}="#{(m.group(2) + m.group(3) + m.group(4)).lower()}"', svg)
+    svg = dedupe_defs(svg)
+    return svg.replace("<defs></defs>", "").replace("<defs/>", "")
+
+
+def to_symbol(slug: str, svg: str):
+    """Split a minified badge into (symbol markup, defs markup)."""
+    m = ROOT_RE.search(svg)
+    if not m:
+        raise ValueError(f"{slug}: no <svg> root")
+    attrs, body = m.groups()
+    defs = []
+
+    def take_defs(dm):
+        defs.append(dm.group(1))
+        return ""
+
+    body = re.sub(r"<defs>(.*?)</defs>", take_defs, body, flags=re.DOTALL)
+    # Ids are only unique per badge; prefix them so symbols can share a sheet.
+    local_ids = ID_RE.findall("".join(defs) + body)
+    renames = {old: f"{slug}-{old}" for old in local_ids}
+    defs_markup = _rename_refs(ID_RE.sub(lambda im: f' id="{renames[im.group(1)]}"', "".join(defs)), renames)
+    body = _rename_refs(ID_RE.sub(lambda im: f' id="{renames[im.group(1)]}"', body), renames)
+
+    keep = []
+    for name in ("viewBox", "aria-label"):
+        am = re.search(rf'\b{name}="([^"]*)"', attrs)
+        if am:
+            keep.append(f'{name}="{am.group(1)}"')
+    if not any(k.startswith("viewBox") for k in keep):
+        w = re.search(r'\bwidth="([\d.]+)"', attrs)
+        h = re.search(r'\bheight="([\d.]+)"', attrs)
+        if w and h:
+            keep.insert(0, f'viewBox="0 0 {w.group(1)} {h.group(1)}"')
+    return f'<symbol id="{slug}" {" ".join(keep)}>{body}</symbol>', defs_markup
+
+
+def build_sprite(group: str, badges) -> str:
+    symbols = []
+    defs = []
+    for slug, svg in badges:
+        symbol, symbol_defs = to_symbol(slug, svg)
+        symbols.append(symbol)
+        defs.append(symbol_defs)
+    sheet = (
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+        f'<defs>{"".join(defs)}</defs>{"".join(symbols)}</svg>\n'
+    )
+    prefix = slugify(group)
+    return dedupe_defs(sheet, new_id=lambda n: f"{prefix}-d{n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify badge SVGs and build <symbol> sprite sheets.")
+    parser.add_argument("--group", choices=["month", "category"], default="month", help="Sprite grouping (default: month)")
+    parser.add_argument("--precision", type=int, default=2, help="Decimals kept in geometry attributes (default: 2)")
+    parser.add_argument("--force", action="store_true", help="Ignore the hash cache")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    paths = sorted(BADGE_DIR.glob("*.svg"))
+    if not paths:
+        raise SystemExit(f"No badges found in {BADGE_DIR}")
+
+    cache = HashCache("badges")
+    before_total = after_total = minified_count = 0
+    badges = {}
+    with build_profile.session(args, "optimize_badges") as prof:
+        for path in paths:
+            key = path.as_posix()
+            with prof.page(path.stem):
+                svg = prof.read_text(path)
+                size = len(svg.encode("utf-8"))
+                entry = cache.get(key) or {}
+                digest = content_hash(svg.encode("utf-8"))
+                if args.force or entry.get("hash") != digest or entry.get("precision") != args.precision:
+                    out = minify_svg(svg, args.precision)
+                    if out != svg:
+                        minified_count += 1
+                        if not args.dry_run:
+                            prof.write_text(path, out)
+                    entry = {"hash": content_hash(out.encode("utf-8")), "precision": args.precision,
+                             "original": entry.get("original", size) if entry.get("hash") == digest else size}
+                    svg = out
+                    if not args.dry_run:
+                        cache.set(key, entry)
+                before_total += entry["original"]
+                after_total += len(svg.encode("utf-8"))
+                badges[path.stem] = svg
+
+        with prof.phase("group"):
+            if args.group == "category":
+                groups_by_slug = {slug: slugify(cat) for slug, cat in load_categories(HOLIDAYS_JSON).items()}
+            else:
+                groups_by_slug = {slug: mmdd.split("-")[0] for slug, mmdd in load_slug_dates().items()}
+            groups = defaultdict(list)
+            for slug in sorted(badges):
+                groups[groups_by_slug.get(slug, UNGROUPED)].append(slug)
+
+        if not args.dry_run:
+            SPRITE_DIR.mkdir(parents=True, exist_ok=True)
+        sprite_bytes = written = 0
+        index = {}
+        for group, slugs in sorted(groups.items()):
+            target = SPRITE_DIR / f"{group}.svg"
+            members = content_hash("".join(f"{slug}:{badges[slug]}" for slug in slugs).encode("utf-8"))
+            sprite_key = f"sprite:{target.as_posix()}"
+            for slug in slugs:
+                index[slug] = f"/{target.as_posix()}"
+            if not args.force and cache.get(sprite_key) == members and target.exists():
+                sprite_bytes += target.stat().st_size
+                continue
+            with prof.phase("sprite", group=group, badges=len(slugs)):
+                sheet = build_sprite(group, [(slug, badges[slug]) for slug in slugs])
+            sprite_bytes += len(sheet.encode("utf-8"))
+            if not args.dry_run:
+                prof.write_text(target, sheet)
+                cache.set(sprite_key, members)
+                written += 1
+
+        if not args.dry_run:
+            # Sheets from another --group mode are stale once the index moves on.
+            for stale in SPRITE_DIR.glob("*.svg"):
+                if stale.stem not in groups:
+                    stale.unlink()
+            write_atomic(SPRITE_DIR / "index.json", (json.dumps(index, indent=1, sort_keys=True) + "\n").encode("utf-8"))
+            cache.save()
+
+    saved = before_total - after_total
+    print(f"Badges: {len(paths)} ({minified_count} minified this run); "
+          f"{before_total / 1024:.1f} KB -> {after_total / 1024:.1f} KB, saved {saved / 1024:.1f} KB "
+          f"({saved / before_total:.1%}).")
+    print(f"Sprites: {len(groups)} sheet(s) by {args.group} ({written} rewritten), {sprite_bytes / 1024:.1f} KB total; "
+          f"{len(groups.get(UNGROUPED, []))} badge(s) without a holiday in {UNGROUPED}.svg.")
+
+
+if __name__ == "__main__":
+    main()
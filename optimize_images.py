@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Page stage: intrinsic dimensions, lazy loading and WebP variants for <img>.
+
+The brand icon, store badges, holiday badges (assets/badges/<slug>.svg) and
+screenshots are written without width/height, loading or decoding, so the
+page shifts as each one arrives and every image is fetched up front. This
+stage:
+
+- reads the intrinsic size of every local image a page references once,
+  into .build/image_dims.json (PNG, GIF, JPEG and WebP headers, SVG
+  width/height; re-read only when the file's size or mtime changes);
+- adds width/height to <img> tags that have neither, decoding="async" to
+  all of them, and loading="lazy" to those below the fold (after the
+  page's first <h2>). Attributes a tag already has are left alone;
+- renders WebP variants of the PNG screenshots and app icon (RESPONSIVE) at
+  VARIANT_WIDTHS into assets/responsive/, in parallel, skipping sources
+  whose content hash is unchanged (.build/image_variants.json), and wraps
+  their <img> tags in <picture class="responsive"> with a WebP srcset;
+- adds IMG_CSS to <head> once: height:auto for sized images (so a CSS
+  width keeps the aspect ratio; zero specificity, so any rule that sets a
+  height still wins) and display:contents for the <picture> wrappers.
+
+Variants need Pillow (pip install pillow); without it, variants rendered
+earlier are still used and the rest are skipped. Rerunning is a no-op.
+
+Usage:
+  python3 optimize_images.py                  # every page on the site
+  python3 optimize_images.py holiday app
+  python3 optimize_images.py --dry-run --workers 4
+"""
+
+import argparse
+import fnmatch
+import os
+import re
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+import build_profile
+from build_cache import HashCache, content_hash
+from precompress_assets import SKIP_DIRS
+
+try:
+    from PIL import Image
+except ImportError:  # optional
+    Image = None
+
+ROOT = Path(".")
+SITE_ORIGIN = "https://www.obscureholidaycalendar.com"
+VARIANT_DIR = Path("assets") / "responsive"
+VARIANT_WIDTHS = (120, 240, 360, 480, 720, 1080, 1440)
+WEBP_QUALITY = 80
+# Source glob -> sizes attribute (the largest width the image is shown at).
+RESPONSIVE = {
+    "assets/app-icon.png": "120px",
+    "assets/screen*.png": "(max-width: 720px) 90vw, 360px",
+    "assets/bot_screenshot_*.png": "(max-width: 760px) 100vw, 720px",
+    "assets/slack-bot/*.png": "(max-width: 760px) 100vw, 720px",
+}
+IMG_CSS = '<style id="img-dims">:where(img[width][height]){height:auto}picture.responsive{display:contents}</style>'
+
+IMG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+ATTR_RE = re.compile(r'\s([a-zA-Z-]+)(?=[\s=/>])')
+QUOTED_RE = re.compile(r'"[^"]*"|\'[^\']*\'')
+SRC_RE = re.compile(r'\ssrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+PICTURE_RE = re.compile(r'<picture class="responsive"><source [^>]*>(<img\b[^>]*>)</picture>')
+SVG_ROOT_RE = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+SVG_LENGTH_RE = r'\s{}\s*=\s*["\']\s*([\d.]+)\s*(?:px)?\s*["\']'
+FOLD_RE = re.compile(r"<h2\b", re.IGNORECASE)
+
+
+def image_size(data: bytes, suffix: str) -> Optional[Tuple[int, int]]:
+    """(width, height) from the file header, or None for formats or SVGs without a fixed size."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", data[6:10])
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8X":
+            return 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return 1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF)
+        if chunk == b"VP8 ":
+            w, h = struct.unpack("<HH", data[26:30])
+            return w & 0x3FFF, h & 0x3FFF
+        return None
+    if data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                pos += 1
+                continue
+            marker = data[pos + 1]
+            length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                h, w = struct.unpack(">HH", data[pos + 5:pos + 9])
+                return w, h
+            pos += 2 + length
+        return None
+    if suffix == ".svg":
+        root = SVG_ROOT_RE.search(data[:4096].decode("utf-8", "replace"))
+        if not root:
+            return None
+        w = re.search(SVG_LENGTH_RE.format("width"), root.group(0))
+        h = re.search(SVG_LENGTH_RE.format("height"), root.group(0))
+        if w and h:
+            return round(float(w.group(1))), round(float(h.group(1)))
+    return None
+
+
+class DimensionIndex:
+    """Intrinsic image sizes by repo-relative path, cached in .build/image_dims.json."""
+
+    def __init__(self):
+        self.cache = HashCache("image_dims")
+        self.seen = {}
+        self.read = 0
+
+    def size(self, rel: str) -> Optional[Tuple[int, int]]:
+        if rel in self.seen:
+            return self.seen[rel]
+        path = ROOT / rel
+        try:
+            st = path.stat()
+        except OSError:
+            self.seen[rel] = None
+            return None
+        cached = self.cache.get(rel)
+        if cached and cached[:2] == [st.st_mtime_ns, st.st_size]:
+            found = tuple(cached[3]) if cached[3] else None
+        else:
+            data = path.read_bytes()
+            self.read += 1
+            found = image_size(data, path.suffix.lower())
+            self.cache.set(rel, [st.st_mtime_ns, st.st_size, content_hash(data), list(found) if found else None])
+        self.seen[rel] = found
+        return found
+
+    def digest(self, rel: str) -> Optional[str]:
+        cached = self.cache.get(rel) if self.size(rel) is not None else None
+        return cached[2] if cached else None
+
+    def save(self) -> None:
+        self.cache.prune(rel for rel, found in self.seen.items() if found is not None)
+        self.cache.save()
+
+
+def local_image(src: str, page: Path) -> Optional[str]:
+    """Repo-relative path for a site image URL, or None for other origins."""
+    parts = urlsplit(src)
+    if parts.scheme or parts.netloc:
+        if f"{parts.scheme}://{parts.netloc}" != SITE_ORIGIN:
+            return None
+    path = unquote(parts.path)
+    if not path:
+        return None
+    rel = os.path.normpath(path.lstrip("/") if path.startswith("/") else (page.parent / path).as_posix())
+    return None if rel.startswith("..") else rel
+
+
+def responsive_sizes(rel: str) -> Optional[str]:
+    for pattern, sizes in RESPONSIVE.items():
+        if fnmatch.fnmatch(rel, pattern):
+            return sizes
+    return None
+
+
+def variant_path(rel: str, width: int) -> Path:
+    stem = Path(rel).with_suffix("").as_posix().replace("assets/", "", 1).replace("/", "-")
+    return VARIANT_DIR / f"{stem}-{width}.webp"
+
+
+def variant_widths(width: int) -> List[int]:
+    return [w for w in VARIANT_WIDTHS if w < width] + [width]
+
+
+def render_variants(rel: str, width: int) -> List[Tuple[int, str, int]]:
+    """Write the WebP variants of one image; returns (width, path, bytes) for each."""
+    written = []
+    with Image.open(ROOT / rel) as im:
+        im.load()
+        for w in variant_widths(width):
+            out = ROOT / variant_path(rel, w)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            h = max(1, round(im.height * w / im.width))
+            resized = im if w == im.width else im.resize((w, h), Image.LANCZOS)
+            tmp = out.with_name(out.name + ".tmp")
+            resized.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+            os.replace(tmp, out)
+            written.append((w, out.as_posix(), out.stat().st_size))
+    return written
+
+
+def build_variants(sources, dims: DimensionIndex, workers: int, dry_run: bool):
+    """{source rel: [(width, variant path), ...]} for every source with variants on disk."""
+    cache = HashCache("image_variants")
+    ready, todo = {}, []
+    for rel in sorted(sources):
+        digest = dims.digest(rel)
+        cached = cache.get(rel)
+        if cached and cached["hash"] == digest and all((ROOT / path).exists() for _, path in cached["variants"]):
+            ready[rel] = [tuple(v) for v in cached["variants"]]
+        elif Image is not None and not dry_run:
+            todo.append(rel)
+    rendered = 0
+    if todo:
+        widths = [dims.size(rel)[0] for rel in todo]
+        if workers > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(render_variants, todo, widths))
+        else:
+            results = list(map(render_variants, todo, widths))
+        for rel, written in zip(todo, results):
+            variants = [[w, path] for w, path, _ in written]
+            cache.set(rel, {"hash": dims.digest(rel), "variants": variants})
+            ready[rel] = [tuple(v) for v in variants]
+            rendered += sum(size for _, _, size in written)
+    if not dry_run:
+        cache.prune(sources)
+        cache.save()
+    return ready, len(todo), rendered
+
+
+def add_attrs(tag: str, extra: str) -> str:
+    end = len(tag) - (2 if tag.endswith("/>") else 1)
+    body = tag[:end].rstrip()
+    return body + extra + (" />" if tag.endswith("/>") else ">")
+
+
+def rewrite_page(html: str, page: Path, dims: DimensionIndex, variants) -> Tuple[str, int]:
+    """Return (html, images changed)."""
+    html = PICTURE_RE.sub(r"\1", html)
+    fold = FOLD_RE.search(html)
+    fold = fold.start() if fold else len(html)
+    out, pos, changed, sized = [], 0, 0, False
+    for m in IMG_RE.finditer(html):
+        tag = m.group(0)
+        present = {name.lower() for name in ATTR_RE.findall(QUOTED_RE.sub('""', tag))}
+        src = SRC_RE.search(tag)
+        rel = local_image(src.group(1), page) if src else None
+        extra = ""
+        size = dims.size(rel) if rel else None
+        if size and not {"width", "height"} & present:
+            extra += f' width="{size[0]}" height="{size[1]}"'
+        if "loading" not in present and m.start() > fold:
+            extra += ' loading="lazy"'
+        if "decoding" not in present:
+            extra += ' decoding="async"'
+        new = add_attrs(tag, extra) if extra else tag
+        sized = sized or "width" in present and "height" in present or "width=" in extra
+        if rel in variants and "srcset" not in present:
+            srcset = ", ".join(f"/{path} {w}w" for w, path in variants[rel])
+            source = f'<source type="image/webp" srcset="{srcset}" sizes="{responsive_sizes(rel)}">'
+            new = f'<picture class="responsive">{source}{new}</picture>'
+        if new != tag:
+            changed += 1
+        out.append(html[pos:m.start()])
+        out.append(new)
+        pos = m.end()
+    out.append(html[pos:])
+    html = "".join(out)
+    if sized and 'id="img-dims"' not in html:
+        head_end = html.lower().find("</head>")
+        if head_end != -1:
+            html = html[:head_end] + "  " + IMG_CSS + "\n" + html[head_end:]
+    return html, changed
+
+
+def iter_site_pages(paths):
+    for base in map(Path, paths):
+        if base.is_file():
+            yield base
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for fname in sorted(filenames):
+                if fname.endswith(".html"):
+                    yield Path(dirpath) / fname
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add image dimensions, lazy loading and WebP variants to site pages.")
+    parser.add_argument("paths", nargs="*", default=["."], help="Files or directories (default: the whole site)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for variants (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing pages or variants")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow not installed; using existing WebP variants only (pip install pillow).")
+
+    dims = DimensionIndex()
+    with build_profile.session(args, "optimize_images") as prof:
+        with prof.phase("scan"):
+            pages = []
+            sources = set()
+            for path in iter_site_pages(args.paths):
+                html = prof.read_text(path)
+                pages.append((path, html))
+                for src in SRC_RE.findall(" ".join(IMG_RE.findall(html))):
+                    rel = local_image(src, path)
+                    if rel and responsive_sizes(rel) and dims.size(rel):
+                        sources.add(rel)
+        with prof.phase("variants", files=len(sources)):
+            variants, rendered, variant_bytes = build_variants(sources, dims, args.workers, args.dry_run)
+        updated = images = 0
+        for path, html in prof.iter("rewrite", pages):
+            with prof.page(path.as_posix()):
+                out, changed = rewrite_page(html, path, dims, variants)
+                if out != html:
+                    updated += 1
+                    images += changed
+                    if not args.dry_run:
+                        prof.write_text(path, out)
+        if not args.dry_run:
+            dims.save()
+
+    original = sum((ROOT / rel).stat().st_size for rel in variants)
+    print(f"Image sizes: {len(dims.seen)} referenced, {dims.read} read (rest cached).")
+    print(f"WebP variants: {len(variants)} of {len(sources)} source(s) ready, {rendered} rendered this run"
+          + (f" ({variant_bytes / 1024:.1f} KB; originals {original / 1024:.1f} KB)." if rendered else "."))
+    verb = "Would update" if args.dry_run else "Updated"
+    print(f"{verb} {images} <img> tag(s) on {updated} of {len(pages)} page(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Page stage: shared page chrome (nav, footer, store buttons) from one source each.
+
+Every page carries its own copy of the nav, the footer and the App Store /
+Google Play buttons, so each chrome change used to need its own script that
+walked and rewrote the whole site (add_discord_bot_nav.py,
+cleanup_final_pass.py's footer handling). Instead, each of these is a
+partial: a source file in PARTIALS_DIR (_partials/<name>.html, which Jekyll
+does not publish) and a marked region in each page that uses it:
+
+    <!-- PARTIAL NAV -->
+    <nav class="nav-links">
+      ...
+    </nav>
+    <!-- /PARTIAL NAV -->
+
+Marker names are the file stem in capitals (all-caps, so minify_html.py
+keeps them). Inside a partial, {{slug}} is replaced with the page's
+directory name (the store buttons use it for utm_content). The rendered
+partial is indented to match the opening marker.
+
+.build/partials.json indexes every page with regions: its size and mtime,
+and for each region the byte offsets, indentation and the hash of the
+partial it was last filled from. A run only stats the indexed pages; a page
+is read only if it changed since the index was written, and rewritten only
+if one of its regions was filled from an older version of a partial. Only
+those regions' byte ranges are replaced, in parallel across pages (--workers).
+Edits that later stages make inside a region (image dimensions, minified
+whitespace) are kept until that partial itself changes.
+
+--adopt walks the site once and wraps existing chrome that already matches a
+partial (ignoring indentation) in markers. Pages whose chrome differs are
+reported and left alone. --scan re-walks the site for marked pages that are
+not indexed yet (pages added by hand or by another script).
+
+Usage:
+  python3 partials.py --adopt          # first run: mark the existing chrome
+  python3 partials.py                  # after editing _partials/*.html
+  python3 partials.py --scan --dry-run --verbose
+"""
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import build_profile
+import site_files
+from build_cache import HashCache, content_hash, write_atomic
+
+ROOT = Path(".")
+PARTIALS_DIR = Path("_partials")
+SLUG_VAR = "{{slug}}"
+
+# How --adopt finds each partial's existing, unmarked copies.
+ADOPT = {
+    "NAV": r'<nav class="nav-links">.*?</nav>',
+    "FOOTER": r'<footer class="site-footer">.*?</footer>',
+    "STORE-BUTTONS": r'<div class="store-buttons-top">.*?</div>',
+}
+
+MARKER_PREFIX = b"<!-- PARTIAL "
+REGION_RE = re.compile(rb"^([ \t]*)<!-- PARTIAL ([A-Z0-9-]+) -->(.*?)<!-- /PARTIAL \2 -->", re.MULTILINE | re.DOTALL)
+
+
+def load_partials():
+    """{marker name: source text} for every _partials/*.html."""
+    if not PARTIALS_DIR.is_dir():
+        raise SystemExit(f"{PARTIALS_DIR}/ not found")
+    return {path.stem.upper(): path.read_text(encoding="utf-8").rstrip("\n")
+            for path in sorted(PARTIALS_DIR.glob("*.html"))}
+
+
+def page_slug(path: Path) -> str:
+    return path.parent.name
+
+
+def render(source: str, slug: str) -> str:
+    return source.replace(SLUG_VAR, slug)
+
+
+def indent(text: str, prefix: str) -> str:
+    return "\n".join(prefix + line if line else line for line in text.split("\n"))
+
+
+def region_bytes(text: str, prefix: str) -> bytes:
+    """What goes between the markers: the partial on its own lines, closing marker re-indented."""
+    return f"\n{indent(text, prefix)}\n{prefix}".encode("utf-8")
+
+
+def stat_key(path: Path):
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def scan(data: bytes):
+    """[[name, start, end, indent]] for each marked region, in page order."""
+    if MARKER_PREFIX not in data:
+        return []
+    return [[m.group(2).decode("ascii"), m.start(3), m.end(3), m.group(1).decode("ascii")]
+            for m in REGION_RE.finditer(data)]
+
+
+def index_regions(data: bytes, previous):
+    """Scan data, carrying each region's applied hash over from the previous index entry.
+
+    Regions are matched by name and position among regions of that name; a
+    region the index has not seen gets the hash of its current content, so
+    it is left alone if it already matches the partial.
+    """
+    applied = {}
+    for name, _, _, _, digest in previous or ():
+        applied.setdefault(name, []).append(digest)
+    regions, seen = [], {}
+    for name, start, end, prefix in scan(data):
+        nth = seen[name] = seen.get(name, -1) + 1
+        known = applied.get(name, ())
+        digest = known[nth] if nth < len(known) else content_hash(unindent(data[start:end]))
+        regions.append([name, start, end, prefix, digest])
+    return regions
+
+
+def unindent(region: bytes) -> bytes:
+    """Region content with each line stripped, so hashes ignore indentation."""
+    return b"\n".join(line.strip() for line in region.strip().split(b"\n"))
+
+
+def splice(path: str, edits):
+    """Replace (start, end, bytes) ranges of path; returns the new [mtime_ns, size]."""
+    data = Path(path).read_bytes()
+    for start, end, new in sorted(edits, reverse=True):
+        data = data[:start] + new + data[end:]
+    write_atomic(Path(path), data)
+    return stat_key(Path(path))
+
+
+def plan(regions, partials, slug):
+    """(edits, updated regions) to bring regions up to date with partials."""
+    edits, updated, shift = [], [], 0
+    for name, start, end, prefix, digest in regions:
+        start += shift
+        end += shift
+        if name in partials:
+            text = render(partials[name], slug)
+            want = content_hash(unindent(text.encode("utf-8")))
+            if digest != want:
+                new = region_bytes(text, prefix)
+                edits.append((start - shift, end - shift, new))
+                shift += len(new) - (end - start)
+                end = start + len(new)
+                digest = want
+        updated.append([name, start, end, prefix, digest])
+    return edits, updated
+
+
+def adopt(html: str, partials, slug: str):
+    """Wrap unmarked chrome that matches a partial in markers; returns (html, adopted, differing)."""
+    adopted, differing = 0, []
+    for name, pattern in ADOPT.items():
+        if name not in partials or f"<!-- PARTIAL {name} -->" in html:
+            continue
+        text = render(partials[name], slug)
+        want = unindent(text.encode("utf-8"))
+
+        def wrap(m):
+            nonlocal adopted
+            if unindent(m.group(2).encode("utf-8")) != want:
+                differing.append(name)
+                return m.group(0)
+            adopted += 1
+            # Indent like the closing tag; some pages' opening line is off.
+            last = m.group(2).rsplit("\n", 1)[-1]
+            prefix = last[:len(last) - len(last.lstrip())] if "\n" in m.group(2) else m.group(1)
+            return (f"{prefix}<!-- PARTIAL {name} -->\n{indent(text, prefix)}\n"
+                    f"{prefix}<!-- /PARTIAL {name} -->")
+
+        html = re.sub(rf"^([ \t]*)({pattern})[ \t]*$", wrap, html, flags=re.MULTILINE | re.DOTALL)
+    return html, adopted, differing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill marked nav/footer/store-button regions in site pages from _partials/.")
+    parser.add_argument("--adopt", action="store_true", help="Walk the site and mark existing chrome that matches a partial")
+    parser.add_argument("--scan", action="store_true", help="Walk the site for marked pages missing from the index")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for rewrites (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    parser.add_argument("--verbose", action="store_true", help="List pages rewritten or left unadopted")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    partials = load_partials()
+    index = HashCache("partials")
+    walk = args.adopt or args.scan or not index.entries
+    adopted = read = 0
+    differing = {}
+    todo = []
+
+    with build_profile.session(args, "partials") as prof:
+        if walk:
+            with prof.phase("walk"):
+                pages = [path.as_posix() for path in site_files.site_pages(ROOT)]
+        else:
+            pages = sorted(index.entries)
+
+        for rel in prof.iter("pages", pages):
+            path = Path(rel)
+            with prof.page(rel):
+                entry = index.get(rel)
+                try:
+                    stat = stat_key(path)
+                except FileNotFoundError:
+                    index.entries.pop(rel, None)
+                    continue
+                if entry and entry["stat"] == stat:
+                    regions = entry["regions"]
+                else:
+                    with prof.phase("read"):
+                        data = path.read_bytes()
+                    prof.add_read(len(data))
+                    read += 1
+                    if args.adopt:
+                        html, count, misses = adopt(data.decode("utf-8"), partials, page_slug(path))
+                        if misses:
+                            differing[rel] = misses
+                        if count:
+                            adopted += count
+                            data = html.encode("utf-8")
+                            if not args.dry_run:
+                                prof.write_text(path, html)
+                                stat = stat_key(path)
+                    regions = index_regions(data, entry and entry["regions"])
+                if not regions:
+                    index.entries.pop(rel, None)
+                    continue
+                edits, updated = plan(regions, partials, page_slug(path))
+                if edits:
+                    todo.append((rel, edits, updated))
+                index.set(rel, {"stat": stat, "regions": regions})
+
+        with prof.phase("write", pages=len(todo)):
+            if todo and not args.dry_run:
+                paths = [rel for rel, _, _ in todo]
+                edits = [e for _, e, _ in todo]
+                if args.workers > 1 and len(todo) > 1:
+                    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                        stats = list(pool.map(splice, paths, edits))
+                else:
+                    stats = list(map(splice, paths, edits))
+                for (rel, _, updated), stat in zip(todo, stats):
+                    index.set(rel, {"stat": stat, "regions": updated})
+
+    if not args.dry_run:
+        index.save()
+
+    regions = sum(len(edits) for _, edits, _ in todo)
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"Partials: {', '.join(name.lower() for name in partials)}. {len(index.entries)} page(s) indexed, {read} read.")
+    if args.adopt:
+        print(f"Adopted {adopted} region(s); {len(differing)} page(s) have chrome that differs from its partial.")
+        if args.verbose:
+            for rel, names in sorted(differing.items()):
+                print(f"  {rel}: {', '.join(sorted(set(names))).lower()}")
+    print(f"{verb} {regions} region(s) on {len(todo)} page(s).")
+    if args.verbose:
+        for rel, _, _ in todo:
+            print(f"  {rel}")
+
+
+if __name__ == "__main__":
+    main()
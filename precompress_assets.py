@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Write pre-compressed .gz and .br siblings for every text asset in the site.
+
+Walks the tree (HTML, JSON, SVG, XML, CSS, JS, TXT), compresses each file at
+maximum settings (gzip -9 with a zero mtime so output is reproducible; Brotli
+quality 11 in text mode) in parallel worker processes, and prints the
+compression ratio per top-level directory. A sibling is only kept if it is
+smaller than the original.
+
+Content hashes are kept in .build/precompress.json; files whose bytes are
+unchanged since the last run (and whose siblings still exist) are skipped.
+Siblings of files that have since been deleted are removed. The siblings
+are deploy artifacts and are gitignored (*.gz, *.br).
+
+Brotli is optional: without the `brotli` package only .gz files are written.
+
+Usage:
+  python3 precompress_assets.py
+  python3 precompress_assets.py --workers 4 --depth 2
+  python3 precompress_assets.py --force --profile
+"""
+
+import argparse
+import gzip
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import build_profile
+from build_cache import HashCache, content_hash, write_atomic
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+ROOT = Path(".")
+EXTENSIONS = {".html", ".json", ".svg", ".xml", ".css", ".js", ".txt"}
+SKIP_DIRS = {".git", ".build", "__pycache__", "node_modules", "_partials"}
+
+
+def _write_sibling(path: Path, suffix: str, data: bytes, original_size: int) -> Optional[int]:
+    sibling = path.with_name(path.name + suffix)
+    if len(data) >= original_size:
+        if sibling.exists():
+            sibling.unlink()
+        return None
+    write_atomic(sibling, data)
+    return len(data)
+
+
+def compress_file(path_str: str, use_brotli: bool) -> Dict[str, Optional[int]]:
+    path = Path(path_str)
+    data = path.read_bytes()
+    sizes = {"size": len(data)}
+    sizes["gz"] = _write_sibling(path, ".gz", gzip.compress(data, compresslevel=9, mtime=0), len(data))
+    if use_brotli:
+        sizes["br"] = _write_sibling(path, ".br", brotli.compress(data, quality=11, mode=brotli.MODE_TEXT), len(data))
+    return sizes
+
+
+def is_fresh(path: Path, entry: Optional[dict], digest: str, formats) -> bool:
+    if not entry or entry.get("hash") != digest:
+        return False
+    for fmt in formats:
+        if fmt not in entry:
+            return False
+        if entry[fmt] is not None and not path.with_name(f"{path.name}.{fmt}").exists():
+            return False
+    return True
+
+
+def directory_key(rel: str, depth: int) -> str:
+    parts = Path(rel).parts[:-1]
+    return "/".join(parts[:depth]) or "."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for the site's text assets.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Compression processes (default: CPU count)")
+    parser.add_argument("--depth", type=int, default=1, help="Directory depth for the ratio report (default: 1)")
+    parser.add_argument("--force", action="store_true", help="Recompress everything, ignoring the hash cache")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    formats = ["gz", "br"] if brotli else ["gz"]
+    if not brotli:
+        print("brotli not installed; writing .gz only (pip install brotli for .br).")
+
+    cache = HashCache("precompress")
+    seen = {}
+    todo = []
+    with build_profile.session(args, "precompress_assets") as prof:
+        for dirpath, dirnames, filenames in prof.iter("walk", os.walk(ROOT)):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for fname in sorted(filenames):
+                path = Path(dirpath) / fname
+                if path.suffix.lower() not in EXTENSIONS:
+                    continue
+                rel = path.relative_to(ROOT).as_posix()
+                with prof.phase("hash"):
+                    data = path.read_bytes()
+                    digest = content_hash(data)
+                prof.add_read(len(data))
+                seen[rel] = digest
+                if args.force or not is_fresh(path, cache.get(rel), digest, formats):
+                    todo.append(rel)
+
+        with prof.phase("compress", files=len(todo)):
+            if args.workers > 1 and len(todo) > 1:
+                with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                    results = pool.map(compress_file, todo, [bool(brotli)] * len(todo), chunksize=16)
+                    for rel, sizes in zip(todo, results):
+                        cache.set(rel, {"hash": seen[rel], **sizes})
+            else:
+                for rel in todo:
+                    cache.set(rel, {"hash": seen[rel], **compress_file(rel, bool(brotli))})
+
+        for rel in cache.prune(seen):
+            for fmt in ("gz", "br"):
+                stale = ROOT / f"{rel}.{fmt}"
+                if stale.exists():
+                    stale.unlink()
+        cache.save()
+
+        changed = set(todo)
+        report = defaultdict(lambda: {"files": 0, "changed": 0, "size": 0, "gz": 0, "br": 0})
+        for rel in seen:
+            entry = cache.get(rel)
+            row = report[directory_key(rel, args.depth)]
+            row["files"] += 1
+            row["changed"] += rel in changed
+            row["size"] += entry["size"]
+            for fmt in formats:
+                # A file without a sibling is served uncompressed.
+                row[fmt] += entry.get(fmt) or entry["size"]
+                if rel in changed and entry.get(fmt):
+                    prof.add_written(entry[fmt])
+
+    def ratio(row, fmt):
+        return f"{row[fmt] / row['size']:8.1%}" if fmt in formats and row["size"] else f"{'-':>8}"
+
+    print(f"{'Directory':<28} {'files':>7} {'changed':>8} {'raw MB':>9} {'gzip':>8} {'brotli':>8}")
+    total = defaultdict(int)
+    for key in sorted(report, key=lambda k: -report[k]["size"]):
+        row = report[key]
+        for field, value in row.items():
+            total[field] += value
+        print(f"{key:<28} {row['files']:>7} {row['changed']:>8} {row['size'] / 1e6:9.2f} {ratio(row, 'gz')} {ratio(row, 'br')}")
+    print(f"{'total':<28} {total['files']:>7} {total['changed']:>8} {total['size'] / 1e6:9.2f} {ratio(total, 'gz')} {ratio(total, 'br')}")
+
+
+if __name__ == "__main__":
+    main()
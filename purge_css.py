@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Page stage: purge unused CSS and split inline page CSS into critical and
+deferred parts.
+
+Holiday pages each inline ~11 KB of CSS (the upgrade scripts' .next-rail,
+--pro-* and .related-bg rules among it) on top of the async /styles.css,
+and much of both is unused on any one page. This stage:
+
+1. Indexes, in one parallel pass over every page, the tags, classes and ids
+   each page uses: from its markup, plus every word in its inline scripts
+   and the site's .js files, since scripts add classes at runtime. Tokens in
+   markup before the page's first <h2> (the same fold optimize_images.py
+   uses) are recorded as above the fold; script words are not, so rules
+   for states a script adds are deferred.
+2. Drops the rules in styles.css whose selectors match nothing anywhere on
+   the site. This always checks every page (site_files.site_pages()), even
+   when only some paths are given. Skipped if there is no styles.css.
+3. Groups pages by template: pages whose inline <style> has the same rule
+   selectors (holiday pages differ only in their :root palette). For each
+   template it keeps the rules some page of the template uses. Rules that
+   match above-the-fold tokens stay inline. So do @font-face, keyframes
+   those rules use, and rules whose declarations differ between pages. The
+   rest go to one shared assets/css/<template>-<hash>.css file, preloaded
+   and applied on load like styles.css. A moved rule stays inline if a
+   later inline rule of equal specificity sets the same property, so the
+   cascade order between the two is unchanged.
+
+A selector counts as used when every class, id and tag in it is. :not()
+arguments, attribute selectors and pseudo-classes are ignored, and
+:is()/:where()/:has() selectors are always kept. Pages that already link
+a deferred file are left as they are, so rerunning is a no-op.
+
+styles.css, the deferred files and the pages are written through a
+write_journal journal, so "python3 write_journal.py rollback last" undoes a
+bad purge.
+
+Reports CSS bytes per page before and after: inline, and in total with
+styles.css and the deferred file.
+
+Usage:
+  python3 purge_css.py                        # every page on the site
+  python3 purge_css.py --dry-run --verbose
+"""
+
+import argparse
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+import build_profile
+import site_files
+import write_journal
+from build_cache import content_hash
+from optimize_images import FOLD_RE, iter_site_pages
+from precompress_assets import SKIP_DIRS
+
+ROOT = Path(".")
+STYLESHEET = Path("styles.css")
+DEFERRED_DIR = Path("assets") / "css"
+TOP_SAVINGS = 10
+# Less deferred CSS than this isn't worth a request; it stays inline.
+MIN_DEFERRED_BYTES = 1024
+ALWAYS_USED = {"html", "body", "*", ":root"}
+
+STYLE_RE = re.compile(r"<style>(.*?)</style>", re.DOTALL | re.IGNORECASE)
+SCRIPT_RE = re.compile(r"<script\b[^>]*>(.*?)</script>", re.DOTALL | re.IGNORECASE)
+TAG_NAME_RE = re.compile(r"<([a-zA-Z][\w-]*)")
+CLASS_RE = re.compile(r'\bclass\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+ID_RE = re.compile(r'\bid\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+WORD_RE = re.compile(r"[A-Za-z_][\w-]*")
+DEFERRED_LINK_RE = re.compile(r'<link [^>]*data-css="deferred"')
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+BLOCK_CHAR_RE = re.compile(r"[{}\"']")
+
+ALWAYS_KEEP_RE = re.compile(r":(?:is|where|has|matches)\(|\\")
+NOT_RE = re.compile(r":not\([^()]*\)")
+ATTR_SEL_RE = re.compile(r"\[[^\]]*\]")
+PSEUDO_ELEMENT_RE = re.compile(r"::[\w-]+(?:\([^()]*\))?|:(?:before|after|first-line|first-letter)\b")
+PSEUDO_CLASS_RE = re.compile(r":[\w-]+(?:\([^()]*\))?")
+SEL_ID_RE = re.compile(r"#([\w-]+)")
+SEL_CLASS_RE = re.compile(r"\.([\w-]+)")
+SEL_TAG_RE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+PROPERTY_RE = re.compile(r"(?:^|;)\s*(-?[\w-]+)\s*:")
+ANIMATION_RE = re.compile(r"animation(?:-name)?\s*:\s*([^;}]*)")
+
+
+class Rule:
+    """
+    One style rule or opaque at-rule. context holds the raw preludes of the
+    @media/@supports blocks around it; raw is its source text, with the
+    whitespace and comments in front of it.
+    """
+
+    def __init__(self, context: Tuple[str, ...], prelude: str, body: str, raw: str):
+        self.context = context
+        self.prelude = prelude.strip()
+        self.body = body
+        self.raw = raw
+        self.at = self.prelude.split(None, 1)[0].lower() if self.prelude.startswith("@") else None
+
+    @property
+    def key(self) -> str:
+        return " ".join(c.strip() for c in self.context) + " | " + self.prelude
+
+
+def _block_end(css: str, start: int) -> int:
+    """Index just past the "}" closing the block whose "{" is at start - 1."""
+    depth, i = 1, start
+    while True:
+        m = BLOCK_CHAR_RE.search(css, i)
+        if not m:
+            return len(css)
+        ch = m.group()
+        if ch in "\"'":
+            end = css.find(ch, m.end())
+            i = len(css) if end == -1 else end + 1
+            continue
+        depth += 1 if ch == "{" else -1
+        if not depth:
+            return m.end()
+        i = m.end()
+
+
+def parse_css(css: str, context: Tuple[str, ...] = (), masked: str = None) -> List[Rule]:
+    """Flatten a stylesheet into rules; @media/@supports/@layer blocks become their rules' context."""
+    if masked is None:
+        masked = COMMENT_RE.sub(lambda m: " " * len(m.group()), css)
+    rules, pos = [], 0
+    while True:
+        brace = masked.find("{", pos)
+        semi = masked.find(";", pos)
+        if semi != -1 and (brace == -1 or semi < brace) and masked[pos:semi].strip().startswith("@"):
+            rules.append(Rule(context, masked[pos:semi], "", css[pos:semi + 1]))
+            pos = semi + 1
+            continue
+        if brace == -1:
+            return rules
+        end = _block_end(masked, brace + 1)
+        prelude = masked[pos:brace]
+        head = prelude.strip().split(None, 1)[0].lower() if prelude.strip() else ""
+        if head in ("@media", "@supports", "@layer", "@container"):
+            inner = slice(brace + 1, end - 1)
+            rules.extend(parse_css(css[inner], context + (css[pos:brace],), masked[inner]))
+        else:
+            rules.append(Rule(context, prelude, masked[brace + 1:end - 1], css[pos:end]))
+        pos = end
+
+
+def _indent(raw_prelude: str) -> str:
+    line = raw_prelude.rstrip().rsplit("\n", 1)[-1]
+    return line[:len(line) - len(line.lstrip())]
+
+
+def serialize(rules: List[Rule]) -> str:
+    """Rules back to CSS, re-opening their @media/@supports blocks; each rule keeps its source text."""
+    out, open_ctx = [], ()
+    for rule in rules:
+        if rule.context != open_ctx:
+            common = 0
+            while common < min(len(open_ctx), len(rule.context)) and open_ctx[common] == rule.context[common]:
+                common += 1
+            for prelude in reversed(open_ctx[common:]):
+                out.append("\n" + _indent(prelude) + "}")
+            for prelude in rule.context[common:]:
+                out.append(prelude.rstrip() + " {")
+            open_ctx = rule.context
+        out.append(rule.raw.rstrip())
+    for prelude in reversed(open_ctx):
+        out.append("\n" + _indent(prelude) + "}")
+    return "".join(out) + "\n"
+
+
+def _simple_parts(selector: str) -> str:
+    selector = NOT_RE.sub("", selector)
+    selector = ATTR_SEL_RE.sub("", selector)
+    selector = PSEUDO_ELEMENT_RE.sub("", selector)
+    return PSEUDO_CLASS_RE.sub("", selector)
+
+
+def selector_tokens(selector: str):
+    """The tags, .classes and #ids a selector needs, or None if it is always kept."""
+    if ALWAYS_KEEP_RE.search(selector):
+        return None
+    rest = _simple_parts(selector)
+    tokens = {"#" + m for m in SEL_ID_RE.findall(rest)} | {"." + m for m in SEL_CLASS_RE.findall(rest)}
+    tokens |= {m.lower() for m in SEL_TAG_RE.findall(SEL_CLASS_RE.sub("", SEL_ID_RE.sub("", rest)))}
+    return tokens - ALWAYS_USED
+
+
+def specificity(selector: str) -> Tuple[int, int, int]:
+    ids = len(SEL_ID_RE.findall(selector))
+    classes = len(SEL_CLASS_RE.findall(selector)) + len(ATTR_SEL_RE.findall(selector))
+    elements = len(PSEUDO_ELEMENT_RE.findall(selector))
+    classes += len(PSEUDO_CLASS_RE.findall(PSEUDO_ELEMENT_RE.sub("", selector)))
+    plain = _simple_parts(SEL_CLASS_RE.sub("", SEL_ID_RE.sub("", selector)))
+    elements += len([t for t in SEL_TAG_RE.findall(plain) if t != "*"])
+    return ids, classes, elements
+
+
+def rule_matches(rule: Rule, used) -> bool:
+    """True if some selector of the rule needs only tokens in used."""
+    for selector in rule.prelude.split(","):
+        tokens = selector_tokens(selector)
+        if tokens is None or tokens <= used:
+            return True
+    return False
+
+
+def properties(rule: Rule):
+    return set(PROPERTY_RE.findall(COMMENT_RE.sub("", rule.body)))
+
+
+def animation_names(rule: Rule):
+    names = set()
+    for value in ANIMATION_RE.findall(rule.body):
+        names.update(WORD_RE.findall(value))
+    return names
+
+
+def word_tokens(words) -> set:
+    """Words from scripts, as the tag, class and id they could name."""
+    return {w.lower() for w in words} | {"." + w for w in words} | {"#" + w for w in words}
+
+
+def page_tokens(html: str) -> Tuple[set, set]:
+    """(tokens used anywhere, tokens used above the fold) for one page."""
+    fold = FOLD_RE.search(html)
+    fold = fold.start() if fold else len(html)
+    words = set()
+    for script in SCRIPT_RE.findall(html):
+        words.update(WORD_RE.findall(script))
+    script_tokens = word_tokens(words)
+
+    def markup(text):
+        found = {t.lower() for t in TAG_NAME_RE.findall(text)}
+        for classes in CLASS_RE.findall(text):
+            found.update("." + c for c in classes.split())
+        found.update("#" + i.strip() for i in ID_RE.findall(text))
+        return found
+
+    above = markup(html[:fold])
+    return above | markup(html[fold:]) | script_tokens, above
+
+
+def scan_page(path_str: str) -> Tuple[str, set, set, str, bool]:
+    html = Path(path_str).read_text(encoding="utf-8")
+    used, above = page_tokens(html)
+    head = html[:html.lower().find("</head>")]
+    style = STYLE_RE.search(head)
+    return path_str, used, above, style.group(1) if style else None, bool(DEFERRED_LINK_RE.search(html))
+
+
+def scan_pages(pages: List[str], workers: int):
+    if workers > 1 and len(pages) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(scan_page, pages, chunksize=16))
+    return list(map(scan_page, pages))
+
+
+def site_js_words():
+    words = set()
+    for dirpath, dirnames, filenames in os.walk(ROOT):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for fname in filenames:
+            if fname.endswith(".js"):
+                words.update(WORD_RE.findall((Path(dirpath) / fname).read_text(encoding="utf-8", errors="replace")))
+    return frozenset(words)
+
+
+def split_template(pages_css: List[List[Rule]], used: set, above: set):
+    """For one template: (per-rule decision "drop" | "inline" | "defer") by rule index."""
+    rules = pages_css[0]
+    uniform = [all(css[i].raw == rule.raw for css in pages_css) for i, rule in enumerate(rules)]
+    decision = []
+    for rule in rules:
+        if rule.at in ("@keyframes", "@-webkit-keyframes", "@font-face", "@import", "@charset", "@namespace", "@page"):
+            decision.append("at")
+        elif not rule_matches(rule, used):
+            decision.append("drop")
+        elif rule_matches(rule, above):
+            decision.append("inline")
+        else:
+            decision.append("defer")
+    for i, rule in enumerate(rules):
+        if decision[i] == "defer" and not uniform[i]:
+            decision[i] = "inline"
+
+    # Walk backwards so a rule kept inline can pin the deferrable rules before it.
+    later_inline = []
+    for i in range(len(rules) - 1, -1, -1):
+        rule = rules[i]
+        if decision[i] == "defer":
+            props = properties(rule)
+            specs = {specificity(s) for s in rule.prelude.split(",")}
+            for other, other_props, other_specs in later_inline:
+                if props & other_props and specs & other_specs:
+                    decision[i] = "inline"
+                    break
+        if decision[i] == "inline":
+            later_inline.append((rule, properties(rule), {specificity(s) for s in rule.prelude.split(",")}))
+
+    inline_anims = set().union(*(animation_names(r) for r, d in zip(rules, decision) if d == "inline"))
+    deferred_anims = set().union(*(animation_names(r) for r, d in zip(rules, decision) if d == "defer"))
+    for i, rule in enumerate(rules):
+        if decision[i] != "at":
+            continue
+        name = rule.prelude.split(None, 1)[1].strip() if " " in rule.prelude else ""
+        if rule.at.endswith("keyframes"):
+            decision[i] = "inline" if name in inline_anims else "defer" if name in deferred_anims else "drop"
+        else:
+            decision[i] = "inline"
+    return decision
+
+
+def deferred_link(href: str) -> str:
+    return (f'<link rel="preload" href="{href}" as="style" data-css="deferred" '
+            f"onload=\"this.onload=null;this.rel='stylesheet'\" />\n"
+            f'  <noscript><link rel="stylesheet" href="{href}" /></noscript>')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge unused CSS and defer below-the-fold inline CSS per page template.")
+    parser.add_argument("paths", nargs="*", default=["."], help="Files or directories (default: the whole site)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    parser.add_argument("--verbose", action="store_true", help="Print CSS bytes for every page")
+    build_profile.add_arguments(parser)
+    write_journal.add_arguments(parser)
+    args = parser.parse_args()
+
+    with build_profile.session(args, "purge_css") as prof, write_journal.session(args, "purge_css", prof):
+        with prof.phase("index"):
+            js_tokens = word_tokens(site_js_words())
+            pages = [path.as_posix() for path in iter_site_pages(args.paths)]
+            # styles.css serves every page, so it is purged against the whole
+            # site even when only some paths are given.
+            others = sorted({path.as_posix() for path in site_files.site_pages()} - set(pages))
+            scans = scan_pages(pages + others, args.workers)
+            other_scans, scans = scans[len(pages):], scans[:len(pages)]
+        site_used = js_tokens.union(*(used for _, used, _, _, _ in scans + other_scans))
+
+        sheet = purged_sheet = ""
+        sheet_rules = kept = []
+        if STYLESHEET.exists():
+            with prof.phase("stylesheet"):
+                sheet = STYLESHEET.read_text(encoding="utf-8")
+                sheet_rules = parse_css(sheet)
+                kept = [rule for rule in sheet_rules if rule.at or rule_matches(rule, site_used)]
+                purged_sheet = serialize(kept) if len(kept) < len(sheet_rules) else sheet
+            if not args.dry_run and purged_sheet != sheet:
+                # Through the profiler, so the run's journal can roll it back.
+                prof.write_text(STYLESHEET, purged_sheet)
+        sheet_before, sheet_after = len(sheet.encode("utf-8")), len(purged_sheet.encode("utf-8"))
+
+        templates = defaultdict(list)
+        for scan in scans:
+            path, _, _, css, split = scan
+            if css is not None and not split:
+                rules = parse_css(css)
+                templates[tuple(rule.key for rule in rules)].append((scan, rules))
+
+        results = {}
+        with prof.phase("split", files=len(templates)):
+            for members in templates.values():
+                used = js_tokens.union(*(scan[1] for scan, _ in members))
+                above = set().union(*(scan[2] for scan, _ in members))
+                decision = split_template([rules for _, rules in members], used, above)
+                first_rules = members[0][1]
+                deferred_css = serialize([r for r, d in zip(first_rules, decision) if d == "defer"]).strip()
+                href = None
+                if len(deferred_css.encode("utf-8")) < MIN_DEFERRED_BYTES:
+                    decision = ["inline" if d == "defer" else d for d in decision]
+                    deferred_css = ""
+                if deferred_css:
+                    name = Path(members[0][0][0]).parts[0].replace(".html", "") or "page"
+                    target = DEFERRED_DIR / f"{name}-{content_hash(deferred_css.encode('utf-8'))[:10]}.css"
+                    href = "/" + target.as_posix()
+                    # Named by content hash: an existing file already holds these rules.
+                    if not args.dry_run and not target.exists():
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        prof.write_text(target, deferred_css + "\n")
+                for scan, rules in members:
+                    inline = [r for r, d in zip(rules, decision) if d == "inline"]
+                    results[scan[0]] = (scan[3], serialize(inline), href, len(deferred_css.encode("utf-8")))
+
+        updated = 0
+        rows = []
+        for path_str, _, _, css, _ in prof.iter("rewrite", scans):
+            links_sheet = False
+            if path_str in results:
+                before_css, inline_css, href, deferred_bytes = results[path_str]
+                path = Path(path_str)
+                html = prof.read_text(path)
+                links_sheet = "/styles.css" in html
+                head_end = html.lower().find("</head>")
+                m = STYLE_RE.search(html, 0, head_end)
+                new_style = "<style>" + inline_css.rstrip() + "\n  </style>"
+                if href:
+                    new_style += "\n  " + deferred_link(href)
+                out = html[:m.start()] + new_style + html[m.end():]
+                if out != html:
+                    updated += 1
+                    if not args.dry_run:
+                        prof.write_text(path, out)
+                inline_before = len(before_css.encode("utf-8"))
+                inline_after = len(inline_css.encode("utf-8"))
+            else:
+                links_sheet = False
+                inline_before = inline_after = len(css.encode("utf-8")) if css else 0
+                deferred_bytes = 0
+            total_before = inline_before + (sheet_before if links_sheet else 0)
+            total_after = inline_after + deferred_bytes + (sheet_after if links_sheet else 0)
+            rows.append((path_str, inline_before, inline_after, total_before, total_after))
+
+    if STYLESHEET.exists():
+        print(f"styles.css: {sheet_before / 1024:.1f} KB -> {sheet_after / 1024:.1f} KB "
+              f"({len(sheet_rules) - len(kept)} of {len(sheet_rules)} rules unused site-wide)")
+    else:
+        print(f"No {STYLESHEET}; only inline CSS was purged.")
+    changed = sorted((row for row in rows if row[3] != row[4]), key=lambda row: row[3] - row[4], reverse=True)
+    print(f"{'inline before':>14} {'after':>7} {'total before':>13} {'after':>7}  page")
+    for path_str, inline_before, inline_after, total_before, total_after in rows if args.verbose else changed[:TOP_SAVINGS]:
+        print(f"{inline_before:>14} {inline_after:>7} {total_before:>13} {total_after:>7}  {path_str}")
+    inline_before = sum(row[1] for row in rows)
+    inline_after = sum(row[2] for row in rows)
+    verb = "Would update" if args.dry_run else "Updated"
+    print(f"{verb} {updated} of {len(rows)} page(s) in {len(templates)} template(s); "
+          f"inline CSS {inline_before / 1024:.1f} KB -> {inline_after / 1024:.1f} KB.")
+
+
+if __name__ == "__main__":
+    main()
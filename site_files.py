@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Shared page enumeration and marker prefiltering for the site scripts.
+
+site_pages() lists the publishable HTML pages: every *.html under the root
+except SKIP_DIRS (build and tool directories, _partials) and the EXCLUDE
+patterns (sitemaps and the zip-extracted Search Console exports under
+reports/). The list is cached in .build/site_files.json along with the
+mtime of every directory walked. Adding, removing or renaming a file or
+directory changes its parent directory's mtime, so the cache is reused
+while all those mtimes are unchanged, and then costs one stat per
+directory instead of a walk.
+
+Idempotent passes mostly skip pages that already have their change.
+filter_pages() and stale_pages() check that with an mmap byte search for
+marker strings, so skipped pages are never read into Python strings or
+decoded:
+
+    pages = site_files.filter_pages(site_files.site_pages(), require=[ANCHOR], forbid=[DONE])
+    pages = site_files.stale_pages(files, done=[MARKER, ...], stale=[OLD_SNIPPET])
+
+Usage:
+  python3 site_files.py                         # count the pages (refreshing the cache if needed)
+  python3 site_files.py --list --forbid /discord-bot/
+  python3 site_files.py --refresh --exclude "press/*"
+"""
+
+import argparse
+import fnmatch
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Sequence
+
+from build_cache import HashCache
+from precompress_assets import SKIP_DIRS
+
+ROOT = Path(".")
+# Directory paths (relative to the root, fnmatch patterns) that hold no site pages.
+EXCLUDE = ("sitemaps", "reports/*.com-*")
+
+
+def _excluded(rel: str, exclude: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatchcase(rel, pattern) for pattern in exclude)
+
+
+def _walk(root: Path, exclude: Sequence[str]):
+    """(pages, {dir: mtime_ns}) for the site under root."""
+    pages, dirs = [], {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        dirs[rel_dir] = os.stat(dirpath).st_mtime_ns
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if d not in SKIP_DIRS and not _excluded(os.path.normpath(os.path.join(rel_dir, d)), exclude)
+        )
+        pages.extend(os.path.normpath(os.path.join(rel_dir, f)) for f in sorted(filenames) if f.endswith(".html"))
+    return pages, dirs
+
+
+def _unchanged(root: Path, dirs) -> bool:
+    for rel_dir, mtime in dirs.items():
+        try:
+            if os.stat(root / rel_dir).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def site_pages(root: Path = ROOT, exclude: Sequence[str] = EXCLUDE, refresh: bool = False) -> List[Path]:
+    """Every publishable *.html page under root, sorted, as paths relative to the working directory."""
+    cache = HashCache("site_files")
+    key = os.path.abspath(root)
+    entry = cache.get(key)
+    if refresh or not entry or entry["exclude"] != list(exclude) or not _unchanged(root, entry["dirs"]):
+        pages, dirs = _walk(root, exclude)
+        entry = {"exclude": list(exclude), "dirs": dirs, "pages": pages}
+        cache.set(key, entry)
+        cache.save()
+    return [root / rel for rel in entry["pages"]]
+
+
+def markers_in(path: Path, markers: Iterable[bytes]) -> List[bool]:
+    """For each marker, whether path contains it (mmap search, no decode)."""
+    markers = list(markers)
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return [not marker for marker in markers]
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [mm.find(marker) != -1 for marker in markers]
+
+
+def _encode(markers: Iterable[str]) -> List[bytes]:
+    return [marker.encode("utf-8") for marker in markers]
+
+
+def filter_pages(paths: Iterable[Path], require: Iterable[str] = (), forbid: Iterable[str] = ()) -> Iterator[Path]:
+    """Paths containing every require marker and no forbid marker."""
+    require, forbid = _encode(require), _encode(forbid)
+    for path in paths:
+        found = markers_in(path, require + forbid)
+        if all(found[:len(require)]) and not any(found[len(require):]):
+            yield path
+
+
+def stale_pages(paths: Iterable[Path], done: Iterable[str] = (), stale: Iterable[str] = ()) -> Iterator[Path]:
+    """Paths missing any done marker or containing any stale marker: the ones an idempotent pass must read."""
+    done, stale = _encode(done), _encode(stale)
+    for path in paths:
+        found = markers_in(path, done + stale)
+        if not all(found[:len(done)]) or any(found[len(done):]):
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the site's publishable pages, optionally filtered by marker.")
+    parser.add_argument("--exclude", action="append", help=f"Directory pattern to skip (repeatable; default: {', '.join(EXCLUDE)})")
+    parser.add_argument("--require", action="append", default=[], help="Only pages containing this text (repeatable)")
+    parser.add_argument("--forbid", action="append", default=[], help="Only pages not containing this text (repeatable)")
+    parser.add_argument("--refresh", action="store_true", help="Re-walk the tree even if the cache is current")
+    parser.add_argument("--list", action="store_true", help="Print the matching paths")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    pages = site_pages(exclude=args.exclude or EXCLUDE, refresh=args.refresh)
+    t1 = time.perf_counter()
+    matched = list(filter_pages(pages, args.require, args.forbid)) if args.require or args.forbid else pages
+    t2 = time.perf_counter()
+    if args.list:
+        for path in matched:
+            print(path.as_posix())
+    print(f"{len(pages)} page(s) in {(t1 - t0) * 1000:.1f} ms", end="")
+    if args.require or args.forbid:
+        print(f"; {len(matched)} match in {(t2 - t1) * 1000:.1f} ms", end="")
+    print(".")
+
+
+if __name__ == "__main__":
+    main()
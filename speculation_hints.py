@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Page stage: prefetch each holiday page's most likely next pages.
+
+The engagement script already tracks where readers go next (continue_click,
+related_click, rail_click), but every navigation starts cold. For each page
+this stage ranks its candidate destinations:
+
+- with --engagement: by event_count from an analytics export (CSV with
+  source_page, link_url and event_count columns, the parameters
+  upgrade_holiday_engagement.py sends), for links still on the page;
+- otherwise, or to fill up: the #continue links in order, then
+  #related-mid and #related.
+
+It keeps the top --max (default MAX_TARGETS), and stops early once the
+targets' HTML adds up to --budget KB, so prefetching costs a bounded
+amount of bandwidth per view. Then it writes one <script
+type="speculationrules"> prefetch list before </body>. Browsers without
+speculation rules get the same list as <link rel="prefetch"> from a short
+inline script, which checks HTMLScriptElement.supports so no browser
+fetches twice. Reruns replace the block. The rail (#next-rail) is filled in
+the browser, so its links are not known here.
+
+Usage:
+  python3 speculation_hints.py
+  python3 speculation_hints.py --engagement ga4_link_clicks.csv --max 2
+  python3 speculation_hints.py --dry-run
+"""
+
+import argparse
+import csv
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+import build_profile
+from generate_holiday_index import HOLIDAY_DIR, MONTHS_DIR, PAGE_DIR
+
+MAX_TARGETS = 3
+BUDGET_KB = 200
+EAGERNESS = "eager"
+SECTIONS = ("continue", "related-mid", "related")
+LIBRARY_DIRS = {MONTHS_DIR.name, PAGE_DIR.name}
+
+SECTION_RE = re.compile(r'<section\b[^>]*\bid="([\w-]+)"[^>]*>(.*?)</section>', re.DOTALL)
+HOLIDAY_HREF_RE = re.compile(r'href="(?:https://www\.obscureholidaycalendar\.com)?/holiday/([^"/?#]+)/"')
+HINTS_RE = re.compile(r'[ \t]*<script type="speculationrules" data-next>.*?</script>\n(?:[ \t]*<script data-next>.*?</script>\n)?', re.DOTALL)
+FALLBACK_JS = (
+    "if (!(HTMLScriptElement.supports && HTMLScriptElement.supports('speculationrules'))) "
+    "{urls}.forEach(function (u) {{ var l = document.createElement('link'); l.rel = 'prefetch'; "
+    "l.href = u; document.head.appendChild(l); }});"
+)
+
+
+def candidates(html: str):
+    """Slugs linked from the page's #continue and #related sections, in SECTIONS order."""
+    found = {}
+    for section_id, body in SECTION_RE.findall(html):
+        if section_id in SECTIONS:
+            found.setdefault(section_id, HOLIDAY_HREF_RE.findall(body))
+    ordered = [slug for section_id in SECTIONS for slug in found.get(section_id, [])]
+    return list(dict.fromkeys(ordered))
+
+
+def load_engagement(path: Path):
+    """{source slug: {target slug: clicks}} from an analytics export."""
+    clicks = defaultdict(lambda: defaultdict(int))
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        missing = {"source_page", "link_url", "event_count"} - set(reader.fieldnames or ())
+        if missing:
+            raise SystemExit(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+        for row in reader:
+            target = HOLIDAY_HREF_RE.search(f'href="{row["link_url"].strip()}"')
+            try:
+                count = int(float(row["event_count"] or 0))
+            except ValueError:
+                continue
+            if target and row["source_page"]:
+                clicks[row["source_page"].strip()][target.group(1)] += count
+    return clicks
+
+
+def choose(slug: str, links, clicks, sizes, limit: int, budget: int):
+    ranked = links
+    if clicks.get(slug):
+        seen = clicks[slug]
+        ranked = sorted(links, key=lambda target: -seen.get(target, 0))
+    chosen, spent = [], 0
+    for target in ranked:
+        if target == slug or target not in sizes:
+            continue
+        if len(chosen) >= limit or chosen and spent + sizes[target] > budget:
+            break
+        chosen.append(target)
+        spent += sizes[target]
+    return chosen
+
+
+def hints_block(targets) -> str:
+    urls = [f"/holiday/{slug}/" for slug in targets]
+    rules = json.dumps({"prefetch": [{"source": "list", "urls": urls, "eagerness": EAGERNESS}]})
+    fallback = FALLBACK_JS.format(urls=json.dumps(urls))
+    return (f'  <script type="speculationrules" data-next>{rules}</script>\n'
+            f"  <script data-next>{fallback}</script>\n")
+
+
+def apply_hints(html: str, targets) -> str:
+    html = HINTS_RE.sub("", html)
+    if not targets:
+        return html
+    body_end = html.lower().rfind("</body>")
+    if body_end == -1:
+        return html
+    return html[:body_end] + hints_block(targets) + html[body_end:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add speculation-rules prefetch hints for each holiday page's likely next pages.")
+    parser.add_argument("--engagement", type=Path, help="Analytics CSV (source_page, link_url, event_count) to rank targets")
+    parser.add_argument("--max", type=int, default=MAX_TARGETS, help=f"Targets per page (default: {MAX_TARGETS})")
+    parser.add_argument("--budget", type=int, default=BUDGET_KB, help=f"KB of target HTML per page (default: {BUDGET_KB})")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    clicks = load_engagement(args.engagement) if args.engagement else {}
+    pages = sorted(p / "index.html" for p in Path(HOLIDAY_DIR).iterdir()
+                   if p.name not in LIBRARY_DIRS and (p / "index.html").is_file())
+    sizes = {path.parent.name: path.stat().st_size for path in pages}
+
+    hinted = targets_total = ranked_by_data = updated = 0
+    with build_profile.session(args, "speculation_hints") as prof:
+        for path in prof.iter("pages", pages):
+            slug = path.parent.name
+            with prof.page(slug):
+                html = prof.read_text(path)
+                targets = choose(slug, candidates(html), clicks, sizes, args.max, args.budget * 1024)
+                out = apply_hints(html, targets)
+                if out != html:
+                    updated += 1
+                    if not args.dry_run:
+                        prof.write_text(path, out)
+            if targets:
+                hinted += 1
+                targets_total += len(targets)
+                ranked_by_data += bool(clicks.get(slug))
+
+    verb = "Would update" if args.dry_run else "Updated"
+    average = targets_total / hinted if hinted else 0
+    print(f"{verb} {updated} of {len(pages)} page(s). {hinted} page(s) have hints, "
+          f"{average:.2f} prefetch target(s) on average ({targets_total} total).")
+    if args.engagement:
+        print(f"{ranked_by_data} page(s) ranked from {args.engagement}; the rest use #continue/#related order.")
+
+
+if __name__ == "__main__":
+    main()
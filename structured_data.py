@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Structured-data stage: one compact JSON-LD @graph per page.
+
+Holiday pages carried five separate application/ld+json blocks (Article,
+FAQPage, MobileApplication, BreadcrumbList, WebPage), some of them built by
+string interpolation. For every page this stage:
+
+- parses each block with json.loads (blocks that already hold an @graph
+  are expanded into their nodes);
+- drops exact duplicates, and later copies of a type a page should have
+  only once (SINGLETON_TYPES), keeping the first (the count is reported);
+- gives each node an @id under the page's canonical URL (#article, #faq,
+  #breadcrumb; the WebPage is the URL itself) unless it has one, so
+  Article.mainEntityOfPage points at a node in the same graph;
+- writes them back as a single block with one @context, serialised with
+  json.dumps (compact, "</" escaped), where the first block was.
+
+Every node is also validated (REQUIRED properties, FAQ questions with an
+answer, breadcrumb positions 1..n). A block that isn't valid JSON is
+reported and left where it is. Pages are processed in parallel and the
+bytes saved per page are reported; the run exits 1 if any page has a
+problem, so it doubles as a JSON-LD check (--dry-run writes nothing).
+
+schema_types() and ld_json_script() are also used by generate_seo_pages.py
+to detect existing schema and to serialise new blocks.
+
+Usage:
+  python3 structured_data.py                  # every page under holiday/
+  python3 structured_data.py holiday index.html about
+  python3 structured_data.py --dry-run --verbose
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+import build_profile
+from minify_html import iter_pages
+
+DEFAULT_PATHS = ["holiday"]
+DOMAIN = "https://www.obscureholidaycalendar.com"
+CONTEXT = "https://schema.org"
+TOP_SAVINGS = 10
+
+LD_JSON_RE = re.compile(
+    r'(?:<!--\s*BREADCRUMB-SCHEMA\s*-->\s*)?'
+    r'<script\b[^>]*\btype\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script\s*>',
+    re.DOTALL | re.IGNORECASE,
+)
+CANONICAL_RE = re.compile(r'<link\s+rel=["\']canonical["\']\s+href=["\'](.*?)["\']', re.IGNORECASE)
+
+SINGLETON_TYPES = {"WebPage", "Article", "FAQPage", "BreadcrumbList", "MobileApplication"}
+ID_SUFFIXES = {"WebPage": "", "Article": "#article", "FAQPage": "#faq", "BreadcrumbList": "#breadcrumb"}
+APP_ID = f"{DOMAIN}/app/#app"
+REQUIRED = {
+    "WebPage": ("name", "url"),
+    "Article": ("headline", "mainEntityOfPage", "publisher"),
+    "FAQPage": ("mainEntity",),
+    "BreadcrumbList": ("itemListElement",),
+    "MobileApplication": ("name", "operatingSystem", "applicationCategory"),
+}
+
+
+def ld_json_script(data) -> str:
+    """A <script type="application/ld+json"> element for data; "</" is escaped so no value can end the element."""
+    body = json.dumps(data, ensure_ascii=False, indent=2).replace("</", "<\\/")
+    return f'<script type="application/ld+json">\n{body}\n</script>'
+
+
+def _nodes(data) -> list:
+    items = data if isinstance(data, list) else [data]
+    nodes = []
+    for item in items:
+        if isinstance(item, dict) and "@graph" in item:
+            nodes.extend(_nodes(item["@graph"]))
+        elif isinstance(item, dict):
+            nodes.append({k: v for k, v in item.items() if k != "@context"})
+    return nodes
+
+
+def schema_types(html: str) -> set:
+    """Every @type declared at the top level of the page's JSON-LD (graphs included)."""
+    types = set()
+    for m in LD_JSON_RE.finditer(html):
+        try:
+            nodes = _nodes(json.loads(m.group(1)))
+        except ValueError:
+            continue
+        for node in nodes:
+            kind = node.get("@type")
+            types.update(kind if isinstance(kind, list) else [kind])
+    return types
+
+
+def _types(node) -> List[str]:
+    """A node's @type as a list; JSON-LD allows one type or an array of them."""
+    kind = node.get("@type")
+    kinds = kind if isinstance(kind, list) else [kind]
+    return [k for k in kinds if isinstance(k, str) and k]
+
+
+def validate(node) -> List[str]:
+    types = _types(node)
+    if not types:
+        return ["node without @type"]
+    problems = [f"{kind}: missing {prop}" for kind in types for prop in REQUIRED.get(kind, ()) if not node.get(prop)]
+    if "FAQPage" in types:
+        for i, question in enumerate(node.get("mainEntity") or [], 1):
+            if not isinstance(question, dict) or not question.get("name"):
+                problems.append(f"FAQPage: question {i} has no name")
+            elif not (question.get("acceptedAnswer") or {}).get("text"):
+                problems.append(f"FAQPage: question {i} has no answer text")
+    if "BreadcrumbList" in types:
+        positions = [item.get("position") for item in node.get("itemListElement") or [] if isinstance(item, dict)]
+        if positions != list(range(1, len(positions) + 1)):
+            problems.append(f"BreadcrumbList: positions {positions} are not 1..n")
+    return problems
+
+
+def merge_graph(html: str) -> Tuple[str, List[str], int]:
+    """Return (html with its JSON-LD merged into one @graph block, problems found, duplicates dropped)."""
+    matches = list(LD_JSON_RE.finditer(html))
+    if not matches:
+        return html, [], 0
+    problems = []
+    dropped = 0
+    canonical = CANONICAL_RE.search(html)
+    canonical = canonical.group(1).strip() if canonical else None
+
+    nodes, seen, singletons, merged = [], set(), set(), []
+    for i, m in enumerate(matches, 1):
+        try:
+            data = json.loads(m.group(1))
+        except ValueError as exc:
+            problems.append(f"block {i}: invalid JSON ({exc})")
+            continue
+        merged.append(m)
+        for node in _nodes(data):
+            types = set(_types(node))
+            # Type order in an array doesn't matter for duplicates.
+            key = json.dumps({**node, "@type": sorted(types)}, sort_keys=True)
+            if key in seen or types & singletons:
+                dropped += 1
+                continue
+            seen.add(key)
+            singletons |= types & SINGLETON_TYPES
+            nodes.append(node)
+    if not merged:
+        return html, problems, 0
+
+    for node in nodes:
+        problems.extend(validate(node))
+        if "@id" in node:
+            continue
+        types = _types(node)
+        if "MobileApplication" in types:
+            node["@id"] = APP_ID
+        elif canonical:
+            kind = next((k for k in types if k in ID_SUFFIXES), None)
+            if kind:
+                node["@id"] = canonical + ID_SUFFIXES[kind]
+    # Key order: @id and @type first, as schema.org examples do.
+    nodes = [{"@id": n["@id"], **n} if "@id" in n else n for n in nodes]
+    graph = json.dumps({"@context": CONTEXT, "@graph": nodes}, ensure_ascii=False, separators=(",", ":"))
+    block = '<script type="application/ld+json">' + graph.replace("</", "<\\/") + "</script>"
+
+    out, pos = [], 0
+    for j, m in enumerate(merged):
+        start = m.start()
+        if j:
+            # Take the indentation and line break in front of removed blocks with them.
+            while start > pos and html[start - 1] in " \t":
+                start -= 1
+            if start > pos and html[start - 1] == "\n":
+                start -= 1
+        out.append(html[pos:start])
+        if not j:
+            out.append(block)
+        pos = m.end()
+    out.append(html[pos:])
+    return "".join(out), problems, dropped
+
+
+def process_page(path_str: str, write: bool) -> Tuple[str, int, int, List[str], int]:
+    path = Path(path_str)
+    html = path.read_text(encoding="utf-8")
+    merged, problems, dropped = merge_graph(html)
+    before, after = len(html.encode("utf-8")), len(merged.encode("utf-8"))
+    if write and merged != html:
+        path.write_text(merged, encoding="utf-8")
+    return path_str, before, after, problems, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge each page's JSON-LD into one validated @graph block.")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS, help="Files or directories (default: holiday)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report savings without writing")
+    parser.add_argument("--verbose", action="store_true", help="Print bytes saved for every page")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
+    with build_profile.session(args, "structured_data") as prof:
+        with prof.phase("walk"):
+            pages = [path.as_posix() for path in iter_pages(args.paths)]
+        with prof.phase("merge", files=len(pages)):
+            write = [not args.dry_run] * len(pages)
+            if args.workers > 1 and len(pages) > 1:
+                with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                    results = list(pool.map(process_page, pages, write, chunksize=16))
+            else:
+                results = list(map(process_page, pages, write))
+        for _, before, after, _, _ in results:
+            prof.add_read(before)
+            if after != before and not args.dry_run:
+                prof.add_written(after)
+
+    savings = sorted(((before - after, before, path) for path, before, after, _, _ in results if before != after), reverse=True)
+    for saved, before, path in savings if args.verbose else savings[:TOP_SAVINGS]:
+        print(f"{saved:>9} B  {saved / before:6.1%}  {path}")
+    total = sum(saved for saved, _, _ in savings)
+    verb = "Would merge" if args.dry_run else "Merged"
+    dropped = sum(result[4] for result in results)
+    print(f"{verb} JSON-LD on {len(savings)} of {len(pages)} page(s); saved {total / 1024:.1f} KB; "
+          f"{dropped} duplicate node(s) dropped.")
+
+    problems = [(path, problem) for path, _, _, found, _ in results for problem in found]
+    if problems:
+        print(f"JSON-LD problems ({len(problems)}):")
+        for path, problem in problems:
+            print(f"- {path}: {problem}")
+        raise SystemExit(1)
+    print("All JSON-LD valid.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Tests for structured_data.merge_graph with array @type nodes.
+
+Run with: python3 -m pytest test_structured_data.py
+"""
+
+import json
+import re
+
+from structured_data import merge_graph, validate
+
+CANONICAL = "https://www.obscureholidaycalendar.com/holiday/pi-day/"
+ARTICLE = {
+    "@context": "https://schema.org",
+    "@type": ["Article", "NewsArticle"],
+    "headline": "Pi Day",
+    "mainEntityOfPage": CANONICAL,
+    "publisher": {"@type": "Organization", "name": "Obscure Holiday Calendar"},
+}
+
+
+def page(*blocks) -> str:
+    scripts = "\n".join(f'<script type="application/ld+json">{json.dumps(b)}</script>' for b in blocks)
+    return f'<html><head><link rel="canonical" href="{CANONICAL}">\n{scripts}\n</head></html>'
+
+
+def graph(html: str) -> list:
+    blocks = re.findall(r'<script type="application/ld\+json">(.*?)</script>', html)
+    assert len(blocks) == 1
+    return json.loads(blocks[0])["@graph"]
+
+
+def test_list_type_is_merged_and_validated():
+    html, problems, dropped = merge_graph(page(ARTICLE, {"@type": "WebPage", "name": "Pi Day", "url": CANONICAL}))
+    assert problems == []
+    assert dropped == 0
+    article, webpage = graph(html)
+    assert article["@id"] == CANONICAL + "#article"
+    assert article["@type"] == ["Article", "NewsArticle"]
+    assert webpage["@id"] == CANONICAL
+
+
+def test_list_type_counts_as_singleton():
+    second = {**ARTICLE, "@type": "Article", "headline": "Pi Day again"}
+    html, _, dropped = merge_graph(page(ARTICLE, second))
+    assert dropped == 1
+    assert [node["headline"] for node in graph(html)] == ["Pi Day"]
+
+
+def test_list_type_duplicates_ignore_type_order():
+    reordered = {**ARTICLE, "@type": ["NewsArticle", "Article"]}
+    _, _, dropped = merge_graph(page(ARTICLE, reordered))
+    assert dropped == 1
+
+
+def test_list_type_requires_every_types_properties():
+    node = {"@type": ["Article", "WebPage"], "headline": "Pi Day", "mainEntityOfPage": CANONICAL}
+    assert validate(node) == ["Article: missing publisher", "WebPage: missing name", "WebPage: missing url"]
@@ -13,6 +13,7 @@ import datetime
 import json
 import os
 import pathlib
+import shutil
 import sys
 import urllib.request
 
@@ -46,14 +47,23 @@ snap_path = root / f"holidays_snapshot_{timestamp}.json"
 out_path = root / "holidays.json"
 bot_path = root / "bot" / "holidays.json"
 
-# Write a pretty snapshot for diffing and archival.
-snap_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2))
+# Serialize once, streaming to disk rather than building the whole string,
+# then copy the bytes for the snapshot and the bot. Writing to a temp file
+# and renaming means an interrupted run never leaves a truncated copy.
+tmp_path = out_path.with_name(out_path.name + ".tmp")
+with open(tmp_path, "w", encoding="utf-8") as fh:
+    json.dump(payload, fh, ensure_ascii=False, indent=2)
 
-# Write the canonical file used by the site generator.
-out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2))
+# Pretty snapshot for diffing and archival.
+shutil.copyfile(tmp_path, snap_path)
 
 # Keep the bot copy in sync.
-bot_path.write_text(out_path.read_text())
+bot_tmp = bot_path.with_name(bot_path.name + ".tmp")
+shutil.copyfile(tmp_path, bot_tmp)
+os.replace(bot_tmp, bot_path)
+
+# Canonical file used by the site generator.
+os.replace(tmp_path, out_path)
 
 print(f"Fetched {holiday_count} holidays")
 print(f"Snapshot saved to {snap_path.name}")
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
+import argparse
 import re
 from pathlib import Path
 
+import build_profile
+import site_files
+
 ROOT = Path(__file__).resolve().parent
 HOLIDAY_DIR = ROOT / "holiday"
 
@@ -91,10 +95,7 @@ SCRIPT_BLOCK = """
       const rail = document.getElementById('next-rail');
 
       function track(eventName, payload) {
-        if (!window.gtag) return;
-        try {
-          gtag('event', eventName, payload || {});
-        } catch (_) {}
+        (window.ohcQ = window.ohcQ || []).push([eventName, payload || {}]);
       }
 
       function textLabel(el) {
@@ -140,14 +141,41 @@ SCRIPT_BLOCK = """
 """.strip("\n")
 
 
+# track() as first shipped: a synchronous gtag call per click. Pages that still
+# have it are switched to the assets/analytics.js queue.
+LEGACY_TRACK = """
+      function track(eventName, payload) {
+        if (!window.gtag) return;
+        try {
+          gtag('event', eventName, payload || {});
+        } catch (_) {}
+      }
+""".strip("\n")
+TRACK = """
+      function track(eventName, payload) {
+        (window.ohcQ = window.ohcQ || []).push([eventName, payload || {}]);
+      }
+""".strip("\n")
+
+
+# A page with every DONE marker and no STALE one is already upgraded; the
+# prefilter skips it without reading it (see patch_file for each step).
+DONE_MARKERS = [".next-rail", 'id="next-rail"', 'id="related-mid"', 'class="continue-lead"', "attachEngagementTracking"]
+STALE_MARKERS = [
+    '<section class="section" id="continue">\n        <h2>Continue to</h2>',
+    '<a href="#related">Related</a>',
+    LEGACY_TRACK,
+]
+
+
 def insert_once(content: str, marker: str, block: str, before: str) -> str:
     if marker in content:
         return content
     return content.replace(before, block + "\n" + before, 1)
 
 
-def patch_file(path: Path) -> bool:
-    src = path.read_text(encoding="utf-8")
+def patch_file(path: Path, prof: build_profile.Profile) -> bool:
+    src = prof.read_text(path)
     out = src
 
     # CSS injection
@@ -187,19 +215,27 @@ def patch_file(path: Path) -> bool:
     if "attachEngagementTracking" not in out:
         hook = "      addRecent();\n      renderRecents();"
         out = out.replace(hook, SCRIPT_BLOCK + "\n\n" + hook, 1)
+    out = out.replace(LEGACY_TRACK, TRACK, 1)
 
     if out != src:
-        path.write_text(out, encoding="utf-8")
+        prof.write_text(path, out)
         return True
     return False
 
 
 def main() -> None:
-    files = sorted(HOLIDAY_DIR.glob("*/index.html"))
+    parser = argparse.ArgumentParser(description="Add the next-rail, related module and engagement tracking to holiday pages.")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
     updated = 0
-    for path in files:
-        if patch_file(path):
-            updated += 1
+    with build_profile.session(args, "upgrade_holiday_engagement") as prof:
+        with prof.phase("walk"):
+            files = sorted(HOLIDAY_DIR.glob("*/index.html"))
+        for path in prof.iter("prefilter", site_files.stale_pages(files, DONE_MARKERS, STALE_MARKERS)):
+            with prof.page(path.parent.name):
+                if patch_file(path, prof):
+                    updated += 1
     print(f"Updated {updated} of {len(files)} holiday pages.")
 
 
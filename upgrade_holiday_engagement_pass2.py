@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
+import argparse
 from pathlib import Path
 
+import build_profile
+import site_files
+
 ROOT = Path(__file__).resolve().parent
 HOLIDAY_DIR = ROOT / "holiday"
 
@@ -93,10 +97,7 @@ ANALYTICS_BLOCK = """
         const once = new Set();
 
         function emit(name, payload) {
-          if (!window.gtag) return;
-          try {
-            gtag('event', name, payload || {});
-          } catch (_) {}
+          (window.ohcQ = window.ohcQ || []).push([name, payload || {}]);
         }
 
         const milestones = [25, 50, 75, 100];
@@ -117,35 +118,39 @@ ANALYTICS_BLOCK = """
           });
         }
 
-        let engagedSeconds = 0;
-        let active = true;
-        let lastTick = Date.now();
-        let idleTimer = null;
+        // Engaged time: visible and not idle for IDLE_MS. Summed from timestamps when
+        // the page is hidden or goes idle; a single timeout wakes up at the next
+        // milestone (or when the reader would go idle) instead of a 1 s interval.
+        const IDLE_MS = 15000;
         const engagedMilestones = [30, 90, 180];
+        let engagedMs = 0;
+        let lastInput = Date.now();
+        let since = document.hidden ? null : lastInput;
+        let engagedTimer = null;
 
-        function resetIdle() {
-          active = true;
-          if (idleTimer) clearTimeout(idleTimer);
-          idleTimer = setTimeout(() => { active = false; }, 15000);
+        function settle(now) {
+          if (since === null) return;
+          const end = Math.min(now, lastInput + IDLE_MS);
+          if (end > since) engagedMs += end - since;
+          since = document.hidden || now - lastInput >= IDLE_MS ? null : now;
         }
 
-        ['scroll', 'click', 'keydown', 'touchstart', 'mousemove'].forEach((evt) => {
-          window.addEventListener(evt, resetIdle, { passive: true });
-        });
-        document.addEventListener('visibilitychange', () => {
-          if (document.hidden) active = false;
-          else resetIdle();
-        });
-
-        setInterval(() => {
+        function scheduleEngaged() {
+          if (engagedTimer) clearTimeout(engagedTimer);
+          engagedTimer = null;
+          const next = engagedMilestones.find((m) => !once.has(`engaged_${m}`));
+          if (since === null || next === undefined) return;
           const now = Date.now();
-          const delta = (now - lastTick) / 1000;
-          lastTick = now;
-          if (document.hidden || !active) return;
-          engagedSeconds += delta;
+          const wait = Math.min(next * 1000 - engagedMs - (now - since), lastInput + IDLE_MS - now);
+          engagedTimer = setTimeout(checkEngaged, Math.max(0, wait) + 50);
+        }
+
+        function checkEngaged() {
+          engagedTimer = null;
+          settle(Date.now());
           engagedMilestones.forEach((m) => {
             const key = `engaged_${m}`;
-            if (engagedSeconds >= m && !once.has(key)) {
+            if (engagedMs >= m * 1000 && !once.has(key)) {
               once.add(key);
               emit('engaged_time', {
                 source_page: pageData.slug,
@@ -154,11 +159,40 @@ ANALYTICS_BLOCK = """
               });
             }
           });
-        }, 1000);
+          scheduleEngaged();
+        }
 
-        window.addEventListener('scroll', onScrollDepth, { passive: true });
+        function onInput() {
+          lastInput = Date.now();
+          if (since === null && !document.hidden) {
+            since = lastInput;
+            scheduleEngaged();
+          }
+        }
+
+        ['scroll', 'click', 'keydown', 'touchstart', 'mousemove'].forEach((evt) => {
+          window.addEventListener(evt, onInput, { passive: true });
+        });
+        document.addEventListener('visibilitychange', () => {
+          if (document.hidden) {
+            settle(Date.now());
+            scheduleEngaged();
+          } else {
+            onInput();
+          }
+        });
+
+        let scrollQueued = false;
+        window.addEventListener('scroll', () => {
+          if (scrollQueued) return;
+          scrollQueued = true;
+          requestAnimationFrame(() => {
+            scrollQueued = false;
+            onScrollDepth();
+          });
+        }, { passive: true });
         onScrollDepth();
-        resetIdle();
+        scheduleEngaged();
 
         const adSections = document.querySelectorAll('.ad-section');
         if ('IntersectionObserver' in window && adSections.length) {
@@ -199,8 +233,93 @@ ANALYTICS_BLOCK = """
 """.strip("\n")
 
 
-def patch_file(path: Path) -> bool:
-    src = path.read_text(encoding="utf-8")
+# The start of initAdvancedEngagementTracking() as first shipped: a gtag call
+# per event and a 1 s setInterval for engaged time. On pages that still have
+# it, everything before the ad-slot code is replaced with the current block
+# (the ad-slot code, and any ad loader defer_third_party.py added to it, is
+# kept as it is).
+LEGACY_ANALYTICS_PREFIX = """
+      function initAdvancedEngagementTracking() {
+        const once = new Set();
+
+        function emit(name, payload) {
+          if (!window.gtag) return;
+          try {
+            gtag('event', name, payload || {});
+          } catch (_) {}
+        }
+
+        const milestones = [25, 50, 75, 100];
+        function onScrollDepth() {
+          const maxScroll = document.documentElement.scrollHeight - window.innerHeight;
+          if (maxScroll <= 0) return;
+          const pct = Math.round((window.scrollY / maxScroll) * 100);
+          milestones.forEach((m) => {
+            const key = `scroll_${m}`;
+            if (pct >= m && !once.has(key)) {
+              once.add(key);
+              emit('scroll_depth', {
+                source_page: pageData.slug,
+                percent: m,
+                page_type: 'holiday'
+              });
+            }
+          });
+        }
+
+        let engagedSeconds = 0;
+        let active = true;
+        let lastTick = Date.now();
+        let idleTimer = null;
+        const engagedMilestones = [30, 90, 180];
+
+        function resetIdle() {
+          active = true;
+          if (idleTimer) clearTimeout(idleTimer);
+          idleTimer = setTimeout(() => { active = false; }, 15000);
+        }
+
+        ['scroll', 'click', 'keydown', 'touchstart', 'mousemove'].forEach((evt) => {
+          window.addEventListener(evt, resetIdle, { passive: true });
+        });
+        document.addEventListener('visibilitychange', () => {
+          if (document.hidden) active = false;
+          else resetIdle();
+        });
+
+        setInterval(() => {
+          const now = Date.now();
+          const delta = (now - lastTick) / 1000;
+          lastTick = now;
+          if (document.hidden || !active) return;
+          engagedSeconds += delta;
+          engagedMilestones.forEach((m) => {
+            const key = `engaged_${m}`;
+            if (engagedSeconds >= m && !once.has(key)) {
+              once.add(key);
+              emit('engaged_time', {
+                source_page: pageData.slug,
+                seconds: m,
+                page_type: 'holiday'
+              });
+            }
+          });
+        }, 1000);
+
+        window.addEventListener('scroll', onScrollDepth, { passive: true });
+        onScrollDepth();
+        resetIdle();
+
+""".strip("\n")
+AD_SECTIONS_LINE = "        const adSections = document.querySelectorAll('.ad-section');"
+ANALYTICS_SRC = "/assets/analytics.js"
+ANALYTICS_SCRIPT = f'  <script src="{ANALYTICS_SRC}" defer></script>'
+# Pages with all of these and no legacy block are skipped without being read.
+DONE_MARKERS = ["--pro-space", "initAdvancedEngagementTracking", ANALYTICS_SRC]
+
+
+def patch_file(path: Path, prof: build_profile.Profile) -> bool:
+    src = prof.read_text(path)
     out = src
 
     if "--pro-space" not in out:
@@ -209,19 +328,31 @@ def patch_file(path: Path) -> bool:
     if "initAdvancedEngagementTracking" not in out:
         hook = "      addRecent();\n      renderRecents();"
         out = out.replace(hook, ANALYTICS_BLOCK + "\n\n" + hook, 1)
+    elif LEGACY_ANALYTICS_PREFIX in out:
+        out = out.replace(LEGACY_ANALYTICS_PREFIX, ANALYTICS_BLOCK.split(AD_SECTIONS_LINE)[0].rstrip("\n"), 1)
+
+    if ANALYTICS_SRC not in out:
+        out = out.replace("</body>", ANALYTICS_SCRIPT + "\n</body>", 1)
 
     if out != src:
-        path.write_text(out, encoding="utf-8")
+        prof.write_text(path, out)
         return True
     return False
 
 
 def main() -> None:
-    files = sorted(HOLIDAY_DIR.glob("*/index.html"))
+    parser = argparse.ArgumentParser(description="Add the polish CSS and advanced engagement analytics to holiday pages.")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+
     updated = 0
-    for path in files:
-      if patch_file(path):
-        updated += 1
+    with build_profile.session(args, "upgrade_holiday_engagement_pass2") as prof:
+      with prof.phase("walk"):
+        files = sorted(HOLIDAY_DIR.glob("*/index.html"))
+      for path in prof.iter("prefilter", site_files.stale_pages(files, DONE_MARKERS, [LEGACY_ANALYTICS_PREFIX])):
+        with prof.page(path.parent.name):
+          if patch_file(path, prof):
+            updated += 1
     print(f"Updated {updated} of {len(files)} holiday pages.")
 
 
@@ -13,11 +13,17 @@ Optional OpenAI checks (requires OPENAI_API_KEY and --openai):
 - For each holiday, ask the model to rate legitimacy, date match, and fact plausibility.
 - Adds issues if confidence is low.
 
+Each offline check is a registered Rule (see RULES); --list-rules shows them,
+--only/--skip select them, and per-rule timings are printed after the issues.
+
 Usage:
   python3 validate_holidays.py
+  python3 validate_holidays.py --only missing_fun_facts,low_date_confidence
+  python3 validate_holidays.py --skip duplicate_name --workers 4
   python3 validate_holidays.py --json-out report.json
   python3 validate_holidays.py --file path/to/holidays.json
   python3 validate_holidays.py --openai --json-out report.json
+  python3 validate_holidays.py --profile --cprofile validate.pstats
 """
 
 import argparse
@@ -26,11 +32,15 @@ import os
 import re
 import time
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 
 import requests
 
+import build_profile
+from holiday_data import iter_holiday_buckets, slugify
+
 
 MONTH_DAYS = {
     1: 31, 2: 29, 3: 31, 4: 30,
@@ -45,13 +55,6 @@ MONTH_NAMES = {
 }
 
 
-def slugify(name: str) -> str:
-    s = name.lower()
-    s = s.replace("&", "and")
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    return s.strip("-")
-
-
 def parse_date_key(key: str):
     if not re.fullmatch(r"\d{2}-\d{2}", key):
         return None
@@ -59,20 +62,62 @@ def parse_date_key(key: str):
     return mm, dd
 
 
-def month_in_text(text: str) -> List[int]:
-    text_low = text.lower()
+MONTH_ABBREVIATIONS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7,
+    "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# Month words that are also ordinary English ("you may...", "march in a
+# parade") only count when capitalised or followed by a day number.
+AMBIGUOUS_MONTH_WORDS = {"may", "march"}
+
+_DAY = r"(?:[12]\d|3[01]|0?[1-9])(?:st|nd|rd|th)?"
+
+# Every full month name and abbreviation, factored by shared prefix (the
+# regex form of an Aho-Corasick trie) so one pass over the lowercased text
+# finds them all. Because the pattern opens with a literal, sre can skip
+# ahead on the first character instead of trying every position.
+MONTH_WORD_RE = re.compile(
+    r"(?:a(?:pr(?:il)?|ug(?:ust)?)|dec(?:ember)?|feb(?:ruary)?|j(?:an(?:uary)?|u(?:ly?|ne?))"
+    r"|ma(?:r(?:ch)?|y)|nov(?:ember)?|oct(?:ober)?|sep(?:t(?:ember)?)?)\b"
+)
+FOLLOWING_DAY_RE = re.compile(rf"\.?\s+({_DAY})\b")  # "September 28th", "Sept. 3"
+LEADING_DAY_RE = re.compile(rf"\b({_DAY})\s+of\s+$")  # "the 4th of July"
+
+
+def month_mentions(text: str) -> List[Tuple[int, Optional[int]]]:
+    """Return (month, day-or-None) for every month mention in text, in order."""
+    low = text.lower()
+    # lower() can change the length of some non-ASCII text; if it did, the
+    # original casing can't be looked up by offset.
+    same_len = len(low) == len(text)
     found = []
-    for name, num in MONTH_NAMES.items():
-        if name in text_low:
-            found.append(num)
+    for m in MONTH_WORD_RE.finditer(low):
+        start = m.start()
+        if start and low[start - 1].isalnum():
+            continue  # tail of a longer word, e.g. "dismay"
+        word = m.group(0)
+        day_match = FOLLOWING_DAY_RE.match(low, m.end())
+        if not day_match:
+            day_match = LEADING_DAY_RE.search(low, max(0, start - 16), start)
+        if word in MONTH_NAMES:
+            if word in AMBIGUOUS_MONTH_WORDS and not day_match and not (same_len and text[start].isupper()):
+                continue
+            month = MONTH_NAMES[word]
+        elif day_match:
+            # Bare abbreviations ("Jan", "Dec") are too often names or words.
+            month = MONTH_ABBREVIATIONS[word]
+        else:
+            continue
+        day = int(day_match.group(1).rstrip("stndrdh")) if day_match else None
+        if day is not None and day > MONTH_DAYS[month]:
+            day = None
+        found.append((month, day))
     return found
 
 
-def load_holidays(path: Path) -> Dict[str, Any]:
-    data = json.loads(path.read_text(encoding="utf-8"))
-    if isinstance(data, dict) and "holidays" in data:
-        return data
-    raise ValueError("Expected top-level {'holidays': {...}} structure")
+def month_in_text(text: str) -> List[int]:
+    return sorted({month for month, _ in month_mentions(text)})
 
 
 def openai_score(entry: Dict[str, Any], model: str, base_url: str, timeout: float) -> Dict[str, Any]:
@@ -147,85 +192,364 @@ def date_plausibility(mm: int, dd: int, entry: Dict[str, Any]) -> float:
         return 0.0
     score = 0.6
     text = f"{entry.get('name','')} {entry.get('description','')}"
-    months = month_in_text(text)
-    if months:
-        if mm in months:
+    mentions = month_mentions(text)
+    if mentions:
+        days_in_month = {day for month, day in mentions if month == mm and day is not None}
+        if dd in days_in_month:
+            score += 0.35
+        elif days_in_month:
+            # Right month, but the text names a different day.
+            score += 0.05
+        elif any(month == mm for month, _ in mentions):
             score += 0.2
         else:
             score -= 0.2
-    return max(0.0, min(1.0, score))
+    return round(max(0.0, min(1.0, score)), 2)
 
 
-def validate(path: Path):
-    data = load_holidays(path)
-    holidays = data.get("holidays", {})
+# --- Rule engine ---
+# Every offline check is a small Rule subclass registered in RULES. A rule's
+# scope decides what it sees:
+#   "bucket" -> check(date_key, items) once per MM-DD key
+#   "entry"  -> check(ctx) once per holiday dict under a well-formed key
+#   "global" -> collect(state, ctx) per entry, then finish(state) once
+# Entry rules are pure functions of their EntryContext, so run_rules() can
+# farm them out to a process pool in chunks. Global rules keep only the
+# small state they need, so the catalog itself can be streamed.
+
+RULES: Dict[str, "Rule"] = {}
+
+
+def register(cls):
+    """Class decorator: instantiate the rule and add it to RULES."""
+    rule = cls()
+    if rule.name in RULES:
+        raise ValueError(f"Duplicate rule name: {rule.name}")
+    RULES[rule.name] = rule
+    return cls
+
+
+class EntryContext(NamedTuple):
+    date_key: str
+    mm: int
+    dd: int
+    index: int
+    entry: Dict[str, Any]
+
+
+class Rule:
+    name = ""
+    scope = "entry"
+
+    def check(self, *args) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+def _entry_issue(ctx: EntryContext, severity: str, type_: str, msg: str) -> Dict[str, Any]:
+    return {"severity": severity, "type": type_, "date": ctx.date_key, "index": ctx.index, "msg": msg}
 
-    issues = []
-    dup_name_dates = defaultdict(list)
-    slug_dates = defaultdict(list)
 
-    for date_key, items in holidays.items():
+@register
+class BadDateKeyRule(Rule):
+    name = "bad_date_key"
+    scope = "bucket"
+
+    def check(self, date_key, items):
+        if parse_date_key(date_key):
+            return []
+        return [{"severity": "error", "type": self.name, "date": date_key, "msg": "Date key not MM-DD"}]
+
+
+@register
+class InvalidCalendarDayRule(Rule):
+    name = "invalid_calendar_day"
+    scope = "bucket"
+
+    def check(self, date_key, items):
         parsed = parse_date_key(date_key)
         if not parsed:
-            issues.append({"severity": "error", "type": "bad_date_key", "date": date_key, "msg": "Date key not MM-DD"})
-            continue
+            return []
         mm, dd = parsed
         if mm not in MONTH_DAYS or dd < 1 or dd > MONTH_DAYS[mm]:
-            issues.append({"severity": "error", "type": "invalid_calendar_day", "date": date_key, "msg": "Day not valid for month"})
+            return [{"severity": "error", "type": self.name, "date": date_key, "msg": "Day not valid for month"}]
+        return []
 
-        if not isinstance(items, list):
-            issues.append({"severity": "error", "type": "bad_entry_list", "date": date_key, "msg": "Expected list of holidays"})
-            continue
 
-        for idx, entry in enumerate(items):
-            if not isinstance(entry, dict):
-                issues.append({"severity": "error", "type": "bad_entry", "date": date_key, "index": idx, "msg": "Entry is not an object"})
-                continue
-            name = (entry.get("name") or "").strip()
-            if not name:
-                issues.append({"severity": "error", "type": "missing_name", "date": date_key, "index": idx, "msg": "Missing name"})
-            else:
-                dup_name_dates[name].append(date_key)
-
-            desc = (entry.get("description") or "").strip()
-            if not desc:
-                issues.append({"severity": "warn", "type": "missing_description", "date": date_key, "index": idx, "msg": "Missing description"})
-            elif len(desc) < 60:
-                issues.append({"severity": "info", "type": "short_description", "date": date_key, "index": idx, "msg": "Description is short (<60 chars)"})
-
-            facts = entry.get("funFacts")
-            if not facts:
-                issues.append({"severity": "warn", "type": "missing_fun_facts", "date": date_key, "index": idx, "msg": "No funFacts provided"})
-            elif not isinstance(facts, list):
-                issues.append({"severity": "warn", "type": "bad_fun_facts_type", "date": date_key, "index": idx, "msg": "funFacts is not a list"})
-            elif len([f for f in facts if str(f).strip()]) < 2:
-                issues.append({"severity": "info", "type": "few_fun_facts", "date": date_key, "index": idx, "msg": "Less than 2 fun facts"})
-
-            slug = entry.get("slug") or slugify(name) if name else None
-            if slug:
-                slug_dates[slug].append(date_key)
-
-            # Confidence heuristics
-            conf = score_confidence(entry)
-            date_conf = date_plausibility(mm, dd, entry)
-            if conf["data_confidence"] < 0.5:
-                issues.append({"severity": "info", "type": "low_confidence", "date": date_key, "index": idx, "msg": f"Data confidence {conf['data_confidence']}"})
-            if date_conf < 0.4:
-                issues.append({"severity": "info", "type": "low_date_confidence", "date": date_key, "index": idx, "msg": f"Date plausibility {date_conf}"})
-
-    for name, dates in dup_name_dates.items():
-        if len(set(dates)) > 1:
-            issues.append({"severity": "warn", "type": "duplicate_name", "name": name, "dates": sorted(set(dates)), "msg": "Name appears on multiple dates"})
-
-    for slug, dates in slug_dates.items():
-        if len(set(dates)) > 1:
-            issues.append({"severity": "warn", "type": "duplicate_slug", "slug": slug, "dates": sorted(set(dates)), "msg": "Slug appears on multiple dates"})
+@register
+class BadEntryListRule(Rule):
+    name = "bad_entry_list"
+    scope = "bucket"
+
+    def check(self, date_key, items):
+        if not parse_date_key(date_key) or isinstance(items, list):
+            return []
+        return [{"severity": "error", "type": self.name, "date": date_key, "msg": "Expected list of holidays"}]
+
+
+@register
+class BadEntryRule(Rule):
+    name = "bad_entry"
+    scope = "bucket"
+
+    def check(self, date_key, items):
+        if not parse_date_key(date_key) or not isinstance(items, list):
+            return []
+        return [
+            {"severity": "error", "type": self.name, "date": date_key, "index": idx, "msg": "Entry is not an object"}
+            for idx, entry in enumerate(items)
+            if not isinstance(entry, dict)
+        ]
+
+
+@register
+class MissingNameRule(Rule):
+    name = "missing_name"
+
+    def check(self, ctx):
+        if (ctx.entry.get("name") or "").strip():
+            return []
+        return [_entry_issue(ctx, "error", self.name, "Missing name")]
+
+
+@register
+class MissingDescriptionRule(Rule):
+    name = "missing_description"
+
+    def check(self, ctx):
+        if (ctx.entry.get("description") or "").strip():
+            return []
+        return [_entry_issue(ctx, "warn", self.name, "Missing description")]
+
+
+@register
+class ShortDescriptionRule(Rule):
+    name = "short_description"
 
+    def check(self, ctx):
+        desc = (ctx.entry.get("description") or "").strip()
+        if desc and len(desc) < 60:
+            return [_entry_issue(ctx, "info", self.name, "Description is short (<60 chars)")]
+        return []
+
+
+@register
+class MissingFunFactsRule(Rule):
+    name = "missing_fun_facts"
+
+    def check(self, ctx):
+        if ctx.entry.get("funFacts"):
+            return []
+        return [_entry_issue(ctx, "warn", self.name, "No funFacts provided")]
+
+
+@register
+class BadFunFactsTypeRule(Rule):
+    name = "bad_fun_facts_type"
+
+    def check(self, ctx):
+        facts = ctx.entry.get("funFacts")
+        if facts and not isinstance(facts, list):
+            return [_entry_issue(ctx, "warn", self.name, "funFacts is not a list")]
+        return []
+
+
+@register
+class FewFunFactsRule(Rule):
+    name = "few_fun_facts"
+
+    def check(self, ctx):
+        facts = ctx.entry.get("funFacts")
+        if facts and isinstance(facts, list) and len([f for f in facts if str(f).strip()]) < 2:
+            return [_entry_issue(ctx, "info", self.name, "Less than 2 fun facts")]
+        return []
+
+
+@register
+class LowConfidenceRule(Rule):
+    name = "low_confidence"
+
+    def check(self, ctx):
+        conf = score_confidence(ctx.entry)
+        if conf["data_confidence"] < 0.5:
+            return [_entry_issue(ctx, "info", self.name, f"Data confidence {conf['data_confidence']}")]
+        return []
+
+
+@register
+class LowDateConfidenceRule(Rule):
+    name = "low_date_confidence"
+
+    def check(self, ctx):
+        date_conf = date_plausibility(ctx.mm, ctx.dd, ctx.entry)
+        if date_conf < 0.4:
+            return [_entry_issue(ctx, "info", self.name, f"Date plausibility {date_conf}")]
+        return []
+
+
+def _bucket_contexts(date_key: str, items: Any) -> List[EntryContext]:
+    parsed = parse_date_key(date_key)
+    if not parsed or not isinstance(items, list):
+        return []
+    mm, dd = parsed
+    return [EntryContext(date_key, mm, dd, idx, entry) for idx, entry in enumerate(items) if isinstance(entry, dict)]
+
+
+class GlobalRule(Rule):
+    scope = "global"
+
+    def start(self):
+        return defaultdict(set)
+
+    def collect(self, state, ctx: EntryContext) -> None:
+        raise NotImplementedError
+
+    def finish(self, state) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+@register
+class DuplicateNameRule(GlobalRule):
+    name = "duplicate_name"
+
+    def collect(self, state, ctx):
+        name = (ctx.entry.get("name") or "").strip()
+        if name:
+            state[name].add(ctx.date_key)
+
+    def finish(self, state):
+        return [
+            {"severity": "warn", "type": self.name, "name": name, "dates": sorted(dates), "msg": "Name appears on multiple dates"}
+            for name, dates in state.items()
+            if len(dates) > 1
+        ]
+
+
+@register
+class DuplicateSlugRule(GlobalRule):
+    name = "duplicate_slug"
+
+    def collect(self, state, ctx):
+        name = (ctx.entry.get("name") or "").strip()
+        slug = ctx.entry.get("slug") or slugify(name) if name else None
+        if slug:
+            state[slug].add(ctx.date_key)
+
+    def finish(self, state):
+        return [
+            {"severity": "warn", "type": self.name, "slug": slug, "dates": sorted(dates), "msg": "Slug appears on multiple dates"}
+            for slug, dates in state.items()
+            if len(dates) > 1
+        ]
+
+
+def select_rules(only: Optional[List[str]] = None, skip: Optional[List[str]] = None) -> List[str]:
+    """Resolve --only/--skip into an ordered list of rule names."""
+    unknown = sorted(set(only or []) - set(RULES)) + sorted(set(skip or []) - set(RULES))
+    if unknown:
+        raise ValueError(f"Unknown rule(s): {', '.join(unknown)}")
+    names = [n for n in RULES if not only or n in only]
+    return [n for n in names if n not in set(skip or [])]
+
+
+def _run_entry_chunk(rule_names: List[str], chunk: List[EntryContext]):
+    """Run entry rules over one chunk; returns (issues, seconds per rule, issues per rule)."""
+    rules = [RULES[n] for n in rule_names]
+    timings = dict.fromkeys(rule_names, 0.0)
+    counts = dict.fromkeys(rule_names, 0)
+    issues = []
+    for ctx in chunk:
+        for rule in rules:
+            t0 = time.perf_counter()
+            found = rule.check(ctx)
+            timings[rule.name] += time.perf_counter() - t0
+            counts[rule.name] += len(found)
+            issues.extend(found)
+    return issues, timings, counts
+
+
+def run_rules(holidays, rule_names: Optional[List[str]] = None, workers: int = 1, chunk_size: int = 256):
+    """
+    Run the selected rules and return (issues, stats), where stats maps rule
+    name -> {"scope", "seconds", "issues"}. holidays is either the parsed
+    {"MM-DD": [...]} dict or any iterable of (date_key, items) pairs, such as
+    holiday_data.iter_holiday_buckets(), so the catalog can be streamed.
+    Issues come out in catalog order (bucket, then entry index), followed by
+    global issues. With workers > 1 the entry rules run on a process pool
+    and their "seconds" is summed worker time rather than wall time.
+    """
+    if rule_names is None:
+        rule_names = list(RULES)
+    buckets = holidays.items() if isinstance(holidays, dict) else holidays
+    stats = {n: {"scope": RULES[n].scope, "seconds": 0.0, "issues": 0} for n in rule_names}
+    bucket_rules = [RULES[n] for n in rule_names if RULES[n].scope == "bucket"]
+    entry_names = [n for n in rule_names if RULES[n].scope == "entry"]
+    global_rules = [RULES[n] for n in rule_names if RULES[n].scope == "global"]
+    global_state = {rule.name: rule.start() for rule in global_rules}
+
+    def timed(rule, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        stats[rule.name]["seconds"] += time.perf_counter() - t0
+        return result
+
+    def record(results):
+        for chunk_issues, timings, counts in results:
+            issues.extend(chunk_issues)
+            for name in entry_names:
+                stats[name]["seconds"] += timings[name]
+                stats[name]["issues"] += counts[name]
+
+    bucket_pos = {}
+    issues = []
+    pending = []
+    chunk = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and entry_names else None
+    try:
+        for date_key, items in buckets:
+            bucket_pos[date_key] = len(bucket_pos)
+            for rule in bucket_rules:
+                found = timed(rule, rule.check, date_key, items)
+                stats[rule.name]["issues"] += len(found)
+                issues.extend(found)
+            for ctx in _bucket_contexts(date_key, items):
+                for rule in global_rules:
+                    timed(rule, rule.collect, global_state[rule.name], ctx)
+                if entry_names:
+                    chunk.append(ctx)
+            if len(chunk) >= chunk_size:
+                if pool:
+                    pending.append(pool.submit(_run_entry_chunk, entry_names, chunk))
+                    # Keep a bounded number of chunks in flight.
+                    if len(pending) > 2 * workers:
+                        record([pending.pop(0).result()])
+                else:
+                    record([_run_entry_chunk(entry_names, chunk)])
+                chunk = []
+        if chunk:
+            record([_run_entry_chunk(entry_names, chunk)])
+        record([future.result() for future in pending])
+    finally:
+        if pool:
+            pool.shutdown()
+
+    # Stable sort restores catalog order across rules and chunks.
+    issues.sort(key=lambda i: (bucket_pos[i["date"]], i.get("index", -1)))
+
+    for rule in global_rules:
+        found = timed(rule, rule.finish, global_state[rule.name])
+        stats[rule.name]["issues"] += len(found)
+        issues.extend(found)
+
+    return issues, stats
+
+
+def validate(path: Path, only: Optional[List[str]] = None, skip: Optional[List[str]] = None, workers: int = 1):
+    issues, _ = run_rules(iter_holiday_buckets(path), select_rules(only, skip), workers=workers)
     return issues
 
 
-def run_openai_checks(issues: List[Dict[str, Any]], holidays: Dict[str, Any], model: str, base_url: str, timeout: float, throttle: float):
-    for date_key, items in holidays.items():
+def run_openai_checks(issues: List[Dict[str, Any]], buckets, model: str, base_url: str, timeout: float, throttle: float):
+    for date_key, items in buckets:
         if not isinstance(items, list):
             continue
         for idx, entry in enumerate(items):
@@ -261,24 +585,48 @@ def main():
     parser.add_argument("--openai-base-url", default="https://api.openai.com/v1", help="OpenAI API base URL")
     parser.add_argument("--openai-timeout", type=float, default=30.0, help="OpenAI request timeout seconds")
     parser.add_argument("--openai-throttle", type=float, default=0.0, help="Sleep seconds between OpenAI calls")
+    parser.add_argument("--only", help="Comma-separated rule names to run (default: all)")
+    parser.add_argument("--skip", help="Comma-separated rule names to skip")
+    parser.add_argument("--list-rules", action="store_true", help="List available rules and exit")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for per-entry rules (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Entries per worker chunk (default: 256)")
+    build_profile.add_arguments(parser)
     args = parser.parse_args()
 
+    if args.list_rules:
+        for name, rule in RULES.items():
+            print(f"{name:<22} {rule.scope}")
+        return
+
+    try:
+        rule_names = select_rules(
+            [n.strip() for n in args.only.split(",") if n.strip()] if args.only else None,
+            [n.strip() for n in args.skip.split(",") if n.strip()] if args.skip else None,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
     path = Path(args.file)
     if not path.exists():
         raise SystemExit(f"File not found: {path}")
 
-    raw = json.loads(path.read_text(encoding="utf-8"))
-    if not isinstance(raw, dict) or "holidays" not in raw:
-        raise SystemExit("File does not contain top-level 'holidays' key")
-    holidays = raw["holidays"]
-
-    issues = validate(path)
-
-    if args.openai:
-        if "OPENAI_API_KEY" not in os.environ:
-            raise SystemExit("OPENAI_API_KEY is required for --openai")
-        print("Running OpenAI checks…")
-        run_openai_checks(issues, holidays, args.model, args.openai_base_url, args.openai_timeout, args.openai_throttle)
+    with build_profile.session(args, "validate_holidays") as prof:
+        prof.add_read(path.stat().st_size)
+        try:
+            # Parsing is streamed, so "read" is charged per bucket inside "rules".
+            with prof.phase("rules"):
+                buckets = prof.iter("read", iter_holiday_buckets(path))
+                issues, rule_stats = run_rules(buckets, rule_names, workers=args.workers, chunk_size=args.chunk_size)
+        except ValueError as exc:
+            raise SystemExit(f"Could not read {path}: {exc}")
+        prof.note("rules", rule_stats)
+
+        if args.openai:
+            if "OPENAI_API_KEY" not in os.environ:
+                raise SystemExit("OPENAI_API_KEY is required for --openai")
+            print("Running OpenAI checks…")
+            with prof.phase("openai"):
+                run_openai_checks(issues, iter_holiday_buckets(path), args.model, args.openai_base_url, args.openai_timeout, args.openai_throttle)
 
     counts = Counter(issue["severity"] for issue in issues)
 
@@ -291,6 +639,10 @@ def main():
     if len(issues) > 20:
         print(f"...and {len(issues)-20} more")
 
+    print("Rule timings:")
+    for name, stat in sorted(rule_stats.items(), key=lambda kv: -kv[1]["seconds"]):
+        print(f"  {name:<22} {stat['scope']:<6} {stat['seconds'] * 1000:8.2f} ms  {stat['issues']:>5} issue(s)")
+
     if args.json_out:
         out_path = Path(args.json_out)
         out_path.write_text(json.dumps(issues, indent=2), encoding="utf-8")
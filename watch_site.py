@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Watch holidays.json and the generators, and rebuild only what an edit affects.
+
+Replaces the edit loop of rerunning every generator over the whole site.
+The watcher keeps the generators imported and calls their build() functions
+in-process, so a rebuild costs a few hundred milliseconds, not one
+interpreter start per script.
+
+What triggers what:
+- holidays.json: every entry is hashed (.build/watch.json keeps the last
+  build's hashes) and the diff decides the stages. A new, removed or
+  re-dated slug rebuilds the library, the hubs and the sitemaps. A rename
+  rebuilds the library and hubs, the pages that list the holiday next to
+  its date and category neighbours. Edits to descriptions or fun facts
+  touch nothing generated, since holiday/<slug>/ pages are maintained by
+  hand. The changed slugs are printed either way, and for a removed or
+  renamed slug so are the holiday pages that link to it by hand (from the
+  dependency index, see deps.py).
+- the report rows CSV (categories): hubs.
+- a generator module or one it imports: the module is reloaded and its
+  stages rerun (hubs with --force, as their cache only tracks members).
+
+The one-off page passes (generate_seo_pages.py, upgrade_*.py, ...) are not
+replayed: they were written for the pages as they were then and are not
+safe to run over today's pages.
+
+The generators only write files whose content changed, so a rebuild
+rewrites the month fragments, hub pages and sitemaps the edit touched and
+nothing else. File changes come from inotify via the optional `watchdog`
+package, or from polling every POLL_INTERVAL seconds without it.
+
+Usage:
+  python3 watch_site.py
+  python3 watch_site.py --once           # catch up with edits since the last build, then exit
+  python3 watch_site.py --years 2026..2027 --poll
+"""
+
+import argparse
+import datetime
+import importlib
+import queue
+import time
+import traceback
+from pathlib import Path
+
+import build_cache
+import build_profile
+import generate_category_hubs
+import generate_holiday_index
+import generate_sitemaps
+import holiday_data
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional: poll instead
+    FileSystemEventHandler = object
+    Observer = None
+
+HOLIDAYS_JSON = Path("holidays.json")
+POLL_INTERVAL = 0.2
+# Editors save with write-then-rename; let the burst of events settle first.
+SETTLE = 0.05
+
+LIBRARY, HUBS, SITEMAPS = "library", "hubs", "sitemaps"
+ALL_STAGES = (LIBRARY, HUBS, SITEMAPS)
+
+# Import order: a module is reloaded together with every module after it,
+# since those hold names imported from it.
+MODULES = [holiday_data, build_cache, generate_sitemaps, generate_holiday_index, generate_category_hubs]
+MODULE_STAGES = {
+    "holiday_data": ALL_STAGES,
+    "build_cache": ALL_STAGES,
+    "generate_sitemaps": ALL_STAGES,
+    "generate_holiday_index": (LIBRARY,),
+    "generate_category_hubs": (HUBS,),
+}
+
+
+def diff_entries(old, new):
+    """Return (added, removed, modified) slugs and the stages they affect."""
+    added = sorted(new.keys() - old.keys())
+    removed = sorted(old.keys() - new.keys())
+    modified = sorted(slug for slug in new.keys() & old.keys() if new[slug] != old[slug])
+    if added or removed or any(old[slug][2] != new[slug][2] for slug in modified):
+        stages = set(ALL_STAGES)
+    elif any(old[slug][1] != new[slug][1] for slug in modified):
+        stages = {LIBRARY, HUBS}
+    else:
+        stages = set()
+    return added, removed, modified, stages
+
+
+def watched_files():
+    files = [HOLIDAYS_JSON, holiday_data.REPORT_ROWS_CSV]
+    files += [Path(module.__file__) for module in MODULES]
+    return files
+
+
+def fingerprint(path: Path):
+    try:
+        return build_cache.content_hash(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, events: queue.Queue):
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.event_type in ("modified", "created", "moved"):
+            self.events.put(event)
+
+
+def start_observer(files, events: queue.Queue):
+    observer = Observer()
+    for directory in sorted({path.resolve().parent for path in files}):
+        observer.schedule(_Handler(events), str(directory), recursive=False)
+    observer.start()
+    return observer
+
+
+def wait_for_changes(files, prints, events=None):
+    """Block until at least one watched file's content changes; return those files."""
+    while True:
+        if events is not None:
+            events.get()
+        else:
+            time.sleep(POLL_INTERVAL)
+        time.sleep(SETTLE)
+        if events is not None:
+            while not events.empty():
+                events.get_nowait()
+        changed = []
+        for path in files:
+            current = fingerprint(path)
+            if current != prints.get(path):
+                prints[path] = current
+                changed.append(path)
+        if changed:
+            return changed
+
+
+def reload_modules(changed_names):
+    """Reload the changed generator modules and everything imported after them."""
+    first = min(i for i, module in enumerate(MODULES) if module.__name__ in changed_names)
+    for module in MODULES[first:]:
+        importlib.reload(module)
+
+
+def rebuild(prof, stages, force_hubs: bool, years, month: int) -> str:
+    done = []
+    if LIBRARY in stages:
+        _, written = generate_holiday_index.build(prof, month)
+        done.append(f"library {written}")
+    if HUBS in stages:
+        _, _, written, _ = generate_category_hubs.build(prof, force_hubs)
+        done.append(f"hubs {written}")
+    # Last: the static sitemap's lastmods come from the library and hub files.
+    if SITEMAPS in stages:
+        written = generate_sitemaps.build(prof, years)
+        done.append(f"sitemaps {written}")
+    return ", ".join(done)
+
+
+def describe(added, removed, modified) -> str:
+    parts = []
+    for label, slugs in (("added", added), ("removed", removed), ("changed", modified)):
+        if slugs:
+            shown = ", ".join(slugs[:5]) + (f" (+{len(slugs) - 5} more)" if len(slugs) > 5 else "")
+            parts.append(f"{label} {shown}")
+    return "; ".join(parts) or "no entry changed"
+
+
+def stale_links(slugs):
+    """Hand-maintained holiday pages that link to removed or renamed slugs (from DepIndex)."""
+    deps = build_cache.DepIndex()
+    notes = []
+    for slug in slugs:
+        own = (generate_holiday_index.HOLIDAY_DIR / slug / "index.html").as_posix()
+        linking = [page for page in deps.dependents(slug) if deps.stage(page) == "pages" and page != own]
+        if linking:
+            notes.append(f"{len(linking)} page(s) link to {slug} by hand (deps.py {slug} --stage pages)")
+    return notes
+
+
+def run_once(prof, cache, changed, years, month: int) -> None:
+    """Work out the stages for the changed files and run them."""
+    start = time.perf_counter()
+    stamp = datetime.datetime.now().strftime("%H:%M:%S")
+    stages, force_hubs = set(), False
+    notes = []
+
+    names = {Path(path).stem for path in changed if Path(path).suffix == ".py"}
+    if names:
+        reload_modules(names)
+        for name in names:
+            stages.update(MODULE_STAGES[name])
+        force_hubs = HUBS in stages
+        notes.append("reloaded " + ", ".join(sorted(names)))
+    if holiday_data.REPORT_ROWS_CSV in changed:
+        stages.add(HUBS)
+        notes.append("categories changed")
+
+    entries = None
+    if HOLIDAYS_JSON in changed:
+        entries = holiday_data.entry_index(HOLIDAYS_JSON)
+        if not cache.entries:
+            stages.update(ALL_STAGES)
+            notes.append(f"first build, {len(entries)} entries")
+        else:
+            added, removed, modified, entry_stages = diff_entries(cache.entries, entries)
+            stages |= entry_stages
+            notes.append(describe(added, removed, modified))
+            for slug in added:
+                if not (generate_holiday_index.HOLIDAY_DIR / slug / "index.html").exists():
+                    notes.append(f"no page yet at holiday/{slug}/")
+            renamed = [slug for slug in modified if cache.entries[slug][1] != entries[slug][1]]
+            notes.extend(stale_links(removed + renamed))
+
+    with prof.page(f"{stamp} {' '.join(sorted(stages)) or 'no-op'}"):
+        summary = rebuild(prof, stages, force_hubs, years, month) if stages else "nothing to rebuild"
+    if entries is not None:
+        cache.entries = entries
+        cache.save()
+    print(f"[{stamp}] {'; '.join(notes)} -> {summary} ({time.perf_counter() - start:.2f} s)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the library, hubs and sitemaps as holidays.json and the generators change.")
+    parser.add_argument("--years", default=str(generate_sitemaps.CURRENT_YEAR),
+                        help="Years to write monthly sitemaps for (see generate_sitemaps.py --years)")
+    parser.add_argument("--once", action="store_true", help="Rebuild for changes since the last run, then exit")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes even if watchdog (inotify) is installed")
+    build_profile.add_arguments(parser)
+    args = parser.parse_args()
+    years = generate_sitemaps.parse_years(args.years)
+    month = datetime.date.today().month
+
+    if not HOLIDAYS_JSON.exists():
+        raise SystemExit(f"{HOLIDAYS_JSON} not found (run from the site root)")
+    use_inotify = Observer is not None and not args.poll
+    files = watched_files()
+    prints = {path: fingerprint(path) for path in files}
+    cache = build_cache.HashCache("watch")
+
+    with build_profile.session(args, "watch_site") as prof:
+        # Catch up with anything edited while the watcher wasn't running.
+        run_once(prof, cache, [HOLIDAYS_JSON], years, month)
+        if args.once:
+            return
+        events = queue.Queue() if use_inotify else None
+        observer = start_observer(files, events) if use_inotify else None
+        print(f"Watching {len(files)} files ({'inotify' if use_inotify else f'polling every {POLL_INTERVAL} s'}); Ctrl-C to stop.")
+        try:
+            while True:
+                changed = wait_for_changes(files, prints, events)
+                try:
+                    run_once(prof, cache, changed, years, month)
+                except (Exception, SystemExit) as exc:
+                    # Usually a half-saved file; the next save triggers another try.
+                    print(f"Rebuild failed: {exc!r}")
+                    traceback.print_exc(limit=3)
+        except KeyboardInterrupt:
+            print("Stopped.")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+
+if __name__ == "__main__":
+    main()
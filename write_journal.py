@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Journaled page writes: a site-wide rewrite either lands whole or can be undone.
+
+Scripts that rewrite pages in place (generate_seo_pages, cleanup_final_pass)
+leave the tree half-migrated if they crash or are interrupted part way, and
+a bad rewrite could only be undone with a full git checkout. With a journal
+attached to the profiler, prof.write_text() stages each output in a temp
+file next to its page, and nothing on disk changes until the run finishes:
+
+    with build_profile.session(args, "cleanup_final_pass") as prof, \\
+            write_journal.session(args, "cleanup_final_pass", prof):
+        ...
+        prof.write_text(path, html)
+
+On success each staged file replaces its page with os.replace. Before that,
+the original is hard-linked into .build/journal/<run-id>/blobs/, which
+costs no copy because os.replace leaves the old inode to the link. If the
+link fails (e.g. another filesystem), it is copied instead.
+.build/journal/<run-id>/journal.json lists each touched path, the hash of
+what was written, and its blob (none for new files). If the run raises or
+is interrupted, the staged files are deleted and the pages stay as they
+were.
+
+rollback restores only the files a run touched. A file that has changed
+again since then is reported and left alone unless --force. Only the last
+KEEP_RUNS journals are kept. Pages staged in a run read back their old
+content until the run commits, so a script must not re-read its own output.
+
+Usage:
+  python3 write_journal.py list
+  python3 write_journal.py rollback 20261019T101500-cleanup_final_pass
+  python3 write_journal.py rollback last --dry-run
+  python3 write_journal.py prune --keep 5
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from build_cache import BUILD_DIR, content_hash, write_atomic
+
+JOURNAL_DIR = BUILD_DIR / "journal"
+KEEP_RUNS = 20
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--no-journal", action="store_true",
+                        help=f"Write pages directly instead of staging them and journaling the originals in {JOURNAL_DIR}/")
+
+
+class Journal:
+    def __init__(self, script: str, journal_dir: Path = JOURNAL_DIR):
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        self.run_id = f"{stamp}-{script}"
+        n = 1
+        while (journal_dir / self.run_id).exists():
+            n += 1
+            self.run_id = f"{stamp}-{script}-{n}"
+        self.dir = journal_dir / self.run_id
+        self.script = script
+        self.staged = {}
+
+    def _tmp(self, path: str) -> str:
+        return f"{path}.{self.run_id}.tmp"
+
+    def write_text(self, path, text: str) -> int:
+        """Stage text for path; returns the bytes written."""
+        data = text.encode("utf-8")
+        rel = os.path.relpath(path)
+        with open(self._tmp(rel), "wb") as fh:
+            fh.write(data)
+        self.staged[rel] = content_hash(data)
+        return len(data)
+
+    def _save(self, status: str, files) -> None:
+        record = {"run": self.run_id, "script": self.script, "status": status, "files": files}
+        write_atomic(self.dir / "journal.json", json.dumps(record, separators=(",", ":")).encode("utf-8"))
+
+    def commit(self) -> None:
+        if not self.staged:
+            return
+        blobs = self.dir / "blobs"
+        blobs.mkdir(parents=True)
+        files = []
+        for n, (rel, digest) in enumerate(self.staged.items()):
+            files.append([rel, digest, str(n) if os.path.exists(rel) else None])
+        # Recorded before anything moves, so an interrupted commit can still be rolled back.
+        self._save("committing", files)
+        for rel, _, blob in files:
+            if blob is not None:
+                try:
+                    os.link(rel, blobs / blob)
+                except OSError:
+                    shutil.copy2(rel, blobs / blob)
+            os.replace(self._tmp(rel), rel)
+        self._save("committed", files)
+        prune(KEEP_RUNS)
+
+    def abort(self) -> None:
+        for rel in self.staged:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._tmp(rel))
+        self.staged.clear()
+
+
+@contextlib.contextmanager
+def session(args, name: str, prof):
+    """Attach a Journal to prof for the duration; commit on success, discard staged writes on error."""
+    if args.no_journal:
+        yield None
+        return
+    journal = Journal(name)
+    prof.journal = journal
+    try:
+        yield journal
+    except BaseException:
+        journal.abort()
+        raise
+    finally:
+        prof.journal = None
+    journal.commit()
+    if journal.staged:
+        print(f"Journal {journal.run_id}: {len(journal.staged)} file(s). "
+              f"Undo with: python3 write_journal.py rollback {journal.run_id}")
+
+
+def runs(journal_dir: Path = JOURNAL_DIR):
+    """Journal records, oldest first."""
+    found = []
+    for path in sorted(journal_dir.glob("*/journal.json")):
+        try:
+            found.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return found
+
+
+def prune(keep: int, journal_dir: Path = JOURNAL_DIR):
+    """Delete all but the newest keep journals; returns the deleted run ids."""
+    records = runs(journal_dir)
+    dropped = [record["run"] for record in records[:max(0, len(records) - keep)]]
+    for run_id in dropped:
+        shutil.rmtree(journal_dir / run_id, ignore_errors=True)
+    return dropped
+
+
+def file_hash(path: str):
+    try:
+        with open(path, "rb") as fh:
+            return content_hash(fh.read())
+    except FileNotFoundError:
+        return None
+
+
+def rollback(run_id: str, force: bool = False, dry_run: bool = False, journal_dir: Path = JOURNAL_DIR):
+    """Restore the files run_id touched; returns (restored, unchanged, conflicts)."""
+    path = journal_dir / run_id / "journal.json"
+    if not path.exists():
+        raise SystemExit(f"No journal for {run_id} in {journal_dir}/")
+    record = json.loads(path.read_text(encoding="utf-8"))
+    if record["status"] == "rolled back":
+        raise SystemExit(f"{run_id} was already rolled back.")
+    blobs = journal_dir / run_id / "blobs"
+    restored, unchanged, conflicts = [], [], []
+    for rel, written, blob in reversed(record["files"]):
+        if not dry_run:
+            # Left behind if the commit was interrupted.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(f"{rel}.{run_id}.tmp")
+        if blob is not None and not (blobs / blob).exists():
+            # Originals are linked before they are replaced: never touched.
+            unchanged.append(rel)
+            continue
+        current = file_hash(rel)
+        original = file_hash(blobs / blob) if blob is not None else None
+        if current == original:
+            # Never replaced (an interrupted commit), or already restored.
+            unchanged.append(rel)
+            continue
+        if current != written and not force:
+            conflicts.append(rel)
+            continue
+        restored.append(rel)
+        if dry_run:
+            continue
+        if blob is None:
+            os.remove(rel)
+        else:
+            tmp = f"{rel}.{run_id}.tmp"
+            shutil.copy2(blobs / blob, tmp)
+            os.replace(tmp, rel)
+    if not dry_run and not conflicts:
+        record["status"] = "rolled back"
+        write_atomic(path, json.dumps(record, separators=(",", ":")).encode("utf-8"))
+    return restored, unchanged, conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, roll back or prune journaled page rewrites.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show journaled runs, newest last")
+    undo = sub.add_parser("rollback", help="Restore the files a run touched")
+    undo.add_argument("run_id", help="Run id from 'list', or 'last'")
+    undo.add_argument("--force", action="store_true", help="Also restore files that changed after the run")
+    undo.add_argument("--dry-run", action="store_true", help="Report without restoring")
+    trim = sub.add_parser("prune", help="Delete old journals")
+    trim.add_argument("--keep", type=int, default=KEEP_RUNS, help=f"Journals to keep (default: {KEEP_RUNS})")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        records = runs()
+        for record in records:
+            print(f"{record['run']:<48} {record['status']:<12} {len(record['files']):>6} file(s)")
+        if not records:
+            print(f"No journals in {JOURNAL_DIR}/.")
+    elif args.command == "rollback":
+        run_id = args.run_id
+        if run_id == "last":
+            records = [r for r in runs() if r["status"] != "rolled back"]
+            if not records:
+                raise SystemExit("Nothing to roll back.")
+            run_id = records[-1]["run"]
+        restored, unchanged, conflicts = rollback(run_id, args.force, args.dry_run)
+        verb = "Would restore" if args.dry_run else "Restored"
+        print(f"{run_id}: {verb} {len(restored)} file(s); {len(unchanged)} already original.")
+        if conflicts:
+            print(f"{len(conflicts)} file(s) changed since the run; left alone (use --force to restore them):")
+            for rel in conflicts:
+                print(f"  {rel}")
+            raise SystemExit(1)
+    else:
+        dropped = prune(args.keep)
+        print(f"Deleted {len(dropped)} journal(s).")
+
+
+if __name__ == "__main__":
+    main()